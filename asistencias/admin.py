@@ -1,9 +1,12 @@
 # asistencias/admin.py
 from django.contrib import admin
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from . import documentos, tokens
 from .models import (
     AccesoToken, Diplomatura, Materia, Clase, Asistencia,
-    InscripcionDiplomatura, InscripcionMateria, ProfesorMateria
+    InscripcionDiplomatura, InscripcionMateria, ProfesorMateria, ImportacionInscripciones,
+    ResumenAsistencia,
 )
 
 UserModel = get_user_model()
@@ -16,7 +19,8 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(Diplomatura)
 class DiplomaturaAdmin(admin.ModelAdmin):
-    list_display = ("id", "codigo", "nombre")
+    list_display = ("id", "codigo", "nombre", "archivada_en")
+    list_filter  = (("archivada_en", admin.EmptyFieldListFilter),)
     search_fields = ("codigo", "nombre")
 
 @admin.register(Materia)
@@ -59,28 +63,51 @@ class ProfesorMateriaAdmin(admin.ModelAdmin):
 
 @admin.register(AccesoToken)
 class AccesoTokenAdmin(admin.ModelAdmin):
-    list_display = ("code", "nivel_destino", "activo", "expires_at", "usado_por", "usado_en", "creado_por")
+    list_display = ("code", "nivel_destino", "materia", "activo", "expires_at", "usado_por", "usado_en", "creado_por")
     list_filter  = ("nivel_destino", "activo")
-    search_fields = ("code", "usado_por__email", "creado_por__email")
+    search_fields = ("code", "materia__codigo", "usado_por__email", "creado_por__email")
     readonly_fields = ("usado_en",)
-    autocomplete_fields = ("creado_por", "usado_por")
+    autocomplete_fields = ("materia", "creado_por", "usado_por")
+    list_select_related = ("materia", "usado_por", "creado_por")
 
-    actions = ["regenerar_codigo", "activar_tokens", "desactivar_tokens"]
+    actions = ["regenerar_codigo", "activar_tokens", "desactivar_tokens", "exportar_csv", "exportar_pdf"]
 
     def regenerar_codigo(self, request, queryset):
-        n = 0
-        for tok in queryset:
-            tok.regenerar()
-            n += 1
-        self.message_user(request, f"Se regeneraron {n} código(s).")
+        n = tokens.regenerar(queryset)
+        self.message_user(request, f"Se regeneraron {n} código(s) (los tokens ya usados no cambian).")
     regenerar_codigo.short_description = "Regenerar código"
 
     def activar_tokens(self, request, queryset):
-        updated = queryset.update(activo=True)
+        updated = tokens.activar(queryset)
         self.message_user(request, f"Se activaron {updated} token(s).")
     activar_tokens.short_description = "Activar"
 
     def desactivar_tokens(self, request, queryset):
-        updated = queryset.update(activo=False)
+        updated = tokens.desactivar(queryset)
         self.message_user(request, f"Se desactivaron {updated} token(s).")
     desactivar_tokens.short_description = "Desactivar"
+
+    def exportar_csv(self, request, queryset):
+        resp = HttpResponse(content_type='text/csv')
+        resp['Content-Disposition'] = 'attachment; filename="tokens.csv"'
+        tokens.escribir_csv(queryset.select_related('materia'), resp)
+        return resp
+    exportar_csv.short_description = "Exportar CSV"
+
+    def exportar_pdf(self, request, queryset):
+        pdf = documentos.cargar('pdf').planilla_tokens(queryset.select_related('materia'))
+        return documentos.respuesta('pdf', pdf, 'tokens')
+    exportar_pdf.short_description = "Planilla PDF para imprimir"
+
+@admin.register(ImportacionInscripciones)
+class ImportacionInscripcionesAdmin(admin.ModelAdmin):
+    list_display = ("id", "nombre_original", "diplomatura", "estado", "procesadas", "total_filas", "creado")
+    list_filter  = ("estado",)
+    search_fields = ("nombre_original", "diplomatura__nombre", "hash")
+    readonly_fields = ("hash", "diff", "resultado", "errores", "procesadas", "total_filas")
+
+@admin.register(ResumenAsistencia)
+class ResumenAsistenciaAdmin(admin.ModelAdmin):
+    list_display = ("id", "alumno", "materia", "presentes", "clases")
+    search_fields = ("alumno__email", "alumno__dni", "materia__nombre")
+    autocomplete_fields = ("alumno", "materia")
@@ -0,0 +1,126 @@
+"""
+Archivo de diplomaturas terminadas.
+
+Clase, Asistencia y Nota crecen con cada cohorte y los reportes las recorren enteras. Cuando
+una diplomatura termina, archivar() mueve sus clases, asistencias y notas a las tablas de
+archivo (ClaseArchivada, AsistenciaArchivada, NotaArchivada, con los mismos ids) y deja un
+ResumenAsistencia por alumno y materia; el promedio de notas ya queda en ResumenNota. Las tablas
+vivas quedan solo con las cohortes en curso.
+
+Las exportaciones leen con clases_de()/presentes_de(), que suman el archivo cuando la
+diplomatura está archivada: una exportación histórica sale igual que antes de archivar.
+"""
+import datetime
+from itertools import islice
+from operator import attrgetter
+
+from django.db import router, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import cache as cache_versiones
+from .models import (
+    Diplomatura, Materia, Clase, Asistencia, Nota, InscripcionMateria,
+    ClaseArchivada, AsistenciaArchivada, NotaArchivada, ResumenAsistencia,
+)
+
+DIAS = 180      # una diplomatura está terminada si su última clase fue hace más que esto
+LOTE = 2000     # filas por bulk_create
+
+
+def terminadas(dias=DIAS):
+    """Diplomaturas sin archivar cuya última clase fue hace más de `dias` días."""
+    limite = timezone.localdate() - datetime.timedelta(days=dias)
+    return (Diplomatura.objects.filter(archivada_en__isnull=True)
+            .annotate(ultima_clase=Max('materias__clases__fecha'))
+            .filter(ultima_clase__lt=limite)
+            .order_by('ultima_clase'))
+
+
+def _vivas(diplomatura):
+    return {
+        'clases': Clase.objects.filter(materia__diplomatura=diplomatura),
+        'asistencias': Asistencia.objects.filter(clase__materia__diplomatura=diplomatura),
+        'notas': Nota.objects.filter(materia__diplomatura=diplomatura),
+    }
+
+
+def contar(diplomatura):
+    """Filas que movería archivar() (para --dry-run)."""
+    return {nombre: qs.count() for nombre, qs in _vivas(diplomatura).items()}
+
+
+def _copiar(qs, modelo, lote):
+    """Copia las filas de qs a la tabla de archivo `modelo` (mismos nombres de columna)."""
+    campos = [f.attname for f in modelo._meta.concrete_fields]
+    filas = qs.order_by('pk').values(*campos).iterator(chunk_size=lote)
+    total = 0
+    while bloque := list(islice(filas, lote)):
+        modelo.objects.bulk_create([modelo(**f) for f in bloque])
+        total += len(bloque)
+    return total
+
+
+def _resumir(diplomatura, lote):
+    """Un ResumenAsistencia por alumno y materia: clases de la materia y presentes."""
+    clases = dict(Materia.objects.filter(diplomatura=diplomatura)
+                  .annotate(n=Count('clases')).values_list('id', 'n'))
+    presentes = {
+        (user_id, materia_id): n for user_id, materia_id, n in
+        Asistencia.objects.filter(clase__materia__diplomatura=diplomatura, presente=True)
+        .values('user_id', 'clase__materia_id').annotate(n=Count('id'))
+        .values_list('user_id', 'clase__materia_id', 'n')
+    }
+    pares = set(InscripcionMateria.objects.filter(materia__diplomatura=diplomatura)
+                .values_list('user_id', 'materia_id'))
+    ResumenAsistencia.objects.bulk_create([
+        ResumenAsistencia(alumno_id=user_id, materia_id=materia_id,
+                          clases=clases[materia_id], presentes=presentes.get((user_id, materia_id), 0))
+        for user_id, materia_id in pares | presentes.keys()
+    ], batch_size=lote)
+
+
+def archivar(diplomatura, lote=LOTE):
+    """
+    Mueve al archivo las clases, asistencias y notas de la diplomatura, en una transacción.
+    Devuelve las filas movidas por tabla, o None si ya estaba archivada.
+    """
+    with transaction.atomic():
+        diplomatura = Diplomatura.objects.select_for_update().get(pk=diplomatura.pk)
+        if diplomatura.archivada_en:
+            return None
+        vivas = _vivas(diplomatura)
+        _resumir(diplomatura, lote)
+        movidas = {
+            'clases': _copiar(vivas['clases'], ClaseArchivada, lote),
+            'asistencias': _copiar(vivas['asistencias'], AsistenciaArchivada, lote),
+            'notas': _copiar(vivas['notas'], NotaArchivada, lote),
+        }
+        # Borrado directo, sin cargar filas ni mandar señales: las de Asistencia y Nota harían
+        # consultas por fila. ResumenNota no cambia: sus notas siguen, ahora en NotaArchivada.
+        for nombre in ('asistencias', 'clases', 'notas'):
+            qs = vivas[nombre]
+            qs._raw_delete(router.db_for_write(qs.model))
+        diplomatura.archivada_en = timezone.now()
+        diplomatura.save(update_fields=['archivada_en'])   # la señal invalida catálogo y diplomatura
+        for materia_id in diplomatura.materias.values_list('id', flat=True):
+            cache_versiones.invalidar_materia(materia_id, diplomatura.pk)
+    return movidas
+
+
+# --- Lectura (vivas + archivo) ---
+
+def clases_de(materia):
+    """Clases de la materia por fecha; las archivadas incluidas si la diplomatura está archivada."""
+    clases = list(Clase.objects.filter(materia=materia).order_by('fecha'))
+    if materia.diplomatura.archivada_en:
+        clases = sorted([*ClaseArchivada.objects.filter(materia=materia), *clases], key=attrgetter('fecha'))
+    return clases
+
+
+def presentes_de(materia):
+    """{(user_id, clase_id): presente} de la materia, archivo incluido si corresponde."""
+    filas = list(Asistencia.objects.filter(clase__materia=materia).values_list('user_id', 'clase_id', 'presente'))
+    if materia.diplomatura.archivada_en:
+        filas += AsistenciaArchivada.objects.filter(clase__materia=materia).values_list('user_id', 'clase_id', 'presente')
+    return {(user_id, clase_id): presente for user_id, clase_id, presente in filas}
@@ -0,0 +1,113 @@
+"""
+Versiones de cache por ámbito (catálogo general, calendario, diplomatura, materia).
+
+Las claves cacheadas incluyen el número de versión del ámbito; las señales
+(ver signals.py) incrementan la versión cuando cambian los datos, así que las
+entradas viejas simplemente dejan de usarse y expiran solas. El catálogo cubre lo
+que muestran los listados (materias, diplomaturas, inscriptos, docentes); el
+calendario general (que usa ambas versiones) suma las clases, que los listados no muestran.
+Ojo: queryset.update() y bulk_create() no disparan señales; quien los use
+debe llamar a invalidar_* a mano.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOGO = 'catalogo'
+CALENDARIO = 'calendario'
+
+
+def _key(scope, obj_id=None):
+    return f"ver:{scope}" if obj_id is None else f"ver:{scope}:{obj_id}"
+
+
+def _nueva_version():
+    # Arranca en un valor basado en el reloj: si la clave se pierde (cull/reinicio)
+    # no se reutiliza un número viejo que todavía tenga fragmentos cacheados.
+    return int(time.time() * 1000)
+
+
+def version(scope, obj_id=None):
+    key = _key(scope, obj_id)
+    v = cache.get(key)
+    if v is None:
+        cache.add(key, _nueva_version(), None)
+        v = cache.get(key) or 0
+    return v
+
+
+async def aversion(scope, obj_id=None):
+    """version() para vistas async."""
+    key = _key(scope, obj_id)
+    v = await cache.aget(key)
+    if v is None:
+        await cache.aadd(key, _nueva_version(), None)
+        v = await cache.aget(key) or 0
+    return v
+
+
+def bump(scope, obj_id=None):
+    key = _key(scope, obj_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _nueva_version(), None)
+
+
+def cache_key(nombre, *partes):
+    return ":".join([nombre, *map(str, partes)])
+
+
+def get_or_set(key, calcular, timeout=None):
+    """Atajo para cachear el resultado de una función (ej: lista de eventos de un calendario)."""
+    if timeout is None:
+        timeout = getattr(settings, 'CACHE_TIMEOUT_VISTAS', 600)
+    valor = cache.get(key)
+    if valor is None:
+        valor = calcular()
+        cache.set(key, valor, timeout)
+    return valor
+
+
+def invalidar_catalogo():
+    bump(CATALOGO)
+
+
+def invalidar_diplomatura(diplomatura_id):
+    bump('diplomatura', diplomatura_id)
+
+
+def invalidar_calendario():
+    bump(CALENDARIO)
+
+
+def _diplo_key(materia_id):
+    return f"diplo_de_materia:{materia_id}"
+
+
+def diplomatura_de_materia(materia_id):
+    """diplomatura_id de la materia, cacheado: la señal de Materia lo actualiza al guardarla."""
+    diplomatura_id = cache.get(_diplo_key(materia_id))
+    if diplomatura_id is None:
+        from .models import Materia
+        diplomatura_id = Materia.objects.filter(pk=materia_id).values_list('diplomatura_id', flat=True).first()
+        if diplomatura_id is not None:
+            cache.set(_diplo_key(materia_id), diplomatura_id, None)
+    return diplomatura_id
+
+
+def recordar_diplomatura(materia_id, diplomatura_id=None):
+    """Actualiza (o con None olvida) la diplomatura cacheada de la materia."""
+    if diplomatura_id is None:
+        cache.delete(_diplo_key(materia_id))
+    else:
+        cache.set(_diplo_key(materia_id), diplomatura_id, None)
+
+
+def invalidar_materia(materia_id, diplomatura_id=None):
+    bump('materia', materia_id)
+    if diplomatura_id is None:
+        diplomatura_id = diplomatura_de_materia(materia_id)
+    if diplomatura_id is not None:
+        invalidar_diplomatura(diplomatura_id)
@@ -0,0 +1,129 @@
+"""
+Check-in con QR firmado, sin estado.
+
+El docente proyecta un QR que cambia cada CHECKIN_ROTACION segundos. El código lleva la clase,
+su materia y diplomatura, la ventana (inicio/fin, epoch) y el número de rotación, con una firma
+HMAC-SHA256 derivada de SECRET_KEY. verificar() lo valida solo con la clave y el reloj: un código
+adulterado, de una rotación vieja o fuera de ventana se rechaza sin consultar la base. Se acepta
+hasta CHECKIN_TOLERANCIA rotaciones atrás, por lo que tarda el alumno entre escanear y enviar.
+
+Con un código válido, aregistrar() inserta el presente directamente (sin leer Clase): el
+INSERT ignora el duplicado si el alumno ya estaba registrado.
+
+CheckinQRMiddleware verifica el código de /c/<código>/ antes de que RoleSwitchMiddleware lea el
+usuario, así que un código inválido se rechaza sin ninguna consulta aun con sesión iniciada. Si
+quien escanea no inició sesión, usar_qr guarda el código en la sesión y lo acepta una vez al
+volver del login (con ?pendiente=1), aunque para entonces haya vencido, mientras la clase siga
+en ventana.
+"""
+import base64
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from . import cache as cache_versiones
+from . import eventos
+from .models import Asistencia
+
+SAL = 'asistencias.checkin'
+FIRMA_BYTES = 16    # 128 bits de HMAC: alcanza y deja el QR chico
+LARGO_MAX = 120
+CAMPOS = 6
+PENDIENTE = 'pendiente'     # parámetro de la vuelta del login
+SESION = 'checkin_qr'       # código escaneado sin sesión iniciada
+GRACIA_LOGIN = 600          # segundos para iniciar sesión y volver
+
+
+class CodigoInvalido(Exception):
+    def __init__(self, motivo, pase=None):
+        super().__init__(motivo)
+        self.motivo = motivo
+        self.pase = pase    # solo si la firma es válida (vencido / fuera de ventana)
+
+
+@dataclass(frozen=True)
+class Pase:
+    clase_id: int
+    materia_id: int
+    diplomatura_id: int
+    inicio: int
+    fin: int
+    rotacion: int
+
+
+def rotacion():
+    return getattr(settings, 'CHECKIN_ROTACION', 30)
+
+
+def tolerancia():
+    return getattr(settings, 'CHECKIN_TOLERANCIA', 1)
+
+
+def _firma(payload, secret=None):
+    digest = salted_hmac(SAL, payload, secret=secret, algorithm='sha256').digest()[:FIRMA_BYTES]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def emitir(clase, ahora=None):
+    """Código vigente para `clase` (con materia cargada, para la diplomatura)."""
+    ahora = time.time() if ahora is None else ahora
+    payload = ".".join(str(v) for v in (
+        clase.pk, clase.materia_id, clase.materia.diplomatura_id,
+        int(clase.hora_inicio.timestamp()), int(clase.hora_fin.timestamp()), int(ahora // rotacion()),
+    ))
+    return f"{payload}.{_firma(payload)}"
+
+
+def verificar(codigo, ahora=None):
+    """Devuelve el Pase del código o levanta CodigoInvalido. No toca la base."""
+    ahora = time.time() if ahora is None else ahora
+    payload, _, firma = codigo.rpartition('.')
+    partes = payload.split('.')
+    if len(codigo) > LARGO_MAX or len(partes) != CAMPOS or not all(p.isdigit() for p in partes):
+        raise CodigoInvalido('formato')
+    # SECRET_KEY_FALLBACKS: los QR en pantalla siguen valiendo mientras se rota la clave
+    secretos = [settings.SECRET_KEY, *getattr(settings, 'SECRET_KEY_FALLBACKS', [])]
+    if not any(constant_time_compare(firma, _firma(payload, s)) for s in secretos):
+        raise CodigoInvalido('firma')
+    pase = Pase(*map(int, partes))
+    actual = int(ahora // rotacion())
+    if not actual - tolerancia() <= pase.rotacion <= actual:
+        raise CodigoInvalido('vencido', pase)
+    if not pase.inicio <= ahora <= pase.fin:
+        raise CodigoInvalido('fuera de ventana', pase)
+    return pase
+
+
+def verificar_escaneo(request, codigo):
+    """
+    Verifica el código de /c/<código>/ una sola vez por request (la primera es la de
+    CheckinQRMiddleware). Devuelve (pase, pendiente). pendiente=True es un código vencido que
+    vuelve del login: solo vale si la sesión lo tiene guardado (ver usar_qr).
+    """
+    if not hasattr(request, '_escaneo_qr'):
+        try:
+            request._escaneo_qr = (verificar(codigo), False)
+        except CodigoInvalido as e:
+            pendiente = e.motivo == 'vencido' and PENDIENTE in request.GET
+            request._escaneo_qr = (e.pase, True) if pendiente else e
+    if isinstance(request._escaneo_qr, CodigoInvalido):
+        raise request._escaneo_qr
+    return request._escaneo_qr
+
+
+async def aregistrar(pase, user_id):
+    """Presente de `user_id` en la clase del pase: un INSERT que ignora duplicados."""
+    ahora = timezone.now()
+    await Asistencia.objects.abulk_create(
+        [Asistencia(clase_id=pase.clase_id, user_id=user_id, presente=True)], ignore_conflicts=True)
+    # Ausente de cerrar_ventanas con la ventana reabierta: pasa a presente (casi siempre 0 filas).
+    # Con timestamp nuevo, para que lo vean quienes leen cambios por timestamp
+    await Asistencia.objects.filter(clase_id=pase.clase_id, user_id=user_id, presente=False).aupdate(
+        presente=True, timestamp=ahora)
+    # bulk_create no manda señales: lo que harían las de Asistencia, sin buscar la clase
+    await sync_to_async(cache_versiones.invalidar_materia)(pase.materia_id, pase.diplomatura_id)
+    eventos.publicar(pase.clase_id, user_id, True, ahora)
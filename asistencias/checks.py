@@ -0,0 +1,97 @@
+"""
+Chequeos de configuración que afectan el rendimiento en producción. Se corren con
+`manage.py check --deploy` (el arranque del contenedor lo hace antes de levantar gunicorn)
+o solos con `manage.py check --deploy --tag rendimiento`.
+"""
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+TAG = 'rendimiento'
+_CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+@register(TAG, deploy=True)
+def chequear_debug(app_configs, **kwargs):
+    if not settings.DEBUG:
+        return []
+    mensaje = "DEBUG está activo: cada consulta SQL se guarda en connection.queries durante el request."
+    if getattr(settings, 'ENTORNO', None) == 'prod':
+        return [Error(mensaje, hint="En prod DEBUG se apaga solo; revisar DJANGO_ENTORNO/DJANGO_DEBUG.", id='asistencias.E001')]
+    return [Warning(mensaje, hint="Usar DJANGO_ENTORNO=prod.", id='asistencias.W001')]
+
+
+@register(TAG, deploy=True)
+def chequear_templates(app_configs, **kwargs):
+    errores = []
+    for conf in settings.TEMPLATES:
+        if conf['BACKEND'] != 'django.template.backends.django.DjangoTemplates':
+            continue
+        loaders = conf.get('OPTIONS', {}).get('loaders')
+        # Sin 'loaders' explícitos Django ya usa el cargador cacheado
+        if loaders and not any(isinstance(l, (list, tuple)) and l[0] == _CACHED_LOADER for l in loaders):
+            errores.append(Warning(
+                "Los templates se leen y compilan en cada render (falta el cargador cacheado).",
+                hint=f"Envolver los loaders en {_CACHED_LOADER}.", id='asistencias.W002'))
+    return errores
+
+
+@register(TAG, deploy=True)
+def chequear_cache(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith(('LocMemCache', 'DummyCache')):
+        return [Warning(
+            f"El cache por defecto es {backend.rsplit('.', 1)[-1]}: cada worker tiene el suyo, así que "
+            "las versiones que invalidan vistas, membresías y el perfilado no se comparten.",
+            hint="CACHE_BACKEND=redis (o file en un solo contenedor).", id='asistencias.W003')]
+    return []
+
+
+@register(TAG, deploy=True)
+def chequear_sesiones(app_configs, **kwargs):
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        return [Warning("Las sesiones se leen de la base en cada request.",
+                        hint="SESSION_BACKEND=cached_db o signed_cookies.", id='asistencias.W004')]
+    return []
+
+
+@register(TAG, deploy=True)
+def chequear_conexiones(app_configs, **kwargs):
+    db = settings.DATABASES['default']
+    if db['ENGINE'].endswith('sqlite3'):
+        return []
+    pool = db.get('OPTIONS', {}).get('pool')
+    if pool and find_spec('psycopg_pool') is None:
+        return [Error("DB_POOL=True sin psycopg 3: el pool nativo no está instalado.",
+                      hint="Instalar requirements-pool.txt (o construir la imagen con "
+                           "REQUIREMENTS=requirements-pool.txt).", id='asistencias.E002')]
+    if not db.get('CONN_MAX_AGE') and not pool:
+        return [Warning("Se abre una conexión a la base por request.",
+                        hint="DB_CONN_MAX_AGE > 0 o DB_POOL=True.", id='asistencias.W005')]
+    return []
+
+
+@register(TAG, deploy=True)
+def chequear_uploads(app_configs, **kwargs):
+    errores = []
+    limite = 10 * 1024 * 1024
+    if settings.FILE_UPLOAD_MAX_MEMORY_SIZE > limite:
+        errores.append(Warning(
+            f"FILE_UPLOAD_MAX_MEMORY_SIZE={settings.FILE_UPLOAD_MAX_MEMORY_SIZE}: cada upload de hasta ese "
+            "tamaño queda entero en la memoria del worker.", hint="Dejarlo en 1-2 MB.", id='asistencias.W006'))
+    if settings.DATA_UPLOAD_MAX_MEMORY_SIZE is None or settings.DATA_UPLOAD_MAX_MEMORY_SIZE > limite:
+        errores.append(Warning(
+            "DATA_UPLOAD_MAX_MEMORY_SIZE sin límite razonable: un POST grande se carga entero en memoria.",
+            id='asistencias.W007'))
+    return errores
+
+
+@register(TAG, deploy=True)
+def chequear_estaticos(app_configs, **kwargs):
+    backend = settings.STORAGES.get('staticfiles', {}).get('BACKEND', '')
+    if 'Manifest' not in backend:
+        return [Warning("Los estáticos no llevan hash en el nombre: no se pueden cachear a largo plazo.",
+                        hint="whitenoise.storage.CompressedManifestStaticFilesStorage en STORAGES.",
+                        id='asistencias.W008')]
+    return []
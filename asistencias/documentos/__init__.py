@@ -0,0 +1,49 @@
+"""
+Registro de renderers de documentos (xlsx, pdf, qr).
+
+openpyxl y reportlab tardan en importarse y ocupan varios MB por worker, y solo los usan las
+exportaciones y las constancias. Las vistas piden el motor con cargar('xlsx') / cargar('pdf')
+y el módulo correspondiente se importa recién en ese momento (después queda en sys.modules).
+Este paquete no importa nada pesado: se puede importar desde el URLconf sin costo.
+"""
+from dataclasses import dataclass
+from importlib import import_module
+
+from django.http import HttpResponse
+
+
+@dataclass(frozen=True)
+class Renderer:
+    modulo: str
+    content_type: str
+    extension: str
+
+
+_registro = {}
+
+
+def registrar(formato, modulo, content_type, extension):
+    _registro[formato] = Renderer(modulo, content_type, extension)
+
+
+def formatos():
+    return dict(_registro)
+
+
+def cargar(formato):
+    """Importa (la primera vez) y devuelve el módulo del motor de `formato`."""
+    return import_module(_registro[formato].modulo)
+
+
+def respuesta(formato, contenido, nombre):
+    """HttpResponse de descarga para `contenido` (bytes); `nombre` va sin extensión."""
+    r = _registro[formato]
+    resp = HttpResponse(contenido, content_type=r.content_type)
+    resp['Content-Disposition'] = f'attachment; filename="{nombre}.{r.extension}"'
+    return resp
+
+
+registrar('xlsx', 'asistencias.documentos.xlsx',
+          'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+registrar('pdf', 'asistencias.documentos.pdf', 'application/pdf', 'pdf')
+registrar('qr', 'asistencias.documentos.qr', 'image/svg+xml', 'svg')
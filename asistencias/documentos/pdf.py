@@ -0,0 +1,177 @@
+"""Motor pdf (reportlab). Se importa a pedido desde asistencias.documentos.cargar('pdf')."""
+import locale
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_RIGHT
+
+
+def constancia_alumno_regular(alumno, diplomatura):
+    """PDF (bytes) de la constancia de alumno regular de `alumno` en `diplomatura`."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            rightMargin=2.5*cm, leftMargin=2.5*cm,
+                            topMargin=2.5*cm, bottomMargin=2.5*cm)
+
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Estilos personalizados
+    style_title = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        alignment=TA_CENTER,
+        fontSize=14,
+        spaceAfter=30,
+        fontName='Helvetica-Bold',
+        textTransform='uppercase',
+        underline=True
+    )
+
+    style_body = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        alignment=TA_JUSTIFY,
+        fontSize=12,
+        leading=24, # Interlineado
+        spaceAfter=20,
+        fontName='Times-Roman'
+    )
+
+    style_date = ParagraphStyle(
+        'CustomDate',
+        parent=styles['Normal'],
+        alignment=TA_RIGHT,
+        fontSize=12,
+        spaceAfter=50,
+        fontName='Times-Roman'
+    )
+
+    style_signature = ParagraphStyle(
+        'CustomSignature',
+        parent=styles['Normal'],
+        alignment=TA_CENTER,
+        fontSize=11,
+        leading=14,
+        fontName='Times-Italic'
+    )
+
+    # Header (Logos)
+    # Intentar cargar logos si existen
+    # Se asume que están en static/core/img/
+    logo_path = os.path.join(settings.BASE_DIR, 'static', 'core', 'img', 'header_logos.png')
+    if os.path.exists(logo_path):
+        # Ajustar tamaño según necesidad, ej: 16cm ancho
+        elements.append(Image(logo_path, width=16*cm, height=2.5*cm))
+    else:
+        elements.append(Spacer(1, 2.5*cm)) # Espacio si no hay logo
+
+    elements.append(Spacer(1, 1*cm))
+
+    # Título
+    elements.append(Paragraph("CONSTANCIA DE ALUMNO REGULAR", style_title))
+    elements.append(Spacer(1, 1*cm))
+
+    # Cuerpo
+    # Configurar locale para fecha en español
+    try:
+        locale.setlocale(locale.LC_TIME, 'es_AR.UTF-8')
+    except:
+        try:
+            locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
+        except:
+            pass # Fallback a default
+
+    fecha_actual = timezone.now()
+    fecha_str = fecha_actual.strftime("%d de %B de %Y")
+
+    # Texto modificado: Se quita "Diplomatura en:" para no repetir
+    texto = f"""
+    Se deja constancia que el Señor/a <b>{alumno.first_name} {alumno.last_name}</b>, DNI <b>{alumno.dni}</b>,
+    es alumno regular de la: <b>{diplomatura.nombre}</b> dependiente de
+    Universidad Tecnológica Nacional, a través del Plan de Integración Territorial
+    de la Provincia de Buenos Aires (PROGRAMA PUENTES).
+    """
+    elements.append(Paragraph(texto, style_body))
+
+    texto2 = """
+    Se extiende el presente certificado a solicitud del/la interesado/a, a solo efecto
+    de ser presentado ante quien corresponda. La presente constancia tiene una
+    validez de 30 días una vez emitida la misma.
+    """
+    elements.append(Paragraph(texto2, style_body))
+
+    elements.append(Spacer(1, 1*cm))
+
+    # Fecha (Solo fecha, sin lugar fijo para no errar)
+    elements.append(Paragraph(f"{fecha_str}", style_date))
+
+    elements.append(Spacer(1, 2*cm))
+
+    # Firma
+    firma_path = os.path.join(settings.BASE_DIR, 'static', 'core', 'img', 'firma_lucia.png')
+    if os.path.exists(firma_path):
+        # Ajustar tamaño: duplicado a 10cm ancho x 5cm alto (aprox) para que se vea bien
+        elements.append(Image(firma_path, width=10*cm, height=5*cm))
+    else:
+        # Fallback si no está la imagen
+        elements.append(Paragraph("___________________________", style_signature))
+        elements.append(Paragraph("Prof. Lucia Yacoy", style_signature))
+        elements.append(Paragraph("Dir. Unidad de Gestión del Plan de Integración Territorial de la", style_signature))
+        elements.append(Paragraph("Universidad Tecnológica Nacional", style_signature))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def planilla_tokens(tokens, titulo="Tokens de acceso", columnas=2, filas=8):
+    """
+    PDF (bytes) con un código por celda, `columnas` x `filas` por página, para imprimir y
+    recortar. Se dibuja directo sobre el canvas, en una sola pasada (sin platypus).
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    c.setTitle(titulo)
+    ancho, alto = A4
+    margen = 1.5*cm
+    cabecera = 1*cm
+    celda_w = (ancho - 2*margen) / columnas
+    celda_h = (alto - 2*margen - cabecera) / filas
+    por_pagina = columnas * filas
+    tokens = list(tokens)
+    paginas = max(1, -(-len(tokens) // por_pagina))
+
+    for i, t in enumerate(tokens):
+        pos = i % por_pagina
+        if pos == 0:
+            if i:
+                c.showPage()
+            c.setFont('Helvetica-Bold', 11)
+            c.drawString(margen, alto - margen - 0.5*cm, titulo)
+            c.setFont('Helvetica', 8)
+            c.drawRightString(ancho - margen, alto - margen - 0.5*cm, f"Página {i // por_pagina + 1} de {paginas}")
+            c.setDash(3, 3)
+        x = margen + (pos % columnas) * celda_w
+        y = alto - margen - cabecera - (pos // columnas + 1) * celda_h
+        c.rect(x, y, celda_w, celda_h)   # línea de corte
+        centro = x + celda_w / 2
+        c.setFont('Helvetica', 9)
+        detalle = t.get_nivel_destino_display()
+        if t.materia_id:
+            detalle += f" · {t.materia.nombre}"
+        c.drawCentredString(centro, y + celda_h - 0.9*cm, detalle[:60])
+        c.setFont('Courier-Bold', 10)
+        c.drawCentredString(centro, y + celda_h / 2 - 0.1*cm, str(t.code))
+        c.setFont('Helvetica', 8)
+        vence = f"Vence: {timezone.localtime(t.expires_at):%d/%m/%Y %H:%M}" if t.expires_at else "Sin vencimiento"
+        c.drawCentredString(centro, y + 0.6*cm, vence)
+
+    c.save()
+    return buffer.getvalue()
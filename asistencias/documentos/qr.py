@@ -0,0 +1,14 @@
+"""Motor de códigos QR (reportlab). Se importa a pedido desde asistencias.documentos.cargar('qr')."""
+from reportlab.graphics import renderSVG
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+
+
+def svg(texto, lado=320):
+    """SVG (str, sin declaración XML, para incrustar en HTML) del QR de `texto`."""
+    qr = QrCodeWidget(texto, barLevel='M')
+    x0, y0, x1, y1 = qr.getBounds()
+    dibujo = Drawing(lado, lado, transform=[lado / (x1 - x0), 0, 0, lado / (y1 - y0), 0, 0])
+    dibujo.add(qr)
+    contenido = renderSVG.drawToString(dibujo)
+    return contenido[contenido.index('<svg'):]
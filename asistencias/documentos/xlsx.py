@@ -0,0 +1,41 @@
+"""Motor xlsx (openpyxl). Se importa a pedido desde asistencias.documentos.cargar('xlsx')."""
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+
+def libro(vacio=False):
+    """Workbook nuevo; con vacio=True sin la hoja por defecto."""
+    wb = Workbook()
+    if vacio:
+        wb.remove(wb.active)
+    return wb
+
+
+def autosize(ws):
+    for col in ws.columns:
+        max_len = 0
+        # Use get_column_letter instead of accessing column_letter directly on the cell,
+        # which might be a MergedCell
+        col_letter = get_column_letter(col[0].column)
+        for cell in col:
+            try:
+                val = str(cell.value) if cell.value is not None else ""
+                max_len = max(max_len, len(val))
+            except Exception:
+                pass
+        ws.column_dimensions[col_letter].width = min(max_len + 2, 60)
+
+
+def escribir_hoja(ws, headers, rows):
+    ws.append(headers)
+    for r in rows:
+        ws.append(r)
+    autosize(ws)
+
+
+def a_bytes(wb):
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,142 @@
+"""
+Canal de eventos de asistencia por clase (para el endpoint SSE).
+
+Cada proceso mantiene, por clase observada, un único _Canal con el estado de presentes y
+una tarea productora. Los check-ins hechos en este proceso llegan al instante por
+publicar() (señal post_save + on_commit); los de otros workers o cargas masivas se
+detectan con un sondeo periódico de la base (una consulta por clase, no por espectador).
+Los suscriptores reciben los eventos por una asyncio.Queue.
+"""
+import asyncio
+import datetime
+import threading
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+
+from .models import Asistencia
+
+# Margen del sondeo: una fila con timestamp anterior puede confirmarse después de la consulta
+MARGEN = datetime.timedelta(seconds=5)
+
+_canales = {}
+_lock = threading.Lock()
+
+
+def disponible(request):
+    """SSE solo si está activado y la request llega por ASGI; si no, la planilla sondea."""
+    return getattr(settings, 'SSE_ACTIVO', False) and isinstance(request, ASGIRequest)
+
+
+def _intervalo():
+    return getattr(settings, 'SSE_INTERVALO_SONDEO', 2.0)
+
+
+def cursor():
+    """
+    Cursor para cambios_asistencia_json y la planilla: un poco hacia atrás, porque una asistencia
+    con timestamp anterior puede confirmarse después de la respuesta. El cliente aplica los
+    cambios por alumno, así que repetirlos no molesta.
+    """
+    return (timezone.now() - MARGEN).isoformat()
+
+
+def _evento(user_id, presente, timestamp):
+    return {'id': user_id, 'presente': presente, 'timestamp': timestamp.isoformat()}
+
+
+class _Canal:
+    def __init__(self, clase_id, loop):
+        self.clase_id = clase_id
+        self.loop = loop
+        self.estado = {}  # user_id -> (presente, timestamp)
+        self.suscriptores = set()
+        self.cursor = None
+        self.tarea = None
+        self.fallo = None
+        self.listo = asyncio.Event()
+
+    async def _cargar(self):
+        # Estado inicial: una consulta al crear el canal, compartida por todos los espectadores
+        filas = Asistencia.objects.filter(clase_id=self.clase_id).values_list('user_id', 'presente', 'timestamp')
+        async for user_id, presente, ts in filas:
+            self.estado[user_id] = (presente, ts)
+        self.cursor = timezone.now() - MARGEN
+        self.listo.set()
+
+    def entregar(self, user_id, presente, timestamp):
+        """Aplica un cambio y lo reparte si es nuevo. Corre siempre en el loop del canal."""
+        if self.estado.get(user_id, (None,))[0] == presente:
+            return
+        self.estado[user_id] = (presente, timestamp)
+        evento = _evento(user_id, presente, timestamp)
+        for cola in self.suscriptores:
+            cola.put_nowait(evento)
+
+    async def _sondear(self):
+        while self.suscriptores:
+            await asyncio.sleep(_intervalo())
+            ahora = timezone.now()
+            filas = (Asistencia.objects.filter(clase_id=self.clase_id, timestamp__gt=self.cursor)
+                     .order_by('timestamp').values_list('user_id', 'presente', 'timestamp'))
+            async for user_id, presente, ts in filas:
+                self.entregar(user_id, presente, ts)
+            self.cursor = ahora - MARGEN
+
+    def snapshot(self, desde=None):
+        """Eventos del estado actual con timestamp posterior a `desde` (todos si es None)."""
+        return [_evento(uid, p, ts) for uid, (p, ts) in sorted(self.estado.items(), key=lambda i: i[1][1])
+                if desde is None or ts > desde]
+
+
+async def suscribir(clase_id):
+    """Devuelve (canal, cola). Crea el canal y su productor si es el primer espectador del proceso."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        canal = _canales.get(clase_id)
+        nuevo = canal is None or canal.loop is not loop
+        if nuevo:
+            canal = _canales[clase_id] = _Canal(clase_id, loop)
+        cola = asyncio.Queue()
+        canal.suscriptores.add(cola)
+    if nuevo:
+        try:
+            await canal._cargar()
+        except BaseException as e:
+            # Canal muerto: fuera del registro (el próximo espectador crea uno nuevo) y los que
+            # esperaban se enteran por canal.fallo en vez de quedarse con heartbeats sin eventos
+            with _lock:
+                canal.suscriptores.discard(cola)
+                if _canales.get(clase_id) is canal:
+                    del _canales[clase_id]
+            canal.fallo = e
+            canal.listo.set()
+            raise
+        canal.tarea = loop.create_task(canal._sondear())
+    else:
+        await canal.listo.wait()
+        if canal.fallo is not None:
+            with _lock:
+                canal.suscriptores.discard(cola)
+            raise RuntimeError(f"No se pudo cargar el canal de la clase {clase_id}") from canal.fallo
+    return canal, cola
+
+
+def desuscribir(canal, cola):
+    with _lock:
+        canal.suscriptores.discard(cola)
+        if not canal.suscriptores:
+            if canal.tarea:
+                canal.tarea.cancel()
+            if _canales.get(canal.clase_id) is canal:
+                del _canales[canal.clase_id]
+
+
+def publicar(clase_id, user_id, presente, timestamp):
+    """Avisa a los espectadores de este proceso. Se puede llamar desde cualquier hilo."""
+    with _lock:
+        canal = _canales.get(clase_id)
+    if canal is None or canal.loop.is_closed():
+        return
+    canal.loop.call_soon_threadsafe(canal.entregar, user_id, presente, timestamp)
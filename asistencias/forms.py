@@ -1,8 +1,11 @@
 # FILE: asistencias/forms.py
+import re
+
 from django import forms
 from django.contrib.auth import get_user_model
 from allauth.account.forms import SignupForm as AllauthSignupForm
 from .models import Diplomatura, Materia, Clase, Nota
+from .recurrencia import DIAS_SEMANA
 
 User = get_user_model()
 
@@ -30,7 +33,7 @@ class MateriaForm(forms.ModelForm):
 # FILE: asistencias/forms.py
 
 class ClaseForm(forms.ModelForm):
-    # ... (mantén tus campos repetir_cada y repetir_hasta iguales)
+    # Para crear varias clases con un patrón semanal ver ClaseRecurrenteForm
 
     class Meta:
         model = Clase
@@ -56,6 +59,71 @@ class ClaseForm(forms.ModelForm):
                 cleaned_data[campo] = getattr(self.instance, campo)
         return cleaned_data
 
+class ClaseRecurrenteForm(forms.Form):
+    desde = forms.DateField(label="Desde", widget=forms.DateInput(attrs={'type': 'date'}))
+    hasta = forms.DateField(label="Hasta", widget=forms.DateInput(attrs={'type': 'date'}))
+    dias = forms.TypedMultipleChoiceField(
+        label="Días", choices=DIAS_SEMANA, coerce=int, widget=forms.CheckboxSelectMultiple,
+    )
+    hora_inicio = forms.TimeField(label="Inicio ventana asistencia", widget=forms.TimeInput(attrs={'type': 'time'}))
+    hora_fin = forms.TimeField(label="Fin ventana asistencia", widget=forms.TimeInput(attrs={'type': 'time'}))
+    excluir = forms.CharField(
+        label="Fechas excluidas (feriados)", required=False,
+        widget=forms.Textarea(attrs={'rows': 3, 'placeholder': 'dd/mm/aaaa, una por línea o separadas por coma'}),
+    )
+    tema = forms.CharField(label="Tema", max_length=255, required=False)
+    link_clase = forms.CharField(label="Link", required=False)
+
+    def clean_excluir(self):
+        fechas = []
+        campo = forms.DateField(input_formats=['%d/%m/%Y', '%Y-%m-%d'])
+        for parte in self.cleaned_data['excluir'].replace(',', '\n').split():
+            try:
+                fechas.append(campo.clean(parte))
+            except forms.ValidationError:
+                raise forms.ValidationError(f"Fecha inválida: {parte}")
+        return fechas
+
+    def clean(self):
+        cleaned_data = super().clean()
+        desde, hasta = cleaned_data.get('desde'), cleaned_data.get('hasta')
+        if desde and hasta and hasta < desde:
+            self.add_error('hasta', "La fecha final es anterior a la inicial.")
+        if cleaned_data.get('hora_inicio') and cleaned_data.get('hora_inicio') == cleaned_data.get('hora_fin'):
+            self.add_error('hora_fin', "La ventana no puede durar cero minutos.")
+        return cleaned_data
+
+class PerfiladoForm(forms.Form):
+    patron = forms.CharField(label="Patrón de URL (regex)", required=False,
+                             widget=forms.TextInput(attrs={'placeholder': r'ej: ^/diplomaturas/\d+/exportar'}))
+    usuario = forms.EmailField(label="Email del usuario", required=False)
+    tasa = forms.FloatField(label="Fracción de requests a perfilar", initial=1.0, min_value=0.01, max_value=1.0)
+    maximo = forms.IntegerField(label="Máximo de perfiles", initial=20, min_value=1, max_value=500)
+    minutos = forms.IntegerField(label="Duración (minutos)", initial=30, min_value=1, max_value=24 * 60)
+
+    def clean_patron(self):
+        patron = self.cleaned_data['patron']
+        try:
+            re.compile(patron)
+        except re.error as e:
+            raise forms.ValidationError(f"Expresión regular inválida: {e}")
+        return patron
+
+    def clean_usuario(self):
+        email = self.cleaned_data['usuario']
+        if not email:
+            return None
+        user = User.objects.filter(email__iexact=email).first()
+        if user is None:
+            raise forms.ValidationError("No existe un usuario con ese email.")
+        return user
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors and not cleaned_data.get('patron') and not cleaned_data.get('usuario'):
+            raise forms.ValidationError("Indicá un patrón de URL, un usuario o ambos.")
+        return cleaned_data
+
 class MarcarPresenteForm(forms.Form):
     dni = forms.CharField(label="DNI", max_length=20)
 
@@ -0,0 +1,316 @@
+"""
+Importación masiva de inscripciones desde CSV/XLSX.
+
+Las filas se leen de forma perezosa (csv o openpyxl read_only) y se procesan por lotes:
+por cada lote se validan DNI/email, se resuelven los usuarios existentes con una sola
+consulta, se crean los faltantes y las inscripciones con bulk_create(ignore_conflicts=True).
+Columnas: dni, email, nombre, apellido, materia_codigo (opcional).
+
+Para archivos grandes la vista sólo crea una ImportacionInscripciones; el comando
+procesar_importaciones corre primero el análisis (dry-run) y, una vez confirmada por el
+coordinador, la aplica por lotes actualizando el progreso. Cada lote renueva `actualizado`: un
+trabajo en curso sin novedades por más de IMPORTACION_LEASE segundos quedó huérfano (el worker
+murió) y vuelve a la cola. Reaplicar es seguro porque todas las altas ignoran duplicados.
+"""
+import csv
+import hashlib
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import User, Materia, InscripcionDiplomatura, InscripcionMateria, ImportacionInscripciones
+from . import cache as cache_versiones
+from .permissions import invalidar_membresias
+
+COLUMNAS = ('dni', 'email', 'nombre', 'apellido', 'materia_codigo')
+DNI_RE = re.compile(r'^\d{6,10}$')
+MAX_ERRORES_GUARDADOS = 500
+
+
+@dataclass
+class ResultadoImportacion:
+    filas: int = 0
+    usuarios_creados: int = 0
+    inscripciones_diplomatura: int = 0
+    inscripciones_materia: int = 0
+    duplicados: int = 0  # inscripciones que ya existían (en la base o antes en el archivo)
+    errores: list = field(default_factory=list)  # [(nro_fila, mensaje)]
+
+    def como_dict(self):
+        return {
+            'filas': self.filas, 'usuarios_creados': self.usuarios_creados,
+            'inscripciones_diplomatura': self.inscripciones_diplomatura,
+            'inscripciones_materia': self.inscripciones_materia,
+            'duplicados': self.duplicados, 'conflictos': len(self.errores),
+        }
+
+
+def _normalizar_encabezado(valor):
+    return str(valor or '').strip().lower().replace(' ', '_')
+
+
+def leer_filas(archivo, nombre=None):
+    """Genera (nro_fila, dict) a partir de un archivo .csv o .xlsx subido."""
+    nombre = (nombre or getattr(archivo, 'name', '')).lower()
+    if nombre.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = wb.active.iter_rows(values_only=True)
+            encabezado = [_normalizar_encabezado(c) for c in next(filas, ())]
+            for nro, valores in enumerate(filas, start=2):
+                if valores and any(v not in (None, '') for v in valores):
+                    yield nro, dict(zip(encabezado, ('' if v is None else str(v).strip() for v in valores)))
+        finally:
+            wb.close()
+        return
+
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    delimitador = ';' if muestra.count(';') > muestra.count(',') else ','
+    lector = csv.reader(texto, delimiter=delimitador)
+    encabezado = [_normalizar_encabezado(c) for c in next(lector, [])]
+    for nro, valores in enumerate(lector, start=2):
+        if any(v.strip() for v in valores):
+            yield nro, dict(zip(encabezado, (v.strip() for v in valores)))
+
+
+def _lotes(iterable, tamanio):
+    it = iter(iterable)
+    while lote := list(islice(it, tamanio)):
+        yield lote
+
+
+def _validar(nro, fila, materias, errores):
+    dni = re.sub(r'[.\s-]', '', fila.get('dni', '') or '')
+    if dni.endswith('.0'):  # Excel guarda el DNI como número
+        dni = dni[:-2]
+    email = (fila.get('email') or '').strip().lower()
+    codigo = (fila.get('materia_codigo') or '').strip()
+
+    if not DNI_RE.match(dni):
+        errores.append((nro, f"DNI inválido: '{fila.get('dni', '')}'"))
+        return None
+    try:
+        validate_email(email)
+    except ValidationError:
+        errores.append((nro, f"Email inválido: '{email}'"))
+        return None
+    if codigo and codigo not in materias:
+        errores.append((nro, f"Materia '{codigo}' no pertenece a la diplomatura"))
+        return None
+    return {
+        'nro': nro, 'dni': dni, 'email': email, 'materia_id': materias.get(codigo),
+        'nombre': (fila.get('nombre') or '').strip()[:50],
+        'apellido': (fila.get('apellido') or '').strip()[:50],
+    }
+
+
+def importar_inscripciones(diplomatura, filas, batch_size=1000, dry_run=False, progreso=None):
+    """
+    Importa las filas (iterable de (nro, dict)) a la diplomatura y devuelve ResultadoImportacion.
+
+    Con dry_run=True no escribe nada: el resultado es el diff que produciría la importación.
+    Cada lote corre en su propia transacción; `progreso(resultado)` se llama al cerrar cada lote.
+    """
+    res = ResultadoImportacion()
+    materias = dict(Materia.objects.filter(diplomatura=diplomatura).values_list('codigo', 'id'))
+    password = make_password(None)  # inutilizable: el alumno la define con "olvidé mi contraseña"
+    # Lo ya planificado en lotes anteriores (por DNI), para que el dry-run no cuente dos veces
+    vistos_usuarios, vistos_diplo, vistos_mat = set(), set(), set()
+
+    for lote in _lotes(filas, batch_size):
+        res.filas += len(lote)
+        validas = [v for v in (_validar(nro, f, materias, res.errores) for nro, f in lote) if v]
+
+        with transaction.atomic():
+            # 1. Usuarios existentes: una consulta por DNI y otra por email
+            existentes = {dni: (uid, email) for dni, uid, email in User.objects.filter(
+                dni__in={v['dni'] for v in validas}).values_list('dni', 'id', 'email')}
+            # Los emails entrantes van en minúscula; los guardados pueden no estarlo. LOWER(email) IN
+            # usa el índice funcional user_email_lower_idx (sin ordenar: no hace falta)
+            dni_de = dict(User.objects.annotate(email_min=Lower('email'))
+                          .filter(email_min__in={v['email'] for v in validas}).order_by()
+                          .values_list('email_min', 'dni'))
+
+            nuevos = {}
+            ok = []
+            for v in validas:
+                if v['dni'] in existentes:
+                    if existentes[v['dni']][1].lower() != v['email']:
+                        res.errores.append((v['nro'], f"DNI {v['dni']} ya registrado con otro email; se inscribe igual"))
+                elif v['dni'] in nuevos or v['dni'] in vistos_usuarios:
+                    pass
+                elif dni_de.get(v['email'], v['dni']) != v['dni']:
+                    res.errores.append((v['nro'], f"El email {v['email']} ya pertenece al DNI {dni_de[v['email']]}"))
+                    continue
+                else:
+                    nuevos[v['dni']] = User(
+                        dni=v['dni'], email=v['email'], first_name=v['nombre'], last_name=v['apellido'],
+                        nivel=1, password=password,
+                    )
+                    dni_de[v['email']] = v['dni']
+                ok.append(v)
+            vistos_usuarios |= nuevos.keys()
+            res.usuarios_creados += len(nuevos)
+
+            # 2. Inscripciones ya existentes de los usuarios conocidos (una consulta por tabla)
+            dni_por_id = {uid: dni for dni, (uid, _) in existentes.items()}
+            ya_diplo = {dni_por_id[uid] for uid in InscripcionDiplomatura.objects.filter(
+                diplomatura=diplomatura, user_id__in=dni_por_id).values_list('user_id', flat=True)}
+            filas_materia = [(v['dni'], v['materia_id']) for v in ok if v['materia_id']]
+            pares = set(filas_materia)
+            ya_mat = {(dni_por_id[uid], mid) for uid, mid in InscripcionMateria.objects.filter(
+                user_id__in=dni_por_id, materia_id__in={m for _, m in pares}).values_list('user_id', 'materia_id')
+            } if pares else set()
+
+            nuevas_diplo = {v['dni'] for v in ok} - ya_diplo - vistos_diplo
+            nuevas_mat = pares - ya_mat - vistos_mat
+            res.duplicados += len(ok) - len(nuevas_diplo) + len(filas_materia) - len(nuevas_mat)
+            res.inscripciones_diplomatura += len(nuevas_diplo)
+            res.inscripciones_materia += len(nuevas_mat)
+            vistos_diplo |= nuevas_diplo
+            vistos_mat |= nuevas_mat
+
+            # 3. Escritura: usuarios faltantes y luego inscripciones (ignore_conflicts cubre carreras)
+            if not dry_run and ok:
+                ids = {dni: uid for dni, (uid, _) in existentes.items()}
+                if nuevos:
+                    User.objects.bulk_create(nuevos.values(), batch_size=batch_size, ignore_conflicts=True)
+                faltan = ({v['dni'] for v in ok} - ids.keys())
+                if faltan:
+                    ids.update(User.objects.filter(dni__in=faltan).values_list('dni', 'id'))
+                InscripcionDiplomatura.objects.bulk_create(
+                    [InscripcionDiplomatura(user_id=ids[dni], diplomatura=diplomatura) for dni in nuevas_diplo],
+                    batch_size=batch_size, ignore_conflicts=True,
+                )
+                InscripcionMateria.objects.bulk_create(
+                    [InscripcionMateria(user_id=ids[dni], materia_id=mid) for dni, mid in nuevas_mat],
+                    batch_size=batch_size, ignore_conflicts=True,
+                )
+
+        if progreso:
+            progreso(res)
+
+    if not dry_run:
+        # bulk_create no dispara señales: invalidar caches a mano
+        cache_versiones.invalidar_catalogo()
+        cache_versiones.invalidar_diplomatura(diplomatura.pk)
+        for mid in materias.values():
+            cache_versiones.invalidar_materia(mid, diplomatura.pk)
+        invalidar_membresias()
+    return res
+
+
+# --- Trabajos de importación ---
+
+def hash_archivo(archivo):
+    """SHA-256 del archivo subido, leído por chunks."""
+    h = hashlib.sha256()
+    for chunk in archivo.chunks():
+        h.update(chunk)
+    archivo.seek(0)
+    return h.hexdigest()
+
+
+def lease():
+    return getattr(settings, 'IMPORTACION_LEASE', 600)
+
+
+def _huerfanas():
+    """Trabajos tomados por un worker que dejó de avanzar (sin progreso en más de un lease)."""
+    P = ImportacionInscripciones
+    limite = timezone.now() - timedelta(seconds=lease())
+    return P.objects.filter(estado__in=(P.ANALIZANDO, P.APLICANDO), actualizado__lt=limite)
+
+
+def reencolar_huerfanas():
+    """Devuelve a la cola los trabajos huérfanos: el análisis a pendiente, la aplicación a confirmada."""
+    P = ImportacionInscripciones
+    huerfanas = _huerfanas()
+    return (huerfanas.filter(estado=P.ANALIZANDO).update(estado=P.PENDIENTE, actualizado=timezone.now())
+            + huerfanas.filter(estado=P.APLICANDO).update(estado=P.CONFIRMADA, actualizado=timezone.now()))
+
+
+def crear_importacion(diplomatura, archivo, usuario):
+    """
+    Registra el archivo como trabajo pendiente. Si el mismo archivo ya se subió a la
+    diplomatura (y no terminó en error ni quedó huérfano) devuelve ese trabajo sin volver
+    a guardarlo. Devuelve (importacion, creada).
+    """
+    P = ImportacionInscripciones
+    digest = hash_archivo(archivo)
+    # El huérfano queda reemplazado por la nueva subida: se cierra para que no vuelva a la cola
+    _huerfanas().filter(diplomatura=diplomatura, hash=digest).update(
+        estado=P.ERROR, mensaje_error="El worker se detuvo; reemplazada por una nueva subida.",
+        actualizado=timezone.now())
+    previa = P.objects.filter(diplomatura=diplomatura, hash=digest).exclude(estado=P.ERROR).first()
+    if previa:
+        return previa, False
+    imp = P.objects.create(
+        diplomatura=diplomatura, creado_por=usuario, archivo=archivo,
+        nombre_original=archivo.name[:255], hash=digest,
+    )
+    return imp, True
+
+
+def _tomar(imp_id, desde, hacia):
+    """Pasa el trabajo de estado con un UPDATE condicional: sólo un worker lo obtiene."""
+    return ImportacionInscripciones.objects.filter(pk=imp_id, estado=desde).update(
+        estado=hacia, procesadas=0, actualizado=timezone.now()) == 1
+
+
+def _ejecutar(imp, dry_run):
+    def progreso(res):
+        ImportacionInscripciones.objects.filter(pk=imp.pk).update(procesadas=res.filas, actualizado=timezone.now())
+
+    with imp.archivo.open('rb') as f:
+        return importar_inscripciones(imp.diplomatura, leer_filas(f, imp.nombre_original),
+                                      dry_run=dry_run, progreso=progreso)
+
+
+def procesar_importacion(imp):
+    """Avanza un trabajo un paso: analiza si está pendiente, aplica si está confirmado."""
+    P = ImportacionInscripciones
+    if imp.estado == P.PENDIENTE and _tomar(imp.pk, P.PENDIENTE, P.ANALIZANDO):
+        dry_run, campo, final = True, 'diff', P.ANALIZADA
+    elif imp.estado == P.CONFIRMADA and _tomar(imp.pk, P.CONFIRMADA, P.APLICANDO):
+        dry_run, campo, final = False, 'resultado', P.COMPLETADA
+    else:
+        return False
+
+    try:
+        res = _ejecutar(imp, dry_run)
+    except Exception as e:
+        P.objects.filter(pk=imp.pk).update(estado=P.ERROR, mensaje_error=str(e)[:2000], actualizado=timezone.now())
+        raise
+    campos = {campo: res.como_dict(), 'estado': final, 'procesadas': res.filas, 'actualizado': timezone.now()}
+    if dry_run:
+        campos['total_filas'] = res.filas
+        campos['errores'] = [list(e) for e in res.errores[:MAX_ERRORES_GUARDADOS]]
+    P.objects.filter(pk=imp.pk).update(**campos)
+    return True
+
+
+def procesar_pendientes(limite=None):
+    """Procesa los trabajos en cola (pendientes, confirmados y huérfanos) por orden de llegada."""
+    P = ImportacionInscripciones
+    reencolar_huerfanas()
+    hechos = 0
+    for imp in P.objects.filter(estado__in=(P.PENDIENTE, P.CONFIRMADA)).select_related('diplomatura').order_by('creado'):
+        if limite is not None and hechos >= limite:
+            break
+        if procesar_importacion(imp):
+            hechos += 1
+    return hechos
@@ -0,0 +1,167 @@
+"""
+Instrumentación por request: consultas SQL, tiempo SQL, consultas más lentas, tiempo de
+render de templates y tiempo de vista.
+
+La medición en curso vive en un ContextVar, así que funciona igual en vistas sync y async
+(sync_to_async copia el contexto al hilo donde corre el ORM). El wrapper de SQL se instala
+una sola vez por conexión (connection.execute_wrappers) y, fuera de un request medido, solo
+pasa la llamada de largo.
+
+Cada proceso guarda además un agregado móvil por nombre de URL (las últimas VENTANA
+requests) que muestra la vista de rendimiento del supervisor.
+"""
+import heapq
+import statistics
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+VENTANA = 200       # requests por URL en el agregado móvil
+MAX_LENTAS = 3      # consultas más lentas que se guardan por request
+MAX_SQL = 300       # caracteres de SQL en los logs
+
+_actual = ContextVar('instrumentacion', default=None)
+_agregado = {}
+_lock = threading.Lock()
+
+
+def activa():
+    return getattr(settings, 'INSTRUMENTACION', True)
+
+
+@dataclass
+class Medicion:
+    consultas: int = 0
+    sql: float = 0.0
+    templates: float = 0.0
+    vista: float = 0.0
+    lentas: list = field(default_factory=list)  # heap de (segundos, sql)
+    _profundidad: int = 0
+
+    def registrar_consulta(self, sql, segundos):
+        self.consultas += 1
+        self.sql += segundos
+        item = (segundos, sql[:MAX_SQL])
+        if len(self.lentas) < MAX_LENTAS:
+            heapq.heappush(self.lentas, item)
+        elif segundos > self.lentas[0][0]:
+            heapq.heapreplace(self.lentas, item)
+
+    def mas_lentas(self):
+        return sorted(self.lentas, reverse=True)
+
+    def server_timing(self):
+        return ", ".join([
+            f'sql;dur={self.sql * 1000:.1f};desc="{self.consultas} consultas"',
+            f"tpl;dur={self.templates * 1000:.1f}",
+            f"vista;dur={self.vista * 1000:.1f}",
+        ])
+
+
+# --- SQL ---
+
+def _wrapper_sql(execute, sql, params, many, context):
+    m = _actual.get()
+    if m is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        m.registrar_consulta(sql, time.perf_counter() - t0)
+
+
+def instalar_en_conexion(sender=None, connection=None, **kwargs):
+    """Receptor de connection_created: cada conexión nueva queda instrumentada."""
+    if _wrapper_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper_sql)
+
+
+# --- Templates ---
+
+def _instrumentar_templates():
+    # Se envuelve el render del backend (una vez por render/render_to_string);
+    # los {% include %} y {% extends %} quedan adentro de esa medición.
+    from django.template.backends.django import Template
+    if getattr(Template.render, '_instrumentado', False):
+        return
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        m = _actual.get()
+        if m is None or m._profundidad:
+            return original(self, context, request)
+        m._profundidad += 1
+        t0 = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            m.templates += time.perf_counter() - t0
+            m._profundidad -= 1
+
+    render._instrumentado = True
+    Template.render = render
+
+
+def instalar():
+    """Se llama desde AppConfig.ready()."""
+    if not activa():
+        return
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+    connection_created.connect(instalar_en_conexion, dispatch_uid='asistencias.instrumentacion')
+    for conn in connections.all(initialized_only=True):
+        instalar_en_conexion(connection=conn)
+    _instrumentar_templates()
+
+
+# --- Medición de un request ---
+
+def iniciar():
+    m = Medicion()
+    return m, _actual.set(m)
+
+
+def terminar(token):
+    _actual.reset(token)
+
+
+def registrar(ruta, m):
+    """Suma la medición al agregado móvil de la ruta."""
+    with _lock:
+        filas = _agregado.get(ruta)
+        if filas is None:
+            filas = _agregado[ruta] = {'total': 0, 'ventana': deque(maxlen=VENTANA)}
+        filas['total'] += 1
+        filas['ventana'].append((m.vista * 1000, m.sql * 1000, m.consultas, m.templates * 1000))
+
+
+def _p95(valores):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))]
+
+
+def agregado():
+    """Resumen por ruta, de la más lenta (p95) a la más rápida."""
+    with _lock:
+        copia = {ruta: (f['total'], list(f['ventana'])) for ruta, f in _agregado.items()}
+    resumen = []
+    for ruta, (total, ventana) in copia.items():
+        ms, sql_ms, consultas, tpl_ms = zip(*ventana)
+        resumen.append({
+            'ruta': ruta, 'requests': total, 'muestras': len(ventana),
+            'ms_p50': round(statistics.median(ms), 1), 'ms_p95': round(_p95(ms), 1),
+            'sql_ms_p50': round(statistics.median(sql_ms), 1),
+            'consultas_p50': statistics.median(consultas), 'consultas_max': max(consultas),
+            'tpl_ms_p50': round(statistics.median(tpl_ms), 1),
+        })
+    return sorted(resumen, key=lambda r: r['ms_p95'], reverse=True)
+
+
+def reiniciar():
+    with _lock:
+        _agregado.clear()
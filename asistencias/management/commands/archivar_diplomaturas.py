@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asistencias import archivo
+from asistencias.models import Diplomatura
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve al archivo las clases, asistencias y notas de las diplomaturas terminadas y deja "
+        "un resumen de asistencia por alumno y materia (ver asistencias/archivo.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=archivo.DIAS,
+                            help="Terminada = última clase hace más de estos días.")
+        parser.add_argument('--diplomatura', action='append', default=[], metavar='CODIGO',
+                            help="Archivar esta diplomatura aunque no esté terminada (se puede repetir).")
+        parser.add_argument('--dry-run', action='store_true', help="Solo listar qué se movería.")
+        parser.add_argument('--batch-size', type=int, default=archivo.LOTE)
+
+    def handle(self, *args, **o):
+        if o['diplomatura']:
+            diplomaturas = list(Diplomatura.objects.filter(codigo__in=o['diplomatura'], archivada_en__isnull=True))
+            faltan = set(o['diplomatura']) - {d.codigo for d in diplomaturas}
+            if faltan:
+                raise CommandError(f"No existen o ya están archivadas: {', '.join(sorted(faltan))}")
+        else:
+            diplomaturas = list(archivo.terminadas(o['dias']))
+
+        if not diplomaturas:
+            self.stdout.write("No hay diplomaturas para archivar.")
+            return
+
+        total = 0
+        for d in diplomaturas:
+            if o['dry_run']:
+                filas = archivo.contar(d)
+            else:
+                filas = archivo.archivar(d, lote=o['batch_size'])
+                if filas is None:
+                    continue
+            total += 1
+            self.stdout.write(f"  {d.codigo}: {filas['clases']} clases, {filas['asistencias']} asistencias, "
+                              f"{filas['notas']} notas")
+
+        if o['dry_run']:
+            self.stdout.write(f"Se archivarían {total} diplomaturas (--dry-run).")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Diplomaturas archivadas: {total}"))
@@ -0,0 +1,51 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from asistencias import checkin
+from asistencias.models import Clase, Materia
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide emitir() y verificar() del check-in con QR firmado (µs por operación, operaciones "
+        "por segundo y consultas SQL) con códigos válidos, adulterados, vencidos y basura."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        n = options['n']
+        ahora = timezone.now()
+        # Clase en memoria: ni emitir() ni verificar() la buscan en la base
+        clase = Clase(pk=1, materia=Materia(pk=1, diplomatura_id=1),
+                      hora_inicio=ahora - datetime.timedelta(hours=1), hora_fin=ahora + datetime.timedelta(hours=1))
+        valido = checkin.emitir(clase)
+        vencido = checkin.emitir(clase, ahora=time.time() - 10 * checkin.rotacion())
+        casos = {
+            'válido': valido,
+            'firma': valido[:-2] + ('AA' if not valido.endswith('AA') else 'BB'),
+            'vencido': vencido,
+            'formato': 'x' * 40,
+        }
+
+        def verificar(codigo):
+            try:
+                checkin.verificar(codigo)
+            except checkin.CodigoInvalido:
+                pass
+
+        self.stdout.write(f"{'operación':<20}{'µs/op':>10}{'ops/s':>12}{'SQL':>6}")
+        for nombre, fn, arg in [('emitir', checkin.emitir, clase),
+                                *((f'verificar {k}', verificar, c) for k, c in casos.items())]:
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                for _ in range(n):
+                    fn(arg)
+                seg = time.perf_counter() - t0
+            self.stdout.write(f"{nombre:<20}{seg * 1e6 / n:>10.2f}{n / seg:>12,.0f}{len(ctx.captured_queries):>6}")
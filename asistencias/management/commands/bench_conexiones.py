@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de conexión a la base por request: conexión nueva en cada request "
+        "(CONN_MAX_AGE=0), conexión persistente y, si DB_POOL=True, checkout del pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests simulados por escenario.")
+        parser.add_argument('--database', default='default')
+
+    def _simular(self, conn, n, cerrar):
+        # Un "request" = una consulta trivial; cerrar imita el fin de request con CONN_MAX_AGE=0
+        tiempos = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            if cerrar:
+                conn.close()
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        tiempos.sort()
+        return sum(tiempos) / n, tiempos[n // 2], tiempos[int(n * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        conn = connections[options['database']]
+        n = options['requests']
+        if n < 1:
+            raise CommandError("--requests debe ser al menos 1.")
+        pool = conn.settings_dict.get('OPTIONS', {}).get('pool')
+
+        escenarios = [
+            ("conexión por request" if not pool else "checkout del pool por request", True),
+            ("conexión persistente", False),
+        ]
+
+        self.stdout.write(f"Motor: {conn.vendor} | requests por escenario: {n} | pool: {'sí' if pool else 'no'}")
+        self.stdout.write(f"{'escenario':<32}{'media ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        resultados = {}
+        for nombre, cerrar in escenarios:
+            conn.close()
+            resultados[nombre] = self._simular(conn, n, cerrar)
+            media, p50, p95 = resultados[nombre]
+            self.stdout.write(f"{nombre:<32}{media:>10.3f}{p50:>10.3f}{p95:>10.3f}")
+        conn.close()
+
+        por_request, persistente = (r[0] for r in resultados.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Overhead de conexión por request: {por_request - persistente:.3f} ms"
+        ))
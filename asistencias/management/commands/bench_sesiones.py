@@ -0,0 +1,44 @@
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+MOTORES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara consultas SQL y tiempo por request para leer la sesión (como hacen "
+        "SessionMiddleware y RoleSwitchMiddleware) con cada SESSION_ENGINE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        self.stdout.write(f"{'motor':<16}{'SQL/request':>12}{'ms/request':>12}")
+        for nombre, motor in MOTORES.items():
+            SessionStore = import_module(motor).SessionStore
+
+            # Sesión típica de un usuario logueado que impersona un rol
+            s = SessionStore()
+            s['_auth_user_id'] = '1'
+            s['impersonate_role'] = 2
+            s.save()
+            clave = s.session_key
+
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                for _ in range(n):
+                    SessionStore(session_key=clave).get('impersonate_role')
+                ms = (time.perf_counter() - t0) * 1000 / n
+
+            s.delete()
+            self.stdout.write(f"{nombre:<16}{len(ctx.captured_queries) / n:>12.2f}{ms:>12.3f}")
@@ -0,0 +1,262 @@
+import datetime
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias.models import (
+    User, Diplomatura, Materia, Clase, Asistencia, InscripcionDiplomatura, InscripcionMateria,
+)
+from .seed_scale import DOMINIO
+
+BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'vistas.json'
+
+# Holgura absoluta además de la relativa: en vistas de pocos ms el ruido del reloj
+# supera cualquier porcentaje razonable
+HOLGURA_MS = 5.0
+HOLGURA_KB = 256.0
+
+
+def comparar(actual, base, tolerancia=0.5, tolerancia_memoria=0.25):
+    """
+    Devuelve la lista de regresiones de `actual` contra `base` (dicts nombre -> métricas).
+    Las consultas SQL tienen que ser exactamente las mismas o menos; tiempos y memoria
+    admiten la tolerancia relativa más una holgura absoluta.
+    """
+    regresiones = []
+    for nombre, m in actual.items():
+        b = base.get(nombre)
+        if b is None:
+            continue
+        if 'error' in m:
+            if 'error' not in b:
+                regresiones.append(f"{nombre}: {m['error']}")
+            continue
+        if 'error' in b:
+            continue
+        if m['consultas'] > b['consultas']:
+            regresiones.append(f"{nombre}: {m['consultas']} consultas SQL (base {b['consultas']})")
+        for campo, etiqueta in (('ms', 'tiempo'), ('sql_ms', 'tiempo SQL')):
+            limite = b[campo] * (1 + tolerancia) + HOLGURA_MS
+            if m[campo] > limite:
+                regresiones.append(f"{nombre}: {etiqueta} {m[campo]:.1f} ms (base {b[campo]:.1f}, límite {limite:.1f})")
+        limite = b['memoria_kb'] * (1 + tolerancia_memoria) + HOLGURA_KB
+        if m['memoria_kb'] > limite:
+            regresiones.append(f"{nombre}: memoria {m['memoria_kb']:.0f} KB (base {b['memoria_kb']:.0f}, límite {limite:.0f})")
+    return regresiones
+
+
+class _ContadorSQL:
+    # execute_wrapper en vez de CaptureQueriesContext: no guarda el SQL (que en las
+    # exportaciones son miles de consultas) y no tiene el tope de 9000 de queries_log
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - t0
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide las vistas más pesadas contra el dataset de seed_scale: tiempo, consultas SQL, "
+        "tiempo SQL y pico de memoria por request. Compara contra la línea base guardada "
+        "y termina con error si alguna métrica empeora."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefijo', default='sc', help="Prefijo del dataset generado con seed_scale.")
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--solo', action='append', default=[], help="Medir solo este escenario (repetible).")
+        parser.add_argument('--baseline', default=str(BASELINE), help="Archivo JSON con la línea base.")
+        parser.add_argument('--guardar', action='store_true', help="Guarda los resultados como nueva línea base.")
+        parser.add_argument('--tolerancia', type=float, default=0.5, help="Empeoramiento de tiempo admitido (0.5 = 50%%).")
+        parser.add_argument('--tolerancia-memoria', type=float, default=0.25)
+        parser.add_argument('--sin-cache', action='store_true', help="Vacía la caché antes de cada request.")
+
+    def handle(self, *args, **o):
+        self.o = o
+        p = o['prefijo']
+        diplomatura = Diplomatura.objects.filter(codigo=f"{p}D000").first()
+        if diplomatura is None:
+            raise CommandError(f"No hay dataset con prefijo '{p}': correr antes seed_scale --prefijo {p}.")
+
+        resultados = {}
+        # Los errores ya se informan en la tabla; sin esto cada uno imprime el traceback entero
+        log = logging.getLogger('django.request')
+        nivel_log = log.level
+        log.setLevel(logging.CRITICAL)
+        try:
+            escenarios = self._escenarios(p, diplomatura)
+            desconocidos = set(o['solo']) - {e[0] for e in escenarios}
+            if desconocidos:
+                raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+            if o['solo']:
+                escenarios = [e for e in escenarios if e[0] in o['solo']]
+
+            self.stdout.write(f"{'vista':<34}{'ms':>9}{'SQL':>7}{'SQL ms':>9}{'pico KB':>10}")
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for nombre, usuario, metodo, url, datos, esperado, preparar in escenarios:
+                    m = resultados[nombre] = self._medir(usuario, metodo, url, datos, esperado, preparar)
+                    if 'error' in m:
+                        self.stdout.write(self.style.WARNING(f"{nombre:<34}{m['error']}"))
+                    else:
+                        self.stdout.write(f"{nombre:<34}{m['ms']:>9.1f}{m['consultas']:>7}"
+                                          f"{m['sql_ms']:>9.1f}{m['memoria_kb']:>10.0f}")
+        finally:
+            log.setLevel(nivel_log)
+            # La clase abierta es solo para medir marcar_presente
+            Clase.objects.filter(materia__diplomatura=diplomatura, tema='bench_vistas').delete()
+
+        dataset = self._dataset(p)
+        ruta = Path(o['baseline'])
+        if o['guardar']:
+            previo = json.loads(ruta.read_text()) if ruta.exists() else {}
+            # Con --solo se actualizan esos escenarios y se conservan los demás
+            vistas = {**previo.get('vistas', {}), **resultados} if o['solo'] else resultados
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(json.dumps({'dataset': dataset, 'vistas': vistas}, indent=2, ensure_ascii=False) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {ruta}"))
+            return
+        if not ruta.exists():
+            self.stdout.write(self.style.WARNING(f"No hay línea base en {ruta}: usar --guardar para crearla."))
+            return
+
+        base = json.loads(ruta.read_text())
+        if base.get('dataset') != dataset:
+            self.stdout.write(self.style.WARNING(
+                f"El dataset no coincide con el de la línea base ({base.get('dataset')}): "
+                f"las comparaciones de tiempo y memoria no son confiables."))
+        regresiones = comparar(resultados, base.get('vistas', {}), o['tolerancia'], o['tolerancia_memoria'])
+        if regresiones:
+            raise CommandError("Regresiones de rendimiento:\n  " + "\n  ".join(regresiones))
+        self.stdout.write(self.style.SUCCESS("Sin regresiones."))
+
+    # --- Escenarios ---
+
+    def _escenarios(self, p, diplomatura):
+        """(nombre, usuario, método, url, datos, status esperado, preparar)"""
+        usuario = lambda rol: User.objects.get(email=f"{p}.{rol}@{DOMINIO}")
+        alumno, docente, coordinador = usuario('a0'), usuario('d0'), usuario('c0')
+        admin, referente, supervisor = (self._usuario_bench(p, n) for n in (5, 6, 7))
+        InscripcionDiplomatura.objects.get_or_create(user=referente, diplomatura=diplomatura)
+
+        # marcar_presente necesita una clase con la ventana abierta en una materia del alumno
+        materia = (InscripcionMateria.objects.filter(user=alumno).select_related('materia')
+                   .order_by('materia__codigo').first().materia)
+        ahora = timezone.now()
+        clase = Clase.objects.create(materia=materia, fecha=timezone.localdate(), tema='bench_vistas',
+                                     hora_inicio=ahora - datetime.timedelta(hours=1),
+                                     hora_fin=ahora + datetime.timedelta(hours=1))
+        desmarcar = lambda: Asistencia.objects.filter(clase=clase, user=alumno).delete()
+
+        home = reverse('asistencias:home')
+        consulta = reverse('asistencias:consulta_publica')
+        return [
+            ('home_alumno', alumno, 'get', home, None, 200, None),
+            ('home_docente', docente, 'get', home, None, 200, None),
+            ('home_coordinador', coordinador, 'get', home, None, 200, None),
+            ('home_administrador', admin, 'get', home, None, 200, None),
+            ('home_referente', referente, 'get', home, None, 200, None),
+            ('home_supervisor', supervisor, 'get', home, None, 200, None),
+            ('marcar_presente', alumno, 'get', reverse('asistencias:marcar_presente', args=[clase.pk]),
+             None, 302, desmarcar),
+            ('calendario_referente', referente, 'get',
+             reverse('asistencias:calendario_referente', args=[diplomatura.pk]), None, 200, None),
+            ('exportar_xlsx', admin, 'get', reverse('asistencias:exportar_xlsx'), None, 200, None),
+            ('exportar_asistencia_diplomatura', coordinador, 'get',
+             reverse('asistencias:exportar_asistencia_diplomatura', args=[diplomatura.pk]), None, 200, None),
+            ('exportar_reportes', admin, 'get', reverse('asistencias:exportar_reportes'), None, 200, None),
+            ('generar_constancia', coordinador, 'post', reverse('asistencias:generar_constancia'),
+             {'dni': alumno.dni}, 200, None),
+            ('consulta_publica_dni', None, 'get', consulta, {'dni': alumno.dni}, 200, None),
+            ('consulta_publica_alumno', alumno, 'get', consulta, None, 200, None),
+        ]
+
+    def _usuario_bench(self, p, nivel):
+        # seed_scale no genera estos niveles; el email cae en el patrón que borra seed_scale --borrar
+        u, creado = User.objects.get_or_create(
+            email=f"{p}.bench{nivel}@{DOMINIO}",
+            defaults={'nivel': nivel, 'dni': f"{p}b{nivel}", 'first_name': 'Bench', 'last_name': f"Nivel {nivel}"},
+        )
+        if creado:
+            u.set_unusable_password()
+            u.save(update_fields=['password'])
+        return u
+
+    def _dataset(self, p):
+        dips = Diplomatura.objects.filter(codigo__startswith=f"{p}D")
+        return {
+            'prefijo': p,
+            'materias': Materia.objects.filter(diplomatura__in=dips).count(),
+            'clases': Clase.objects.filter(materia__diplomatura__in=dips).count(),
+            'inscripciones': InscripcionMateria.objects.filter(materia__diplomatura__in=dips).count(),
+            'asistencias': Asistencia.objects.filter(clase__materia__diplomatura__in=dips).count(),
+        }
+
+    # --- Medición ---
+
+    def _request(self, client, metodo, url, datos, preparar):
+        if preparar:
+            preparar()
+        if self.o['sin_cache']:
+            cache.clear()
+        sql = _ContadorSQL()
+        with connection.execute_wrapper(sql):
+            t0 = time.perf_counter()
+            resp = getattr(client, metodo)(url, datos)
+            if resp.streaming:
+                for _ in resp.streaming_content:
+                    pass
+            else:
+                resp.content
+            ms = (time.perf_counter() - t0) * 1000
+        return resp, ms, sql.consultas, sql.segundos * 1000
+
+    def _medir(self, usuario, metodo, url, datos, esperado, preparar):
+        client = Client(raise_request_exception=True)
+        if usuario is not None:
+            client.force_login(usuario)
+        try:
+            # Calentamiento: imports perezosos, templates compilados y caché poblada
+            resp, *_ = self._request(client, metodo, url, datos, preparar)
+            if resp.status_code != esperado:
+                return {'error': f"status {resp.status_code} (se esperaba {esperado})"}
+
+            tiempos, sql, consultas = [], [], 0
+            for _ in range(self.o['repeticiones']):
+                _, ms, consultas, sql_ms = self._request(client, metodo, url, datos, preparar)
+                tiempos.append(ms)
+                sql.append(sql_ms)
+
+            # El pico de memoria se mide aparte: tracemalloc frena mucho la ejecución
+            tracemalloc.start()
+            try:
+                self._request(client, metodo, url, datos, preparar)
+                pico = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}".splitlines()[0][:200]}
+
+        return {
+            'ms': round(statistics.median(tiempos), 2),
+            'sql_ms': round(statistics.median(sql), 2),
+            'consultas': consultas,
+            'memoria_kb': round(pico / 1024, 1),
+        }
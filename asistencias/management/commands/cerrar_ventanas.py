@@ -0,0 +1,52 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from asistencias import cache as cache_versiones
+from asistencias.models import Clase
+
+
+class Command(BaseCommand):
+    help = (
+        "Cierra las ventanas de asistencia vencidas: registra presente=False para cada inscripto "
+        "sin asistencia (un bulk_create por clase). Pensado para cron, ej. cada 15 minutos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde-dias', type=int, default=30,
+                            help="Solo ventanas que cerraron en los últimos N días (más para completar históricos).")
+        parser.add_argument('--dry-run', action='store_true', help="Solo listar las clases a cerrar.")
+
+    def handle(self, *args, **o):
+        ahora = timezone.now()
+        # Sin cerrar, o cerradas antes de que el docente corriera hora_fin (ventana reabierta)
+        clases = (Clase.objects
+                  .filter(hora_fin__range=(ahora - datetime.timedelta(days=o['desde_dias']), ahora))
+                  .filter(Q(cerrada_en__isnull=True) | Q(cerrada_en__lt=F('hora_fin')))
+                  .select_related('materia')
+                  .order_by('hora_fin'))
+
+        if o['dry_run']:
+            n = 0
+            for clase in clases:
+                n += 1
+                self.stdout.write(f"  {clase}")
+            self.stdout.write(f"Se cerrarían {n} clases (--dry-run).")
+            return
+
+        cerradas = ausentes = 0
+        materias = {}
+        for clase in clases.iterator():
+            with transaction.atomic():
+                ausentes += clase.cerrar_ventana()
+            cerradas += 1
+            materias[clase.materia_id] = clase.materia.diplomatura_id
+
+        # bulk_create no manda señales: se invalida el cache una vez por materia
+        for materia_id, diplomatura_id in materias.items():
+            cache_versiones.invalidar_materia(materia_id, diplomatura_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Clases cerradas: {cerradas}, ausentes registrados: {ausentes}"))
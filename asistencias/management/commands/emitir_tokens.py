@@ -0,0 +1,50 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from asistencias import documentos, tokens
+from asistencias.models import AccesoToken, Materia
+
+
+class Command(BaseCommand):
+    help = (
+        "Emite N tokens de acceso (un bulk_create) y los exporta como CSV o como planilla PDF "
+        "para imprimir, un código por celda."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('cantidad', type=int)
+        parser.add_argument('--nivel', type=int, default=2, choices=[n for n, _ in AccesoToken.NIVEL_CHOICES])
+        parser.add_argument('--materia', metavar='CODIGO', help="Materia a la que asocia el token (como adjunto).")
+        parser.add_argument('--dias', type=int, help="Vencen en N días (por defecto no vencen).")
+        parser.add_argument('--formato', choices=['csv', 'pdf'], default='csv')
+        parser.add_argument('--salida', help="Archivo de salida (por defecto, CSV por stdout).")
+
+    def handle(self, *args, **o):
+        materia = None
+        if o['materia']:
+            materia = Materia.objects.filter(codigo=o['materia']).first()
+            if materia is None:
+                raise CommandError(f"No existe la materia {o['materia']}")
+        if o['formato'] == 'pdf' and not o['salida']:
+            raise CommandError("--formato pdf requiere --salida")
+        expires_at = timezone.now() + datetime.timedelta(days=o['dias']) if o['dias'] else None
+
+        try:
+            emitidos = tokens.emitir(o['cantidad'], o['nivel'], materia=materia, expires_at=expires_at)
+        except ValueError as e:
+            raise CommandError(e)
+
+        if o['formato'] == 'pdf':
+            titulo = f"Tokens de acceso · {materia.nombre}" if materia else "Tokens de acceso"
+            with open(o['salida'], 'wb') as f:
+                f.write(documentos.cargar('pdf').planilla_tokens(emitidos, titulo=titulo))
+        elif o['salida']:
+            with open(o['salida'], 'w', newline='', encoding='utf-8') as f:
+                tokens.escribir_csv(emitidos, f)
+        else:
+            tokens.escribir_csv(emitidos, self.stdout)
+        # con CSV por stdout el resumen va a stderr para no mezclarlo con los datos
+        salida = self.stderr if o['formato'] == 'csv' and not o['salida'] else self.stdout
+        salida.write(f"Tokens emitidos: {len(emitidos)}")
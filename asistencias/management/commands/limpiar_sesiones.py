@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Borra las sesiones vencidas de django_session por lotes (para no bloquear la tabla)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pausa', type=float, default=0.0, help="Segundos de espera entre lotes.")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write("SESSION_ENGINE usa cookies firmadas: no hay sesiones en la base.")
+            return
+
+        ahora = timezone.now()
+        total = 0
+        while True:
+            claves = list(Session.objects.filter(expire_date__lt=ahora)
+                          .values_list('session_key', flat=True)[:options['batch_size']])
+            if not claves:
+                break
+            borradas, _ = Session.objects.filter(session_key__in=claves).delete()
+            total += borradas
+            self.stdout.write(f"  lote: {borradas} sesiones")
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f"Sesiones vencidas borradas: {total}"))
@@ -0,0 +1,89 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+SERVIDORES = {
+    'wsgi': ['diplomaturas.wsgi:application'],
+    'asgi': ['diplomaturas.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga local: levanta gunicorn en modo WSGI y en modo ASGI (uvicorn) con la "
+        "misma cantidad de workers, les pega con N requests concurrentes y compara el throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/publico/', help="Ruta a probar (ej: /publico/, /api/calendario/).")
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--cookie', default='', help="Cookie a enviar (ej: sessionid=...) para rutas con login.")
+        parser.add_argument('--solo', choices=SERVIDORES.keys(), help="Probar un solo modo.")
+
+    def handle(self, *args, **options):
+        modos = [options['solo']] if options['solo'] else list(SERVIDORES)
+        url = f"http://127.0.0.1:{options['port']}{options['path']}"
+        resultados = {}
+        for modo in modos:
+            proc = self._levantar(modo, options)
+            try:
+                self._get(url, options['cookie'])  # calentamiento
+                resultados[modo] = self._cargar(url, options)
+            finally:
+                proc.send_signal(signal.SIGTERM)
+                proc.wait(timeout=30)
+
+        self.stdout.write(f"{options['path']} | workers={options['workers']} | concurrencia={options['concurrency']} "
+                          f"| requests={options['requests']}")
+        self.stdout.write(f"{'modo':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errores':>10}")
+        for modo, (rps, p50, p95, errores) in resultados.items():
+            self.stdout.write(f"{modo:<6}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}{errores:>10}")
+
+    def _levantar(self, modo, options):
+        cmd = [sys.executable, '-m', 'gunicorn', *SERVIDORES[modo],
+               '--workers', str(options['workers']), '--bind', f"127.0.0.1:{options['port']}",
+               '--log-level', 'warning']
+        proc = subprocess.Popen(cmd, env=os.environ.copy())
+        limite = time.time() + 30
+        while time.time() < limite:
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=0.5).close()
+                return proc
+            except OSError:
+                if proc.poll() is not None:
+                    break
+                time.sleep(0.2)
+        proc.kill()
+        raise CommandError(f"No se pudo levantar gunicorn en modo {modo}.")
+
+    def _get(self, url, cookie):
+        req = urllib.request.Request(url, headers={'Cookie': cookie} if cookie else {})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                resp.read()
+                ok = resp.status < 500
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return (time.perf_counter() - t0) * 1000, ok
+
+    def _cargar(self, url, options):
+        n = options['requests']
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            resultados = list(pool.map(lambda _: self._get(url, options['cookie']), range(n)))
+        total = time.perf_counter() - t0
+        tiempos = sorted(ms for ms, _ in resultados)
+        errores = sum(1 for _, ok in resultados if not ok)
+        return n / total, tiempos[n // 2], tiempos[int(n * 0.95) - 1], errores
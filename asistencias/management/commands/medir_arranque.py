@@ -0,0 +1,152 @@
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from asistencias import documentos
+
+# Corre en un intérprete limpio: mide lo que paga cada worker al importar la app
+CODIGO = """
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns  # importa el URLconf y todas las vistas, como el primer request
+app = time.perf_counter() - t0
+from asistencias import documentos
+for formato in sys.argv[1:]:
+    documentos.cargar(formato)
+total = time.perf_counter() - t0
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+print(json.dumps({'app_ms': app * 1000, 'total_ms': total * 1000, 'rss_kb': rss_kb(), 'modulos': len(sys.modules)}))
+"""
+
+
+def _memoria(pid):
+    """(RSS, PSS) en KB de un proceso, de /proc/<pid>/smaps_rollup (Linux)."""
+    valores = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linea in f:
+            partes = linea.split()
+            if partes and partes[0] in ('Rss:', 'Pss:'):
+                valores[partes[0]] = int(partes[1])
+    return valores['Rss:'], valores['Pss:']
+
+
+def _hijos(pid):
+    try:
+        return [int(p) for p in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+    except OSError:
+        return []
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de arranque de un worker: tiempo de importar la app (django.setup + URLconf) "
+        "y RSS, sin motores de documentos (como queda con la carga perezosa) y con openpyxl/reportlab "
+        "importados de entrada (como era antes). Con --gunicorn compara la memoria real por worker "
+        "con y sin preload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--gunicorn', action='store_true', help="Medir RSS/PSS de workers de gunicorn (Linux).")
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--port', type=int, default=8766)
+
+    def handle(self, *args, **o):
+        formatos = list(documentos.formatos())
+        escenarios = [('perezoso (sin motores)', [])]
+        escenarios += [(f"+ {f}", [f]) for f in formatos]
+        escenarios += [('todos de entrada (antes)', formatos)]
+
+        self.stdout.write(f"{'escenario':<28}{'app ms':>9}{'total ms':>10}{'RSS MB':>9}{'módulos':>9}")
+        base = None
+        for nombre, motores in escenarios:
+            r = self._medir(motores, o['repeticiones'])
+            base = base or r
+            self.stdout.write(f"{nombre:<28}{r['app_ms']:>9.0f}{r['total_ms']:>10.0f}"
+                              f"{r['rss_kb'] / 1024:>9.1f}{r['modulos']:>9}")
+        self.stdout.write(f"Cargar todos los motores de entrada cuesta {r['total_ms'] - base['total_ms']:.0f} ms "
+                          f"y {(r['rss_kb'] - base['rss_kb']) / 1024:.1f} MB por worker.")
+
+        if o['gunicorn']:
+            self._gunicorn(o)
+
+    def _medir(self, motores, repeticiones):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'diplomaturas.settings')}
+        corridas = []
+        for _ in range(repeticiones):
+            out = subprocess.run([sys.executable, '-c', CODIGO, *motores], env=env, cwd=settings.BASE_DIR,
+                                 capture_output=True, text=True, check=True).stdout
+            corridas.append(json.loads(out.strip().splitlines()[-1]))
+        return {k: statistics.median(c[k] for c in corridas) for k in corridas[0]}
+
+    # --- gunicorn ---
+
+    def _gunicorn(self, o):
+        if not Path('/proc/self/smaps_rollup').exists():
+            raise CommandError("--gunicorn necesita /proc/<pid>/smaps_rollup (Linux).")
+        self.stdout.write("")
+        self.stdout.write(f"gunicorn, {o['workers']} workers en reposo (PSS reparte las páginas compartidas):")
+        self.stdout.write(f"{'preload':<10}{'RSS/worker MB':>15}{'PSS/worker MB':>15}{'PSS total MB':>14}")
+        for preload in (False, True):
+            master = self._levantar(preload, o)
+            try:
+                workers = self._esperar_workers(master, o['workers'])
+                mem = [_memoria(pid) for pid in workers]
+                pss_total = sum(p for _, p in mem) + _memoria(master.pid)[1]
+            finally:
+                master.send_signal(signal.SIGTERM)
+                master.wait(timeout=30)
+            self.stdout.write(f"{'sí' if preload else 'no':<10}{statistics.mean(r for r, _ in mem) / 1024:>15.1f}"
+                              f"{statistics.mean(p for _, p in mem) / 1024:>15.1f}{pss_total / 1024:>14.1f}")
+
+    def _levantar(self, preload, o):
+        cmd = [sys.executable, '-m', 'gunicorn', 'diplomaturas.wsgi:application', '-c', 'gunicorn.conf.py',
+               '--workers', str(o['workers']), '--bind', f"127.0.0.1:{o['port']}", '--log-level', 'warning']
+        env = {**os.environ, 'GUNICORN_PRELOAD': str(preload)}
+        proc = subprocess.Popen(cmd, env=env, cwd=settings.BASE_DIR)
+        limite = time.time() + 30
+        while time.time() < limite:
+            try:
+                socket.create_connection(('127.0.0.1', o['port']), timeout=0.5).close()
+                return proc
+            except OSError:
+                if proc.poll() is not None:
+                    break
+                time.sleep(0.2)
+        proc.kill()
+        raise CommandError("No se pudo levantar gunicorn.")
+
+    def _esperar_workers(self, master, cantidad):
+        # Sin preload cada worker importa la app después del fork: esperar a que termine
+        limite = time.time() + 60
+        while time.time() < limite:
+            hijos = _hijos(master.pid)
+            if len(hijos) >= cantidad:
+                time.sleep(3)
+                return _hijos(master.pid)
+            time.sleep(0.2)
+        raise CommandError("Los workers de gunicorn no arrancaron.")
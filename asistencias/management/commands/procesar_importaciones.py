@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asistencias.importador import procesar_pendientes
+
+ESPERA_MAX = 300    # tope del backoff ante fallas repetidas (base caída, etc.)
+
+
+class Command(BaseCommand):
+    help = ("Worker de importaciones de inscripciones: analiza los archivos pendientes (dry-run) "
+            "y aplica los confirmados por el coordinador.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help="Procesa la cola actual y termina.")
+        parser.add_argument('--intervalo', type=float, default=5.0, help="Segundos entre revisiones de la cola.")
+
+    def handle(self, *args, **options):
+        fallos = 0
+        while True:
+            try:
+                hechos = procesar_pendientes()
+            except Exception as e:
+                # Un trabajo fallido ya quedó en error; lo que se repite es infraestructura
+                # (OperationalError con la base caída): cuenta como nada hecho y espera más cada vez
+                if options['una_vez']:
+                    raise CommandError(f"Importación fallida: {e}")
+                self.stderr.write(f"Importación fallida: {e}")
+                fallos += 1
+                time.sleep(min(options['intervalo'] * 2 ** fallos, ESPERA_MAX))
+                continue
+            fallos = 0
+            if hechos:
+                self.stdout.write(f"  {hechos} trabajo(s) procesado(s)")
+            elif options['una_vez']:
+                break
+            else:
+                time.sleep(options['intervalo'])
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from asistencias.models import Nota, NotaArchivada, ResumenNota
+
+
+class Command(BaseCommand):
+    help = ("Recalcula desde cero la tabla de resúmenes de notas (alumno, materia), "
+            "con las notas vivas y las archivadas.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--materia', type=int, action='append',
+                            help="Limitar el recálculo a esta materia (id; se puede repetir).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fuentes = [Nota.objects.all(), NotaArchivada.objects.all()]
+        resumenes = ResumenNota.objects.all()
+        if options['materia']:
+            fuentes = [qs.filter(materia_id__in=options['materia']) for qs in fuentes]
+            resumenes = resumenes.filter(materia_id__in=options['materia'])
+
+        agregados = {}
+        ultimas = {}
+        for notas in fuentes:
+            # 1. Cantidad y suma agrupadas en una sola consulta por tabla
+            for r in notas.values('alumno_id', 'materia_id').annotate(cantidad=Count('id'), suma=Sum('valor')):
+                a = agregados.setdefault((r['alumno_id'], r['materia_id']), {'cantidad': 0, 'suma': 0})
+                a['cantidad'] += r['cantidad']
+                a['suma'] += r['suma']
+
+            # 2. Última nota por par: la primera de cada grupo al ordenar por fecha descendente;
+            # entre tablas gana la de (fecha, id) mayor (las archivadas conservan su id)
+            primeras = {}
+            for alumno_id, materia_id, valor, fecha, nota_id in (
+                    notas.order_by('alumno_id', 'materia_id', '-fecha', '-id')
+                    .values_list('alumno_id', 'materia_id', 'valor', 'fecha', 'id').iterator()):
+                primeras.setdefault((alumno_id, materia_id), (fecha, nota_id, valor))
+            for key, ultima in primeras.items():
+                if key not in ultimas or ultima > ultimas[key]:
+                    ultimas[key] = ultima
+
+        nuevos = []
+        for key, r in agregados.items():
+            fecha, _, valor = ultimas[key]
+            nuevos.append(ResumenNota(
+                alumno_id=key[0], materia_id=key[1],
+                cantidad=r['cantidad'], suma=r['suma'],
+                promedio=round(r['suma'] / r['cantidad'], 2),
+                ultima_nota=valor, ultima_fecha=fecha,
+            ))
+
+        with transaction.atomic():
+            resumenes.delete()
+            ResumenNota.objects.bulk_create(nuevos, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes recalculados: {len(nuevos)}"))
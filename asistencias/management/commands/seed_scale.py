@@ -0,0 +1,286 @@
+import datetime
+import multiprocessing
+import os
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from asistencias import cache as cache_versiones
+from asistencias.models import (
+    User, Diplomatura, Materia, ProfesorMateria, Clase, Asistencia, Nota, ResumenNota,
+    InscripcionDiplomatura, InscripcionMateria,
+)
+from asistencias.permissions import invalidar_membresias
+
+DOMINIO = 'seed.local'
+PASSWORD = 'seed1234'  # todos los usuarios generados, para poder loguearse en benchmarks
+
+
+def _rng(seed, *partes):
+    # Un generador por unidad de trabajo: el resultado no depende del orden ni de la cantidad de procesos
+    return random.Random(":".join(map(str, (seed, *partes))))
+
+
+@contextmanager
+def _sin_auto_now_add(modelo, campo):
+    # Para poder fechar las asistencias dentro de la ventana de cada clase
+    f = modelo._meta.get_field(campo)
+    f.auto_now_add = False
+    try:
+        yield
+    finally:
+        f.auto_now_add = True
+
+
+def _iniciar_worker():
+    # Con spawn (macOS/Windows) el proceso hijo arranca sin Django configurado
+    import django
+    django.setup()
+
+
+def _trabajo_materias(args):
+    """Genera asistencias y notas de un grupo de materias. Corre en un proceso aparte."""
+    materia_ids, seed, tasa, notas_por_insc, chunk = args
+    asistencias = notas = 0
+    with _sin_auto_now_add(Asistencia, 'timestamp'):
+        for mid in materia_ids:
+            materia = Materia.objects.only('codigo', 'profesor_titular_id').get(pk=mid)
+            rng = _rng(seed, 'materia', materia.codigo)
+            alumnos = list(InscripcionMateria.objects.filter(materia_id=mid).order_by('user_id')
+                           .values_list('user_id', flat=True))
+            clases = list(Clase.objects.filter(materia_id=mid).order_by('fecha')
+                          .values_list('id', 'fecha', 'hora_inicio', 'hora_fin'))
+
+            with transaction.atomic():  # un commit por materia, no por lote
+                lote = []
+                for clase_id, fecha, inicio, fin in clases:
+                    ventana = max(int((fin - inicio).total_seconds()), 1)
+                    for uid in alumnos:
+                        if rng.random() < tasa:
+                            lote.append(Asistencia(clase_id=clase_id, user_id=uid, presente=True,
+                                                   timestamp=inicio + datetime.timedelta(seconds=rng.randrange(ventana))))
+                        if len(lote) >= chunk:
+                            asistencias += len(Asistencia.objects.bulk_create(lote, ignore_conflicts=True))
+                            lote = []
+                if lote:
+                    asistencias += len(Asistencia.objects.bulk_create(lote, ignore_conflicts=True))
+
+                fechas = [c[1] for c in clases] or [datetime.date.today()]
+                lote = [
+                    Nota(alumno_id=uid, materia_id=mid, evaluador_id=materia.profesor_titular_id,
+                         valor=Decimal(rng.randint(100, 1000)) / 100, fecha=rng.choice(fechas))
+                    for uid in alumnos for _ in range(notas_por_insc)
+                ]
+                Nota.objects.bulk_create(lote, batch_size=chunk)
+                notas += len(lote)
+    return asistencias, notas
+
+
+def _trabajo_en_proceso(args):
+    try:
+        return _trabajo_materias(args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ("Genera un dataset sintético grande y determinístico (diplomaturas, materias, clases, "
+            "inscripciones, asistencias y notas) para pruebas de carga y benchmarks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--diplomaturas', type=int, default=10)
+        parser.add_argument('--materias', type=int, default=20, help="Materias por diplomatura.")
+        parser.add_argument('--alumnos', type=int, default=5000)
+        parser.add_argument('--docentes', type=int, default=100)
+        parser.add_argument('--materias-por-alumno', type=int, default=5)
+        parser.add_argument('--clases', type=int, default=30, help="Clases (semanales) por materia.")
+        parser.add_argument('--tasa-asistencia', type=float, default=0.8)
+        parser.add_argument('--notas', type=int, default=2, help="Notas por inscripción a materia.")
+        parser.add_argument('--desde', default='2025-03-03', help="Fecha de la primera clase (AAAA-MM-DD).")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefijo', default='sc', help="Prefijo de códigos y emails (máx. 4 caracteres).")
+        parser.add_argument('--dni-base', type=int, default=90_000_000)
+        parser.add_argument('--procesos', type=int, default=None,
+                            help="Procesos para asistencias/notas (por defecto: CPUs; 1 con SQLite).")
+        parser.add_argument('--chunk', type=int, default=5000, help="Filas por bulk_create.")
+        parser.add_argument('--borrar', action='store_true', help="Borra el dataset con este prefijo y termina.")
+
+    def handle(self, *args, **o):
+        if len(o['prefijo']) > 4:
+            raise CommandError("El prefijo puede tener hasta 4 caracteres (los códigos tienen 20).")
+        self.o = o
+        self.rng = lambda *partes: _rng(o['seed'], *partes)
+        t0 = time.perf_counter()
+
+        if o['borrar']:
+            self._borrar()
+            self.stdout.write(self.style.SUCCESS(f"Dataset '{o['prefijo']}' borrado ({time.perf_counter() - t0:.1f}s)"))
+            return
+        if Diplomatura.objects.filter(codigo__startswith=f"{o['prefijo']}D").exists():
+            raise CommandError(f"Ya existe un dataset con prefijo '{o['prefijo']}': usar --borrar o otro --prefijo.")
+
+        with transaction.atomic():
+            alumnos, docentes, coordinadores = self._usuarios()
+            materias = self._catalogo(docentes, coordinadores)
+            self._inscripciones(alumnos, materias)
+            self._clases(materias)
+        self._paso("catálogo, usuarios, inscripciones y clases", t0)
+
+        t1 = time.perf_counter()
+        materia_ids = [m.pk for ms in materias.values() for m in ms]
+        asistencias, notas = self._asistencias_y_notas(materia_ids)
+        self._paso(f"{asistencias} asistencias y {notas} notas", t1)
+
+        t1 = time.perf_counter()
+        # Solo las materias generadas: los resúmenes de otros datos (y de materias archivadas) no se tocan
+        call_command('recalcular_resumen_notas', materia=materia_ids, stdout=StringIO())
+        self._paso("resúmenes de notas", t1)
+
+        # bulk_create no dispara señales
+        cache_versiones.invalidar_catalogo()
+        invalidar_membresias()
+        self.stdout.write(self.style.SUCCESS(f"Listo en {time.perf_counter() - t0:.1f}s. Password de los usuarios: {PASSWORD}"))
+
+    def _paso(self, que, t0):
+        self.stdout.write(f"  {que}: {time.perf_counter() - t0:.1f}s")
+
+    def _bulk(self, modelo, objs, **kwargs):
+        return modelo.objects.bulk_create(objs, batch_size=self.o['chunk'], **kwargs)
+
+    # --- Etapas ---
+
+    def _usuarios(self):
+        o, p = self.o, self.o['prefijo']
+        password = make_password(PASSWORD)  # un solo hash para todos: hashear miles lleva minutos
+        rng = self.rng('usuarios')
+        nombres = ['Ana', 'Luis', 'María', 'Juan', 'Sofía', 'Pedro', 'Lucía', 'Diego', 'Valentina', 'Martín']
+        apellidos = ['García', 'Fernández', 'López', 'Martínez', 'Gómez', 'Díaz', 'Pérez', 'Romero', 'Sosa', 'Ruiz']
+
+        def usuario(rol, i, nivel, dni):
+            return User(email=f"{p}.{rol}{i}@{DOMINIO}", dni=str(dni), nivel=nivel, password=password,
+                        first_name=rng.choice(nombres), last_name=rng.choice(apellidos))
+
+        base = o['dni_base']
+        usuarios = [usuario('a', i, 1, base + i) for i in range(o['alumnos'])]
+        base += o['alumnos']
+        usuarios += [usuario('d', i, 2, base + i) for i in range(o['docentes'])]
+        base += o['docentes']
+        usuarios += [usuario('c', i, 3, base + i) for i in range(o['diplomaturas'])]
+        self._bulk(User, usuarios)
+
+        ids = dict(User.objects.filter(email__startswith=f"{p}.", email__endswith=f"@{DOMINIO}")
+                   .values_list('email', 'id'))
+        por_rol = lambda rol, n: [ids[f"{p}.{rol}{i}@{DOMINIO}"] for i in range(n)]
+        return por_rol('a', o['alumnos']), por_rol('d', o['docentes']), por_rol('c', o['diplomaturas'])
+
+    def _catalogo(self, docentes, coordinadores):
+        o, p = self.o, self.o['prefijo']
+        self._bulk(Diplomatura, [
+            Diplomatura(nombre=f"Diplomatura {p.upper()} {i + 1:03d}", codigo=f"{p}D{i:03d}",
+                        descripcion="Generada por seed_scale", creada_por_id=coordinadores[i])
+            for i in range(o['diplomaturas'])
+        ])
+        dips = list(Diplomatura.objects.filter(codigo__startswith=f"{p}D").order_by('codigo'))
+        Diplomatura.coordinadores.through.objects.bulk_create([
+            Diplomatura.coordinadores.through(diplomatura_id=d.pk, user_id=coordinadores[i])
+            for i, d in enumerate(dips)
+        ])
+
+        rng = self.rng('materias')
+        self._bulk(Materia, [
+            Materia(diplomatura=d, nombre=f"Materia {j + 1:03d}", codigo=f"{d.codigo}M{j:03d}",
+                    profesor_titular_id=rng.choice(docentes) if docentes else None)
+            for d in dips for j in range(o['materias'])
+        ])
+        materias = {}
+        for m in Materia.objects.filter(diplomatura__in=dips).order_by('codigo'):
+            materias.setdefault(m.diplomatura_id, []).append(m)
+
+        if docentes:
+            adjuntos = []
+            for ms in materias.values():
+                for m in ms:
+                    adj = rng.choice(docentes)
+                    if adj != m.profesor_titular_id:
+                        adjuntos.append(ProfesorMateria(user_id=adj, materia=m, rol='adjunto'))
+            self._bulk(ProfesorMateria, adjuntos, ignore_conflicts=True)
+        return materias
+
+    def _inscripciones(self, alumnos, materias):
+        rng = self.rng('inscripciones')
+        dips = list(materias)
+        insc_d, insc_m = [], []
+        for uid in alumnos:
+            dip = rng.choice(dips)
+            insc_d.append(InscripcionDiplomatura(user_id=uid, diplomatura_id=dip))
+            for m in rng.sample(materias[dip], min(self.o['materias_por_alumno'], len(materias[dip]))):
+                insc_m.append(InscripcionMateria(user_id=uid, materia=m))
+        self._bulk(InscripcionDiplomatura, insc_d)
+        self._bulk(InscripcionMateria, insc_m)
+
+    def _clases(self, materias):
+        desde = datetime.date.fromisoformat(self.o['desde'])
+        tz = timezone.get_current_timezone()
+        rng = self.rng('clases')
+        clases = []
+        for ms in materias.values():
+            for m in ms:
+                dia = desde + datetime.timedelta(days=rng.randrange(5))  # lunes a viernes
+                hora = rng.choice([9, 14, 18])
+                for k in range(self.o['clases']):
+                    fecha = dia + datetime.timedelta(weeks=k)
+                    inicio = timezone.make_aware(datetime.datetime.combine(fecha, datetime.time(hora)), tz)
+                    clases.append(Clase(materia=m, fecha=fecha, hora_inicio=inicio,
+                                        hora_fin=inicio + datetime.timedelta(hours=2), tema=f"Clase {k + 1}"))
+        self._bulk(Clase, clases)
+
+    def _asistencias_y_notas(self, materia_ids):
+        o = self.o
+        procesos = o['procesos'] or (1 if connection.vendor == 'sqlite' else os.cpu_count() or 1)
+        grupos = [materia_ids[i::procesos * 4] for i in range(procesos * 4)]
+        trabajos = [(g, o['seed'], o['tasa_asistencia'], o['notas'], o['chunk']) for g in grupos if g]
+
+        if procesos == 1:
+            resultados = [_trabajo_materias(t) for t in trabajos]
+        else:
+            # Los hijos no pueden heredar conexiones abiertas del padre
+            connections.close_all()
+            metodos = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context('fork' if 'fork' in metodos else 'spawn')
+            with ctx.Pool(procesos, initializer=None if 'fork' in metodos else _iniciar_worker) as pool:
+                resultados = pool.map(_trabajo_en_proceso, trabajos)
+        return sum(r[0] for r in resultados), sum(r[1] for r in resultados)
+
+    def _borrar(self):
+        p = self.o['prefijo']
+        dips = Diplomatura.objects.filter(codigo__startswith=f"{p}D")
+        clases = Clase.objects.filter(materia__diplomatura__in=dips).values('id')
+        materias = Materia.objects.filter(diplomatura__in=dips).values('id')
+        usuarios = User.objects.filter(email__startswith=f"{p}.", email__endswith=f"@{DOMINIO}").values('id')
+
+        # DELETE ... WHERE x IN (subconsulta): el borrado en cascada del ORM traería
+        # cada fila a memoria (hay señales sobre Asistencia/Nota) y tardaría minutos
+        borrados = [
+            (Asistencia, 'clase_id', clases), (Nota, 'materia_id', materias),
+            (ResumenNota, 'materia_id', materias), (InscripcionMateria, 'materia_id', materias),
+            (ProfesorMateria, 'materia_id', materias), (Clase, 'materia_id', materias),
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            for modelo, columna, sub in borrados:
+                sql, params = sub.query.sql_with_params()
+                cursor.execute(f"DELETE FROM {modelo._meta.db_table} WHERE {columna} IN ({sql})", params)
+                self.stdout.write(f"  {modelo.__name__}: {cursor.rowcount}")
+            InscripcionDiplomatura.objects.filter(diplomatura__in=dips).delete()
+            Materia.objects.filter(diplomatura__in=dips).delete()
+            dips.delete()
+            User.objects.filter(id__in=usuarios).delete()
+        cache_versiones.invalidar_catalogo()
+        invalidar_membresias()
@@ -1,22 +1,265 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponseForbidden
+from django.urls import reverse
 from django.utils.functional import SimpleLazyObject
 
-class RoleSwitchMiddleware:
+from . import checkin, instrumentacion, perfilado, replica
+
+log_rendimiento = logging.getLogger('asistencias.rendimiento')
+
+
+class _SyncAsyncMiddleware:
+    """Base para middlewares que funcionan tanto bajo WSGI como ASGI."""
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+def _fijar_usuario(request, user):
+    # request.user y request.auser() devuelven la misma instancia (con el nivel efectivo),
+    # así las vistas async no vuelven a leer el usuario de la base.
+    async def auser():
+        return user
+    request.user = user
+    request.auser = auser
+
+
+class CheckinQRMiddleware(_SyncAsyncMiddleware):
+    """
+    Rechaza los QR de check-in inválidos (/c/<código>/) antes que RoleSwitchMiddleware, que lee
+    el usuario de la base: un código adulterado o vencido se contesta con 403 sin ninguna consulta,
+    con o sin sesión iniciada. Las demás rutas solo pagan una comparación de prefijo.
+    """
+    _prefijo = None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._rechazo(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._rechazo(request) or await self.get_response(request)
+
+    def _rechazo(self, request):
+        if self._prefijo is None:
+            CheckinQRMiddleware._prefijo = reverse('asistencias:usar_qr', args=['0'])[:-2]
+        if not request.path.startswith(self._prefijo):
+            return None
+        codigo = request.path[len(self._prefijo):].removesuffix('/')
+        if '/' in codigo:
+            return None
+        try:
+            checkin.verificar_escaneo(request, codigo)
+        except checkin.CodigoInvalido as e:
+            return HttpResponseForbidden(f"QR inválido ({e.motivo}).")
+        return None
+
+
+class RoleSwitchMiddleware(_SyncAsyncMiddleware):
+    """
+    Separa el nivel real del efectivo:
+    - request.nivel_real: nivel guardado en la base (nunca se modifica).
+    - request.nivel_efectivo: nivel con el que se evalúan permisos (puede ser el impersonado).
+    request.user.nivel refleja el efectivo para que vistas y templates no cambien;
+    User.save() persiste siempre el real mientras dure la impersonación.
+    """
 
     def __call__(self, request):
-        if request.user.is_authenticated and request.user.nivel == 7: # Supervisor
-            # Check if there is a role switch in session
+        if self.async_mode:
+            return self.__acall__(request)
+        user = request.user
+        target_role = None
+        if user.is_authenticated and user.nivel == 7: # Supervisor
             target_role = request.session.get('impersonate_role')
+        self._aplicar(request, user, target_role)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        target_role = None
+        if user.is_authenticated and user.nivel == 7:
+            target_role = await request.session.aget('impersonate_role')
+        self._aplicar(request, user, target_role)
+        return await self.get_response(request)
+
+    def _aplicar(self, request, user, target_role):
+        request.nivel_real = request.nivel_efectivo = None
+        if user.is_authenticated:
+            request.nivel_real = request.nivel_efectivo = user.nivel
             if target_role:
-                # Override the user's nivel for this request only
-                # We use a simple assignment because request.user is mutable in the request cycle
-                # But we must be careful not to save this user object to DB with the wrong level
-                # The view code should just read request.user.nivel
                 try:
-                    request.user.nivel = int(target_role)
+                    request.nivel_efectivo = int(target_role)
                 except (ValueError, TypeError):
                     pass
-        
-        response = self.get_response(request)
+            if request.nivel_efectivo != request.nivel_real:
+                user.impersonar(request.nivel_efectivo)
+        _fijar_usuario(request, user)
+
+
+class MembresiasMiddleware(_SyncAsyncMiddleware):
+    """
+    Adjunta request.membresias: se resuelve (una sola consulta) recién al primer uso.
+    Las vistas async usan `await request.amembresias()`.
+    """
+
+    def __call__(self, request):
+        self._adjuntar(request)
+        return self.get_response(request)
+
+    def _adjuntar(self, request):
+        from .permissions import Membresias
+        request.membresias = SimpleLazyObject(lambda: Membresias.cargar(request.user))
+
+        async def amembresias():
+            if not hasattr(request, '_amembresias'):
+                request._amembresias = await Membresias.acargar(await request.auser())
+            return request._amembresias
+        request.amembresias = amembresias
+
+
+class LecturaPropiaMiddleware(_SyncAsyncMiddleware):
+    """
+    Leer lo propio con réplica (ver asistencias.replica): si el request escribió, deja la cookie
+    que fija el navegador a la primaria por REPLICA_FIJAR_SEGUNDOS; mientras esté, los reportes
+    de ese usuario no leen de la réplica. Sin réplica configurada no se instala.
+    """
+
+    def __init__(self, get_response):
+        if not replica.activa():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        estado, token = replica.iniciar_request(replica.COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica.terminar_request(token)
+        return self._fijar(request, response, estado)
+
+    async def __acall__(self, request):
+        estado, token = replica.iniciar_request(replica.COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica.terminar_request(token)
+        return self._fijar(request, response, estado)
+
+    def _fijar(self, request, response, estado):
+        if estado['escribio']:
+            response.set_cookie(replica.COOKIE, '1', max_age=replica.fijar_segundos(),
+                                httponly=True, samesite='Lax', secure=request.is_secure())
+        return response
+
+
+class InstrumentacionMiddleware(_SyncAsyncMiddleware):
+    """
+    Mide cada request (SQL, templates, vista) con asistencias.instrumentacion y lo expone en
+    el header Server-Timing, en una línea de log JSON (logger 'asistencias.rendimiento') y en
+    el agregado por URL que ve el supervisor. En respuestas streaming mide hasta que la vista
+    devuelve la respuesta, no el envío del contenido.
+    """
+
+    def __init__(self, get_response):
+        if not instrumentacion.activa():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        m, token = instrumentacion.iniciar()
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            m.vista = time.perf_counter() - t0
+            instrumentacion.terminar(token)
+        return self._reportar(request, response, m)
+
+    async def __acall__(self, request):
+        m, token = instrumentacion.iniciar()
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            m.vista = time.perf_counter() - t0
+            instrumentacion.terminar(token)
+        return self._reportar(request, response, m)
+
+    def _reportar(self, request, response, m):
+        match = request.resolver_match
+        ruta = match.view_name if match else '<sin ruta>'
+        if self._ve_timing(request):
+            response['Server-Timing'] = m.server_timing()
+        instrumentacion.registrar(ruta, m)
+        if log_rendimiento.isEnabledFor(logging.INFO):
+            log_rendimiento.info(json.dumps({
+                'ruta': ruta, 'metodo': request.method, 'status': response.status_code,
+                'ms': round(m.vista * 1000, 1), 'sql_ms': round(m.sql * 1000, 1),
+                'consultas': m.consultas, 'tpl_ms': round(m.templates * 1000, 1),
+                'lentas': [{'ms': round(s * 1000, 1), 'sql': sql} for s, sql in m.mas_lentas()],
+            }, ensure_ascii=False))
+        return response
+
+
+    @staticmethod
+    def _ve_timing(request):
+        if getattr(settings, 'SERVER_TIMING_PUBLICO', False):
+            return True
+        # nivel_real lo fija RoleSwitchMiddleware con el usuario ya cargado: leerlo no consulta la
+        # base. Si no está (request cortada antes) o es None (anónimo), no hay header.
+        nivel = getattr(request, 'nivel_real', None)
+        return nivel is not None and (nivel == 7 or request.user.is_staff)
+
+
+class PerfiladoMiddleware(_SyncAsyncMiddleware):
+    """
+    Corre bajo cProfile las requests que coinciden con el perfilado activado por un
+    supervisor (ver asistencias.perfilado). Apagado, solo cuesta una comparación de reloj.
+    Bajo ASGI el perfil incluye lo que el event loop haya corrido mientras tanto.
+    """
+
+    def __init__(self, get_response):
+        if not perfilado.activo():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        perfil = perfilado.iniciar(request)
+        if perfil is None:
+            return self.get_response(request)
+        t0 = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            perfilado.terminar(perfil, request, response, time.perf_counter() - t0)
+        return response
+
+    async def __acall__(self, request):
+        perfil = perfilado.iniciar(request)
+        if perfil is None:
+            return await self.get_response(request)
+        t0 = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            perfilado.terminar(perfil, request, response, time.perf_counter() - t0)
         return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def poblar_resumenes(apps, schema_editor):
+    Nota = apps.get_model('asistencias', 'Nota')
+    ResumenNota = apps.get_model('asistencias', 'ResumenNota')
+    resumenes = {}
+    for n in Nota.objects.order_by('alumno_id', 'materia_id', '-fecha', '-id').iterator():
+        r = resumenes.get((n.alumno_id, n.materia_id))
+        if r is None:
+            r = resumenes[(n.alumno_id, n.materia_id)] = ResumenNota(
+                alumno_id=n.alumno_id, materia_id=n.materia_id, cantidad=0, suma=0,
+                ultima_nota=n.valor, ultima_fecha=n.fecha,
+            )
+        r.cantidad += 1
+        r.suma += n.valor
+    for r in resumenes.values():
+        r.promedio = round(r.suma / r.cantidad, 2)
+    ResumenNota.objects.bulk_create(resumenes.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0010_clase_comentarios_docente_clase_creado_por_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenNota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('suma', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('promedio', models.DecimalField(decimal_places=2, default=0, max_digits=4)),
+                ('ultima_nota', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('ultima_fecha', models.DateField(blank=True, null=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_notas', to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_notas', to='asistencias.materia')),
+            ],
+            options={
+                'unique_together': {('alumno', 'materia')},
+            },
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0011_resumennota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacionInscripciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.FileField(upload_to='importaciones/%Y/%m/')),
+                ('nombre_original', models.CharField(max_length=255)),
+                ('hash', models.CharField(help_text='SHA-256 del archivo, para detectar re-subidas', max_length=64)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente de análisis'), ('analizando', 'Analizando'), ('analizada', 'Analizada (esperando confirmación)'), ('confirmada', 'Confirmada (en cola)'), ('aplicando', 'Aplicando'), ('completada', 'Completada'), ('error', 'Error')], default='pendiente', max_length=12)),
+                ('total_filas', models.PositiveIntegerField(default=0)),
+                ('procesadas', models.PositiveIntegerField(default=0)),
+                ('diff', models.JSONField(blank=True, default=dict, help_text='Resultado del análisis (dry-run)')),
+                ('resultado', models.JSONField(blank=True, default=dict)),
+                ('errores', models.JSONField(blank=True, default=list)),
+                ('mensaje_error', models.TextField(blank=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('creado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importaciones', to=settings.AUTH_USER_MODEL)),
+                ('diplomatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importaciones', to='asistencias.diplomatura')),
+            ],
+            options={
+                'ordering': ['-creado'],
+                'indexes': [models.Index(fields=['diplomatura', 'hash'], name='asistencias_diploma_d76513_idx'), models.Index(fields=['estado'], name='asistencias_estado_933fca_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0012_importacioninscripciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='diplomatura',
+            name='archivada_en',
+            field=models.DateTimeField(blank=True, help_text='Clases, asistencias y notas movidas al archivo', null=True),
+        ),
+        migrations.CreateModel(
+            name='ClaseArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('hora_inicio', models.DateTimeField()),
+                ('hora_fin', models.DateTimeField()),
+                ('tema', models.CharField(blank=True, max_length=255)),
+                ('link_clase', models.TextField(blank=True)),
+                ('comentarios_docente', models.TextField(blank=True)),
+                ('creado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clases_archivadas', to='asistencias.materia')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotaArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('fecha', models.DateField()),
+                ('observaciones', models.TextField(blank=True)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notas_archivadas', to=settings.AUTH_USER_MODEL)),
+                ('evaluador', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notas_archivadas', to='asistencias.materia')),
+            ],
+            options={
+                'ordering': ['-fecha'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AsistenciaArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('presente', models.BooleanField(default=True)),
+                ('timestamp', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asistencias_archivadas', to=settings.AUTH_USER_MODEL)),
+                ('clase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asistencias', to='asistencias.clasearchivada')),
+            ],
+            options={
+                'unique_together': {('clase', 'user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenAsistencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clases', models.PositiveIntegerField(default=0)),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='asistencias.materia')),
+            ],
+            options={
+                'unique_together': {('alumno', 'materia')},
+            },
+        ),
+    ]
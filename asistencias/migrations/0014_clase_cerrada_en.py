@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0013_archivo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clase',
+            name='cerrada_en',
+            field=models.DateTimeField(blank=True, help_text='Cuándo se registraron los ausentes (cerrar_ventanas)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='clase',
+            index=models.Index(fields=['hora_fin'], name='asistencias_hora_fi_5aa91c_idx'),
+        ),
+    ]
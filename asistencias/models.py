@@ -1,5 +1,6 @@
 # FILE: asistencias/models.py
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 import uuid
@@ -54,10 +55,29 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        # El importador busca emails sin distinguir mayúsculas (LOWER(email) IN ...)
+        indexes = [models.Index(Lower('email'), name='user_email_lower_idx')]
 
     def __str__(self):
         return f"{self.last_name}, {self.first_name} ({self.get_nivel_display()})"
 
+    def impersonar(self, nivel):
+        """Cambia el nivel efectivo de esta instancia sin que save() lo persista."""
+        self._nivel_real = self.nivel
+        self._nivel_impersonado = nivel
+        self.nivel = nivel
+
+    def save(self, *args, **kwargs):
+        # Si la instancia está impersonando y el nivel no se tocó, se guarda el nivel real
+        impersonado = getattr(self, '_nivel_impersonado', None)
+        if impersonado is not None and self.nivel == impersonado:
+            self.nivel = self._nivel_real
+            try:
+                return super().save(*args, **kwargs)
+            finally:
+                self.nivel = impersonado
+        return super().save(*args, **kwargs)
+
 AUTH_USER = settings.AUTH_USER_MODEL
 
 class Diplomatura(models.Model):
@@ -67,6 +87,7 @@ class Diplomatura(models.Model):
     creada_por = models.ForeignKey(AUTH_USER, on_delete=models.SET_NULL, null=True, related_name='diplos_creadas')
     coordinadores = models.ManyToManyField(AUTH_USER, blank=True, related_name='diplos_coordinadas')
     municipio = models.CharField(max_length=100, default='CORONEL ROSALES')
+    archivada_en = models.DateTimeField(null=True, blank=True, help_text="Clases, asistencias y notas movidas al archivo")
 
     def __str__(self):
         return self.nombre
@@ -129,10 +150,41 @@ class Clase(models.Model):
     link_clase = models.TextField(blank=True, help_text="Detalle específico")
     comentarios_docente = models.TextField(blank=True, verbose_name="Comentarios del Docente")
     creado_por = models.ForeignKey(AUTH_USER, on_delete=models.SET_NULL, null=True, related_name='clases_creadas')
+    cerrada_en = models.DateTimeField(null=True, blank=True, help_text="Cuándo se registraron los ausentes (cerrar_ventanas)")
+
+    class Meta:
+        indexes = [models.Index(fields=['hora_fin'])]
 
     def ventana_activa(self):
         return self.hora_inicio <= timezone.now() <= self.hora_fin
 
+    def cerrar_ventana(self):
+        """
+        Registra presente=False para los inscriptos sin asistencia, en un solo bulk_create.
+        ignore_conflicts cubre un check-in que entre justo ahora. No manda señales: quien la
+        llama invalida el cache de la materia. Devuelve cuántos ausentes registró.
+        """
+        faltan = (InscripcionMateria.objects.filter(materia_id=self.materia_id)
+                  .exclude(user_id__in=Asistencia.objects.filter(clase=self).values('user_id'))
+                  .values_list('user_id', flat=True))
+        ausentes = [Asistencia(clase=self, user_id=user_id, presente=False) for user_id in faltan]
+        Asistencia.objects.bulk_create(ausentes, ignore_conflicts=True)
+        self.cerrada_en = timezone.now()
+        Clase.objects.filter(pk=self.pk).update(cerrada_en=self.cerrada_en)
+        return len(ausentes)
+
+    def roster(self):
+        """
+        Inscriptos de la materia con su asistencia a esta clase, en una sola consulta
+        (LEFT JOIN contra Asistencia). Devuelve dicts: id, last_name, first_name, dni, presente, timestamp.
+        """
+        return (User.objects
+                .filter(insc_materias__materia_id=self.materia_id)
+                .annotate(asist=models.FilteredRelation('asistencias', condition=models.Q(asistencias__clase_id=self.pk)))
+                .values('id', 'last_name', 'first_name', 'dni',
+                        presente=models.F('asist__presente'), timestamp=models.F('asist__timestamp'))
+                .order_by('last_name', 'first_name'))
+
     def __str__(self):
         return f"{self.materia.nombre} - {self.fecha}"
 
@@ -145,6 +197,44 @@ class Asistencia(models.Model):
     class Meta:
         unique_together = ('clase', 'user')
 
+class ClaseArchivada(models.Model):
+    """Clase de una diplomatura archivada (ver asistencias/archivo.py). Conserva el id original."""
+    id = models.BigIntegerField(primary_key=True)
+    materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='clases_archivadas')
+    fecha = models.DateField()
+    hora_inicio = models.DateTimeField()
+    hora_fin = models.DateTimeField()
+    tema = models.CharField(max_length=255, blank=True)
+    link_clase = models.TextField(blank=True)
+    comentarios_docente = models.TextField(blank=True)
+    creado_por = models.ForeignKey(AUTH_USER, on_delete=models.SET_NULL, null=True, related_name='+')
+
+    def __str__(self):
+        return f"{self.materia.nombre} - {self.fecha} (archivada)"
+
+class AsistenciaArchivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    clase = models.ForeignKey(ClaseArchivada, on_delete=models.CASCADE, related_name='asistencias')
+    user = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='asistencias_archivadas')
+    presente = models.BooleanField(default=True)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('clase', 'user')
+
+class ResumenAsistencia(models.Model):
+    """Lo que queda de la asistencia de un alumno a una materia archivada: clases y presentes."""
+    alumno = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='resumenes_asistencia')
+    materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='resumenes_asistencia')
+    clases = models.PositiveIntegerField(default=0)
+    presentes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('alumno', 'materia')
+
+    def __str__(self):
+        return f"{self.alumno} - {self.materia.nombre}: {self.presentes}/{self.clases}"
+
 class Nota(models.Model):
     alumno = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='notas')
     materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='notas')
@@ -156,6 +246,19 @@ class Nota(models.Model):
     class Meta:
         ordering = ['-fecha']
 
+class NotaArchivada(models.Model):
+    """Nota de una materia archivada. El promedio sigue en ResumenNota."""
+    id = models.BigIntegerField(primary_key=True)
+    alumno = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='notas_archivadas')
+    materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='notas_archivadas')
+    valor = models.DecimalField(max_digits=4, decimal_places=2)
+    fecha = models.DateField()
+    observaciones = models.TextField(blank=True)
+    evaluador = models.ForeignKey(AUTH_USER, on_delete=models.SET_NULL, null=True, related_name='+')
+
+    class Meta:
+        ordering = ['-fecha']
+
 class InscripcionDiplomatura(models.Model):
     user = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='insc_diplos')
     diplomatura = models.ForeignKey(Diplomatura, on_delete=models.CASCADE, related_name='inscripciones')
@@ -171,3 +274,90 @@ class InscripcionMateria(models.Model):
 
     class Meta:
         unique_together = ('user', 'materia')
+
+class ResumenNota(models.Model):
+    """Resumen materializado de notas por (alumno, materia). Se mantiene por señales."""
+    alumno = models.ForeignKey(AUTH_USER, on_delete=models.CASCADE, related_name='resumenes_notas')
+    materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='resumenes_notas')
+    cantidad = models.PositiveIntegerField(default=0)
+    suma = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    promedio = models.DecimalField(max_digits=4, decimal_places=2, default=0)
+    ultima_nota = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    ultima_fecha = models.DateField(null=True, blank=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('alumno', 'materia')
+
+    def __str__(self):
+        return f"{self.alumno} - {self.materia.nombre}: {self.promedio}"
+
+    @classmethod
+    def recalcular(cls, alumno_id, materia_id):
+        """
+        Recalcula el resumen de un par (alumno, materia) con sus notas vivas y archivadas.
+        Si no quedan notas, lo borra.
+        """
+        # Una consulta (UNION ALL): las pocas notas del par se agregan en Python. Las archivadas
+        # conservan su id original, así que (fecha, id) ordena igual que antes de archivar.
+        filas = list(Nota.objects.filter(alumno_id=alumno_id, materia_id=materia_id)
+                     .order_by().values_list('fecha', 'id', 'valor')
+                     .union(NotaArchivada.objects.filter(alumno_id=alumno_id, materia_id=materia_id)
+                            .order_by().values_list('fecha', 'id', 'valor'), all=True))
+        if not filas:
+            cls.objects.filter(alumno_id=alumno_id, materia_id=materia_id).delete()
+            return None
+        suma = sum(valor for _, _, valor in filas)
+        ultima_fecha, _, ultima_nota = max(filas)
+        resumen, _ = cls.objects.update_or_create(
+            alumno_id=alumno_id, materia_id=materia_id,
+            defaults={
+                'cantidad': len(filas),
+                'suma': suma,
+                'promedio': round(suma / len(filas), 2),
+                'ultima_nota': ultima_nota,
+                'ultima_fecha': ultima_fecha,
+            },
+        )
+        return resumen
+
+class ImportacionInscripciones(models.Model):
+    """Trabajo de importación de inscripciones. Lo procesa el comando procesar_importaciones."""
+    PENDIENTE, ANALIZANDO, ANALIZADA = 'pendiente', 'analizando', 'analizada'
+    CONFIRMADA, APLICANDO, COMPLETADA, ERROR = 'confirmada', 'aplicando', 'completada', 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente de análisis'),
+        (ANALIZANDO, 'Analizando'),
+        (ANALIZADA, 'Analizada (esperando confirmación)'),
+        (CONFIRMADA, 'Confirmada (en cola)'),
+        (APLICANDO, 'Aplicando'),
+        (COMPLETADA, 'Completada'),
+        (ERROR, 'Error'),
+    ]
+    EN_CURSO = (PENDIENTE, ANALIZANDO, CONFIRMADA, APLICANDO)
+
+    diplomatura = models.ForeignKey(Diplomatura, on_delete=models.CASCADE, related_name='importaciones')
+    creado_por = models.ForeignKey(AUTH_USER, on_delete=models.SET_NULL, null=True, related_name='importaciones')
+    archivo = models.FileField(upload_to='importaciones/%Y/%m/')
+    nombre_original = models.CharField(max_length=255)
+    hash = models.CharField(max_length=64, help_text="SHA-256 del archivo, para detectar re-subidas")
+    estado = models.CharField(max_length=12, choices=ESTADOS, default=PENDIENTE)
+    total_filas = models.PositiveIntegerField(default=0)
+    procesadas = models.PositiveIntegerField(default=0)
+    diff = models.JSONField(default=dict, blank=True, help_text="Resultado del análisis (dry-run)")
+    resultado = models.JSONField(default=dict, blank=True)
+    errores = models.JSONField(default=list, blank=True)
+    mensaje_error = models.TextField(blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-creado']
+        indexes = [models.Index(fields=['diplomatura', 'hash']), models.Index(fields=['estado'])]
+
+    def __str__(self):
+        return f"{self.nombre_original} → {self.diplomatura.nombre} ({self.get_estado_display()})"
+
+    @property
+    def porcentaje(self):
+        return int(100 * self.procesadas / self.total_filas) if self.total_filas else 0
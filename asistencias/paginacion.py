@@ -0,0 +1,74 @@
+"""
+Paginación por keyset (seek): en vez de OFFSET se filtra "después de la última fila vista"
+sobre el mismo orden. El costo y la memoria por página no dependen de cuántas filas haya antes.
+
+El cursor es la tupla de valores de ordenamiento de la última fila, firmada con
+django.core.signing para que no se pueda manipular desde la URL.
+"""
+from django.core import signing
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+SALT = 'asistencias.paginacion'
+
+
+def _despues_de(campos, valores):
+    # (a, b, c) > (x, y, z)  ≡  a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+    condicion = Q()
+    for i, campo in enumerate(campos):
+        igual = {c: v for c, v in zip(campos[:i], valores[:i])}
+        condicion |= Q(**igual, **{f"{campo}__gt": valores[i]})
+    return condicion
+
+
+class PaginaKeyset:
+    """
+    Página perezosa de un queryset: no consulta hasta que se accede a `items` o `siguiente`
+    (así un fragmento cacheado en el template no dispara la consulta).
+    `campos` debe definir un orden total (terminar en una clave única, ej: 'id').
+    """
+
+    def __init__(self, queryset, campos, cursor=None, tamanio=50):
+        self.campos = list(campos)
+        self.tamanio = tamanio
+        self.cursor = cursor
+        qs = queryset.order_by(*self.campos)
+        valores = self._decodificar(cursor)
+        if valores is not None:
+            qs = qs.filter(_despues_de(self.campos, valores))
+        self._qs = qs
+
+    def _decodificar(self, cursor):
+        if not cursor:
+            return None
+        try:
+            valores = signing.loads(cursor, salt=SALT)
+        except signing.BadSignature:
+            return None
+        return valores if isinstance(valores, list) and len(valores) == len(self.campos) else None
+
+    @cached_property
+    def _filas(self):
+        return list(self._qs[:self.tamanio + 1])
+
+    @property
+    def items(self):
+        return self._filas[:self.tamanio]
+
+    @property
+    def siguiente(self):
+        """Cursor de la página siguiente, o None si ésta es la última."""
+        if len(self._filas) <= self.tamanio:
+            return None
+        ultima = self.items[-1]
+        valores = [self._valor(ultima, campo) for campo in self.campos]
+        return signing.dumps(valores, salt=SALT)
+
+    @staticmethod
+    def _valor(obj, campo):
+        for parte in campo.split('__'):
+            obj = getattr(obj, parte)
+        return obj
+
+    def __iter__(self):
+        return iter(self.items)
@@ -0,0 +1,197 @@
+"""
+Perfilado a pedido: un supervisor activa el muestreo para un patrón de URL y/o un usuario,
+y las requests que coinciden se corren bajo cProfile. Cada perfil se guarda en
+MEDIA_ROOT/perfiles/ como .prof (se abre con pstats o snakeviz) más un .json con el resumen
+de las funciones más costosas, que es lo que lista la página de perfiles.
+
+La activación vive en el cache (compartida entre workers) con vencimiento. Cada proceso la
+relee como mucho cada REFRESCO segundos, así que con el perfilado apagado el middleware
+solo compara un reloj por request.
+"""
+import cProfile
+import datetime
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+CLAVE = 'perfilado:config'
+REFRESCO = 5.0      # segundos entre lecturas de la configuración por proceso
+TOP = 30            # funciones que se guardan en el resumen
+LISTADO = 100       # perfiles que muestra el índice
+NOMBRE_RE = re.compile(r'^[\w-]+$')
+
+logger = logging.getLogger(__name__)
+
+_config = None
+_leido = 0.0
+# cProfile admite un solo perfilador activo por hilo; bajo ASGI varias requests comparten el
+# loop, así que se perfila de a una por proceso y las demás siguen de largo.
+_ocupado = threading.Lock()
+
+
+def directorio():
+    return Path(settings.MEDIA_ROOT) / 'perfiles'
+
+
+def activo():
+    return getattr(settings, 'PERFILADO', True)
+
+
+# --- Configuración ---
+
+def activar(patron='', user_id=None, tasa=1.0, maximo=20, minutos=30, por=None):
+    """Activa el muestreo. `patron` es una regex sobre request.path (vacío = cualquiera)."""
+    global _config, _leido
+    cfg = {
+        'id': uuid.uuid4().hex[:8], 'patron': patron, 'user_id': user_id, 'tasa': tasa,
+        'maximo': maximo, 'hasta': time.time() + minutos * 60, 'por': por,
+    }
+    cache.set(CLAVE, cfg, timeout=minutos * 60)
+    _config, _leido = cfg, time.monotonic()
+    return cfg
+
+
+def desactivar():
+    global _config, _leido
+    cache.delete(CLAVE)
+    _config, _leido = None, time.monotonic()
+
+
+def config():
+    """Configuración vigente (o None), releída del cache cada REFRESCO segundos."""
+    global _config, _leido
+    ahora = time.monotonic()
+    if ahora - _leido > REFRESCO:
+        _config, _leido = cache.get(CLAVE), ahora
+    if _config is not None and _config['hasta'] < time.time():
+        _config = None
+    return _config
+
+
+def coincide(cfg, request):
+    if cfg['user_id'] is not None:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated or user.pk != cfg['user_id']:
+            return False
+    if cfg['patron'] and not re.search(cfg['patron'], request.path):
+        return False
+    return random.random() < cfg['tasa']
+
+
+def _contar(cfg):
+    """Suma uno a los perfiles de esta activación; la apaga al llegar al máximo."""
+    clave = f"perfilado:n:{cfg['id']}"
+    cache.add(clave, 0, timeout=max(int(cfg['hasta'] - time.time()), 1))
+    try:
+        n = cache.incr(clave)
+    except ValueError:
+        n = 1
+    if n >= cfg['maximo']:
+        desactivar()
+    return n <= cfg['maximo']
+
+
+# --- Perfilado ---
+
+def iniciar(request):
+    """Devuelve un cProfile.Profile ya activo si hay que perfilar esta request, si no None."""
+    cfg = config()
+    if cfg is None or not coincide(cfg, request):
+        return None
+    if not _ocupado.acquire(blocking=False):
+        return None
+    if not _contar(cfg):
+        _ocupado.release()
+        return None
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+
+def terminar(perfil, request, response, segundos):
+    perfil.disable()
+    _ocupado.release()
+    try:
+        guardar(perfil, request, response, segundos)
+    except OSError:
+        # Un disco lleno o sin permisos no puede tirar la request que se estaba midiendo
+        logger.exception("No se pudo guardar el perfil de %s", request.path)
+
+
+def _resumen(perfil):
+    stats = pstats.Stats(perfil, stream=io.StringIO())
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, tottime, cumtime, _) in stats.stats.items():
+        filas.append({
+            'funcion': funcion, 'ubicacion': f"{archivo}:{linea}", 'llamadas': llamadas,
+            'tottime_ms': round(tottime * 1000, 2), 'cumtime_ms': round(cumtime * 1000, 2),
+        })
+    # foco: la función con más tiempo propio (el tope por acumulado es siempre el middleware)
+    foco = max(filas, key=lambda f: f['tottime_ms'], default=None)
+    filas.sort(key=lambda f: f['cumtime_ms'], reverse=True)
+    return filas[:TOP], foco
+
+
+def guardar(perfil, request, response, segundos):
+    ahora = timezone.localtime()
+    match = getattr(request, 'resolver_match', None)
+    ruta = match.view_name if match else ''
+    nombre = f"{ahora:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    user = getattr(request, 'user', None)
+    top, foco = _resumen(perfil)
+
+    carpeta = directorio()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    perfil.dump_stats(carpeta / f"{nombre}.prof")
+    (carpeta / f"{nombre}.json").write_text(json.dumps({
+        'nombre': nombre, 'fecha': ahora.isoformat(), 'ruta': ruta, 'path': request.path,
+        'metodo': request.method, 'status': response.status_code if response is not None else 500, 'ms': round(segundos * 1000, 1),
+        'usuario': user.email if user is not None and user.is_authenticated else None,
+        'top': top, 'foco': foco,
+    }, ensure_ascii=False))
+    return nombre
+
+
+# --- Consulta ---
+
+def listar():
+    """Resúmenes de los perfiles guardados, del más nuevo al más viejo."""
+    carpeta = directorio()
+    if not carpeta.is_dir():
+        return []
+    perfiles = []
+    for archivo in sorted(carpeta.glob('*.json'), reverse=True)[:LISTADO]:
+        datos = json.loads(archivo.read_text())
+        datos['fecha'] = datetime.datetime.fromisoformat(datos['fecha'])
+        perfiles.append(datos)
+    return perfiles
+
+
+def leer(nombre):
+    """Resumen de un perfil, o None si no existe (o el nombre no es válido)."""
+    if not NOMBRE_RE.fullmatch(nombre):
+        return None
+    archivo = directorio() / f"{nombre}.json"
+    if not archivo.is_file():
+        return None
+    datos = json.loads(archivo.read_text())
+    datos['fecha'] = datetime.datetime.fromisoformat(datos['fecha'])
+    return datos
+
+
+def archivo_prof(nombre):
+    if not NOMBRE_RE.fullmatch(nombre):
+        return None
+    archivo = directorio() / f"{nombre}.prof"
+    return archivo if archivo.is_file() else None
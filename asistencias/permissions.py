@@ -1,9 +1,23 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Value, CharField
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
 def requiere_nivel(min_nivel):
     def decorator(view):
+        if iscoroutinefunction(view):
+            @login_required
+            async def _wrapped(request, *args, **kwargs):
+                user = await request.auser()
+                if user.nivel >= min_nivel:
+                    return await view(request, *args, **kwargs)
+                messages.error(request, "No tienes permisos para acceder a esa sección.")
+                return redirect('asistencias:home')
+            return _wrapped
+
         @login_required
         def _wrapped(request, *args, **kwargs):
             if request.user.nivel >= min_nivel:
@@ -13,3 +27,138 @@ def requiere_nivel(min_nivel):
             return redirect('asistencias:home')
         return _wrapped
     return decorator
+
+
+# --- Membresías del usuario (resueltas una vez por request) ---
+
+MEMBRESIAS_CACHE_PREFIX = 'membresias'
+MEMBRESIAS_GEN_KEY = 'membresias:gen'
+
+
+def _id(obj):
+    """Acepta instancia o id."""
+    return getattr(obj, 'pk', obj)
+
+
+class Membresias:
+    """
+    Vínculos del usuario con materias y diplomaturas:
+    titular, adjunto (ProfesorMateria), coordinador, inscripto (materia/diplomatura).
+    Se cargan con una sola consulta (UNION) y se consultan como sets en O(1).
+    """
+    TIPOS = ('titular', 'profesor', 'coordinador', 'insc_materia', 'insc_diplo')
+
+    def __init__(self, sets=None):
+        sets = sets or {}
+        self.titular = frozenset(sets.get('titular', ()))
+        self.profesor = frozenset(sets.get('profesor', ()))            # materias (ProfesorMateria)
+        self.coordinador = frozenset(sets.get('coordinador', ()))      # diplomaturas
+        self.insc_materia = frozenset(sets.get('insc_materia', ()))    # materias
+        self.insc_diplo = frozenset(sets.get('insc_diplo', ()))        # diplomaturas
+
+    @staticmethod
+    def _cache_key(user):
+        ttl = getattr(settings, 'MEMBRESIAS_CACHE_TTL', 0)
+        if not ttl:
+            return None, 0
+        return f"{MEMBRESIAS_CACHE_PREFIX}:{cache.get(MEMBRESIAS_GEN_KEY, 0)}:{user.pk}", ttl
+
+    @staticmethod
+    def _consulta(user):
+        from .models import Materia, ProfesorMateria, Diplomatura, InscripcionMateria, InscripcionDiplomatura
+
+        def _tag(qs, tipo, campo):
+            return qs.annotate(tipo=Value(tipo, output_field=CharField())).values_list('tipo', campo)
+
+        return _tag(Materia.objects.filter(profesor_titular=user), 'titular', 'id').union(
+            _tag(ProfesorMateria.objects.filter(user=user), 'profesor', 'materia_id'),
+            _tag(Diplomatura.objects.filter(coordinadores=user), 'coordinador', 'id'),
+            _tag(InscripcionMateria.objects.filter(user=user), 'insc_materia', 'materia_id'),
+            _tag(InscripcionDiplomatura.objects.filter(user=user), 'insc_diplo', 'diplomatura_id'),
+            all=True,
+        )
+
+    @classmethod
+    def cargar(cls, user):
+        if not getattr(user, 'is_authenticated', False):
+            return cls()
+
+        key, ttl = cls._cache_key(user)
+        if key:
+            sets = cache.get(key)
+            if sets is not None:
+                return cls(sets)
+
+        sets = {t: set() for t in cls.TIPOS}
+        for tipo, obj_id in cls._consulta(user):
+            sets[tipo].add(obj_id)
+
+        if key:
+            cache.set(key, sets, ttl)
+        return cls(sets)
+
+    @classmethod
+    async def acargar(cls, user):
+        """Versión para vistas async (ORM async)."""
+        if not getattr(user, 'is_authenticated', False):
+            return cls()
+
+        key, ttl = cls._cache_key(user)
+        if key:
+            sets = await cache.aget(key)
+            if sets is not None:
+                return cls(sets)
+
+        sets = {t: set() for t in cls.TIPOS}
+        async for tipo, obj_id in cls._consulta(user):
+            sets[tipo].add(obj_id)
+
+        if key:
+            await cache.aset(key, sets, ttl)
+        return cls(sets)
+
+    # Materias
+    def es_titular(self, materia):
+        return _id(materia) in self.titular
+
+    def es_adjunto(self, materia):
+        return _id(materia) in self.profesor
+
+    def es_docente(self, materia):
+        return self.es_titular(materia) or self.es_adjunto(materia)
+
+    def es_inscripto(self, materia):
+        return _id(materia) in self.insc_materia
+
+    def coordina_materia(self, materia):
+        return materia.diplomatura_id in self.coordinador
+
+    @property
+    def materias_docente(self):
+        return self.titular | self.profesor
+
+    def ve_asistencia(self, user, materia):
+        """Planilla de asistencia: gestión (4, 5, 7), docentes, coordinadores y referentes de la diplomatura."""
+        # El vínculo de referente es una InscripcionDiplomatura: solo cuenta para nivel 6, no para
+        # un docente o coordinador que además esté inscripto en la diplomatura
+        return ((user.nivel >= 4 and user.nivel != 6) or self.es_docente(materia)
+                or self.coordina_materia(materia)
+                or (user.nivel == 6 and self.inscripto_en_diplomatura(materia.diplomatura_id)))
+
+    # Diplomaturas
+    def coordina(self, diplomatura):
+        return _id(diplomatura) in self.coordinador
+
+    def inscripto_en_diplomatura(self, diplomatura):
+        return _id(diplomatura) in self.insc_diplo
+
+
+def invalidar_membresias(user_id=None):
+    """Invalida el cache de un usuario, o de todos (user_id=None) subiendo la generación."""
+    if user_id is None:
+        try:
+            cache.incr(MEMBRESIAS_GEN_KEY)
+        except ValueError:
+            cache.set(MEMBRESIAS_GEN_KEY, 1, None)
+        return
+    cache.delete(f"{MEMBRESIAS_CACHE_PREFIX}:{cache.get(MEMBRESIAS_GEN_KEY, 0)}:{user_id}")
@@ -0,0 +1,83 @@
+"""
+Planilla de asistencia por materia: grilla clases × alumnos con presente/hora.
+
+Se arma con tres consultas (clases del rango, inscriptos, asistencias de esas clases)
+y se cachea por versión de la materia; las señales de Asistencia/Clase/Inscripción
+suben esa versión, así que la grilla se recalcula sola cuando cambia algo.
+"""
+import datetime
+from dataclasses import dataclass
+
+from django.db.models import Min, Max
+
+from .models import Clase, User, Asistencia
+from .cache import cache_key, get_or_set, version
+
+SEMANAS_POR_PAGINA = 8
+
+
+@dataclass
+class Planilla:
+    clases: list      # dicts: id, fecha, hora_inicio, hora_fin, tema
+    alumnos: list     # dicts: id, dni, alumno
+    celdas: dict      # (clase_id, user_id) -> (presente, timestamp)
+
+    def filas(self, clase_id):
+        """Filas de una clase, en el orden de los alumnos (para el detalle por clase)."""
+        for a in self.alumnos:
+            presente, ts = self.celdas.get((clase_id, a['id']), (False, None))
+            yield {'dni': a['dni'], 'alumno': a['alumno'], 'presente': presente, 'timestamp': ts}
+
+    def matriz(self):
+        """Filas por alumno: (alumno, [presente por clase], total de presentes)."""
+        for a in self.alumnos:
+            marcas = [self.celdas.get((c['id'], a['id']), (False, None))[0] for c in self.clases]
+            yield a, marcas, sum(marcas)
+
+
+def construir_planilla(materia_id, desde, hasta):
+    clases = list(Clase.objects.filter(materia_id=materia_id, fecha__range=(desde, hasta))
+                  .order_by('fecha', 'hora_inicio')
+                  .values('id', 'fecha', 'hora_inicio', 'hora_fin', 'tema'))
+    alumnos = [
+        {'id': u['id'], 'dni': u['dni'], 'alumno': f"{u['last_name']}, {u['first_name']}"}
+        for u in User.objects.filter(insc_materias__materia_id=materia_id)
+        .order_by('last_name', 'first_name').values('id', 'dni', 'last_name', 'first_name')
+    ]
+    celdas = {}
+    if clases:
+        celdas = {
+            (clase_id, user_id): (presente, ts)
+            for clase_id, user_id, presente, ts in Asistencia.objects.filter(
+                clase__materia_id=materia_id, clase__fecha__range=(desde, hasta),
+            ).values_list('clase_id', 'user_id', 'presente', 'timestamp')
+        }
+    return Planilla(clases=clases, alumnos=alumnos, celdas=celdas)
+
+
+def planilla_materia(materia, desde, hasta):
+    """Planilla cacheada del rango [desde, hasta]."""
+    key = cache_key('planilla', materia.pk, desde.isoformat(), hasta.isoformat(), version('materia', materia.pk))
+    return get_or_set(key, lambda: construir_planilla(materia.pk, desde, hasta))
+
+
+def rango_pagina(materia, desde=None, hasta=None, semanas=SEMANAS_POR_PAGINA):
+    """
+    Resuelve el rango a mostrar. Sin parámetros: las últimas `semanas` semanas hasta la
+    última clase. Devuelve (desde, hasta, anterior, siguiente) donde anterior/siguiente
+    son rangos (desde, hasta) o None si no hay clases fuera del rango por ese lado.
+    """
+    extremos = Clase.objects.filter(materia=materia).aggregate(primera=Min('fecha'), ultima=Max('fecha'))
+    paso = datetime.timedelta(weeks=semanas)
+    if hasta is None:
+        hasta = (desde + paso - datetime.timedelta(days=1)) if desde else (extremos['ultima'] or datetime.date.today())
+    if desde is None:
+        desde = hasta - paso + datetime.timedelta(days=1)
+
+    largo = hasta - desde + datetime.timedelta(days=1)
+    anterior = siguiente = None
+    if extremos['primera'] and extremos['primera'] < desde:
+        anterior = (desde - largo, desde - datetime.timedelta(days=1))
+    if extremos['ultima'] and extremos['ultima'] > hasta:
+        siguiente = (hasta + datetime.timedelta(days=1), hasta + largo)
+    return desde, hasta, anterior, siguiente
@@ -0,0 +1,96 @@
+"""
+Generación masiva de clases a partir de un patrón semanal.
+
+Dada una materia, los días de la semana, el horario de la ventana de asistencia, un rango
+de fechas y fechas excluidas (feriados), arma todas las Clase en memoria, detecta los
+solapamientos con las clases existentes en una sola consulta y las inserta con un único
+bulk_create dentro de una transacción.
+"""
+import datetime
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Clase
+from . import cache as cache_versiones
+
+DIAS_SEMANA = [
+    (0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'),
+    (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo'),
+]
+MAX_CLASES = 500  # tope por operación, para no generar miles de filas por un rango mal cargado
+
+
+@dataclass
+class PlanRecurrencia:
+    clases: list = field(default_factory=list)      # Clase sin guardar, sin conflicto
+    conflictos: list = field(default_factory=list)  # [(Clase nueva, Clase existente)]
+    excluidas: list = field(default_factory=list)   # fechas del patrón salteadas por exclusión
+
+
+def generar_fechas(desde, hasta, dias_semana, excluir=()):
+    """Fechas entre desde y hasta (inclusive) que caen en dias_semana (0=lunes). Devuelve (fechas, excluidas)."""
+    dias_semana, excluir = set(dias_semana), set(excluir)
+    fechas, excluidas = [], []
+    dia = desde
+    while dia <= hasta:
+        if dia.weekday() in dias_semana:
+            (excluidas if dia in excluir else fechas).append(dia)
+        dia += datetime.timedelta(days=1)
+    return fechas, excluidas
+
+
+def _ventana(fecha, hora_inicio, hora_fin):
+    tz = timezone.get_current_timezone()
+    inicio = timezone.make_aware(datetime.datetime.combine(fecha, hora_inicio), tz)
+    fin = timezone.make_aware(datetime.datetime.combine(fecha, hora_fin), tz)
+    if fin <= inicio:  # ventana que cruza la medianoche
+        fin += datetime.timedelta(days=1)
+    return inicio, fin
+
+
+def planificar(materia, desde, hasta, dias_semana, hora_inicio, hora_fin, excluir=(),
+               tema='', link_clase='', creado_por=None):
+    """Arma el plan (sin escribir): clases a crear, conflictos con existentes y fechas excluidas."""
+    fechas, excluidas = generar_fechas(desde, hasta, dias_semana, excluir)
+    if len(fechas) > MAX_CLASES:
+        raise ValueError(f"El patrón genera {len(fechas)} clases; el máximo por operación es {MAX_CLASES}.")
+
+    plan = PlanRecurrencia(excluidas=excluidas)
+    nuevas = []
+    for fecha in fechas:
+        inicio, fin = _ventana(fecha, hora_inicio, hora_fin)
+        nuevas.append(Clase(
+            materia=materia, fecha=fecha, hora_inicio=inicio, hora_fin=fin,
+            tema=tema, link_clase=link_clase, creado_por=creado_por,
+        ))
+    if not nuevas:
+        return plan
+
+    # Una sola consulta: las clases de la materia cuya ventana toca el rango generado
+    existentes = list(Clase.objects.filter(
+        materia=materia, hora_inicio__lt=nuevas[-1].hora_fin, hora_fin__gt=nuevas[0].hora_inicio,
+    ).order_by('hora_inicio').only('id', 'fecha', 'hora_inicio', 'hora_fin', 'tema'))
+
+    for nueva in nuevas:
+        choque = next((e for e in existentes
+                       if e.hora_inicio < nueva.hora_fin and e.hora_fin > nueva.hora_inicio), None)
+        if choque:
+            plan.conflictos.append((nueva, choque))
+        else:
+            plan.clases.append(nueva)
+    return plan
+
+
+def crear_clases_recurrentes(materia, *args, **kwargs):
+    """Planifica y crea las clases sin conflicto en un único bulk_create. Devuelve el plan."""
+    with transaction.atomic():
+        plan = planificar(materia, *args, **kwargs)
+        if plan.clases:
+            Clase.objects.bulk_create(plan.clases)
+    if plan.clases:
+        # bulk_create no dispara señales
+        cache_versiones.invalidar_materia(materia.pk, materia.diplomatura_id)
+        cache_versiones.invalidar_calendario()
+    return plan
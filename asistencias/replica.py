@@ -0,0 +1,109 @@
+"""
+Lecturas en la réplica: los reportes y exportaciones (consultas largas de solo lectura) leen de
+la base réplica si hay una configurada (alias 'replica', ver DB_REPLICA_* en settings). Todo lo
+demás, y toda escritura, va a la primaria.
+
+Qué lee de la réplica lo decide el código, no el router: una vista se marca con
+@lecturas_en_replica y un proceso (comando, job) usa `with en_replica():`. La marca vive en un
+ContextVar, así que funciona igual en vistas sync y async (sync_to_async copia el contexto).
+
+Leer lo propio: la réplica va unos segundos atrás de la primaria. Cuando un request escribe
+(cualquier db_for_write), desde ahí hasta el final del request se lee de la primaria, y
+LecturaPropiaMiddleware deja una cookie que fija ese navegador a la primaria durante
+REPLICA_FIJAR_SEGUNDOS: el reporte que se pide justo después de guardar ya ve el cambio.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ALIAS = 'replica'
+COOKIE = 'lee_primaria'
+
+_en_replica = ContextVar('replica', default=False)
+# Estado del request en curso (lo pone el middleware). Es un dict mutable a propósito: el router
+# corre en el hilo de sync_to_async con una copia del contexto y tiene que poder avisar que escribió.
+_request = ContextVar('replica_request', default=None)
+
+
+def activa():
+    return ALIAS in settings.DATABASES and getattr(settings, 'REPLICA_LECTURAS', True)
+
+
+def fijar_segundos():
+    return getattr(settings, 'REPLICA_FIJAR_SEGUNDOS', 10)
+
+
+@contextmanager
+def en_replica():
+    """Las lecturas del bloque van a la réplica (si hay una y no se escribió antes)."""
+    token = _en_replica.set(True)
+    try:
+        yield
+    finally:
+        _en_replica.reset(token)
+
+
+def lecturas_en_replica(vista):
+    """Decorador para vistas de reportes/exportación: sus lecturas van a la réplica."""
+    if iscoroutinefunction(vista):
+        @functools.wraps(vista)
+        async def envuelta(request, *args, **kwargs):
+            with en_replica():
+                return await vista(request, *args, **kwargs)
+    else:
+        @functools.wraps(vista)
+        def envuelta(request, *args, **kwargs):
+            with en_replica():
+                return vista(request, *args, **kwargs)
+    return envuelta
+
+
+# --- Estado por request (LecturaPropiaMiddleware) ---
+
+def iniciar_request(fijado):
+    estado = {'fijado': fijado, 'escribio': False}
+    return estado, _request.set(estado)
+
+
+def terminar_request(token):
+    _request.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sin réplica configurada no opina (todo va a 'default', como sin router). Con réplica:
+    las escrituras van siempre a la primaria, aunque la instancia se haya leído de la réplica.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not activa():
+            return None
+        if not _en_replica.get():
+            return DEFAULT_DB_ALIAS
+        estado = _request.get()
+        if estado is not None and (estado['fijado'] or estado['escribio']):
+            return DEFAULT_DB_ALIAS
+        return ALIAS
+
+    def db_for_write(self, model, **hints):
+        estado = _request.get()
+        if estado is not None:
+            estado['escribio'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica tienen los mismos datos
+        bases = {DEFAULT_DB_ALIAS, ALIAS}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # La réplica se actualiza por replicación, nunca con migrate
+        if db == ALIAS:
+            return False
+        return None
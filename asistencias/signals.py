@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import cache as cache_versiones
+from . import eventos
+from .models import (
+    Nota, ResumenNota, Materia, Diplomatura, ProfesorMateria,
+    InscripcionMateria, InscripcionDiplomatura, Clase, Asistencia,
+)
+from .permissions import invalidar_membresias
+
+
+@receiver(pre_save, sender=Nota)
+def recordar_par_nota(sender, instance, **kwargs):
+    # Si la nota pasa a otro alumno o materia, el resumen del par anterior también cambia
+    instance._par_anterior = None
+    if not instance._state.adding:
+        instance._par_anterior = (Nota.objects.filter(pk=instance.pk)
+                                  .values_list('alumno_id', 'materia_id').first())
+
+
+@receiver(post_save, sender=Nota)
+@receiver(post_delete, sender=Nota)
+def actualizar_resumen_nota(sender, instance, **kwargs):
+    # Mantener el resumen (alumno, materia) al día cada vez que cambia una nota
+    par = (instance.alumno_id, instance.materia_id)
+    ResumenNota.recalcular(*par)
+    anterior = getattr(instance, '_par_anterior', None)
+    if anterior and anterior != par:
+        ResumenNota.recalcular(*anterior)
+
+
+@receiver(post_save, sender=ProfesorMateria)
+@receiver(post_delete, sender=ProfesorMateria)
+@receiver(post_save, sender=InscripcionMateria)
+@receiver(post_delete, sender=InscripcionMateria)
+@receiver(post_save, sender=InscripcionDiplomatura)
+@receiver(post_delete, sender=InscripcionDiplomatura)
+def invalidar_membresias_usuario(sender, instance, **kwargs):
+    invalidar_membresias(instance.user_id)
+
+
+@receiver(pre_save, sender=Materia)
+def recordar_titular_materia(sender, instance, **kwargs):
+    instance._titular_anterior = None
+    if not instance._state.adding:
+        instance._titular_anterior = (Materia.objects.filter(pk=instance.pk)
+                                      .values_list('profesor_titular_id', flat=True).first())
+
+
+@receiver(post_save, sender=Materia)
+@receiver(post_delete, sender=Materia)
+def invalidar_membresias_titular(sender, instance, signal, created=False, **kwargs):
+    # De Materia, las membresías solo guardan el titular: renombrarla o editarla no invalida a nadie.
+    # Adjuntos e inscriptos borrados en cascada invalidan por sus propias señales.
+    anterior = getattr(instance, '_titular_anterior', None)
+    actual = instance.profesor_titular_id
+    if signal is post_save and not created and anterior == actual:
+        return
+    for user_id in {anterior, actual} - {None}:
+        invalidar_membresias(user_id)
+
+
+@receiver(post_delete, sender=Diplomatura)
+def invalidar_membresias_todas(sender, instance, **kwargs):
+    # Bajas en cascada (coordinadores incluidos): afectan a usuarios que no conocemos acá
+    invalidar_membresias()
+
+
+@receiver(m2m_changed, sender=Diplomatura.coordinadores.through)
+def invalidar_membresias_coordinadores(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Diplomatura) and pk_set:
+        for user_id in pk_set:
+            invalidar_membresias(user_id)
+    else:
+        invalidar_membresias()
+
+
+# --- Versiones de cache (ver cache.py) ---
+
+@receiver(post_save, sender=Diplomatura)
+@receiver(post_delete, sender=Diplomatura)
+def invalidar_cache_diplomatura(sender, instance, **kwargs):
+    cache_versiones.invalidar_catalogo()
+    cache_versiones.invalidar_diplomatura(instance.pk)
+
+
+@receiver(m2m_changed, sender=Diplomatura.coordinadores.through)
+def invalidar_cache_coordinadores(sender, instance, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    cache_versiones.invalidar_catalogo()
+    if isinstance(instance, Diplomatura):
+        cache_versiones.invalidar_diplomatura(instance.pk)
+
+
+@receiver(post_save, sender=Materia)
+@receiver(post_delete, sender=Materia)
+def invalidar_cache_materia(sender, instance, signal, **kwargs):
+    cache_versiones.recordar_diplomatura(instance.pk, instance.diplomatura_id if signal is post_save else None)
+    cache_versiones.invalidar_catalogo()
+    cache_versiones.invalidar_materia(instance.pk, instance.diplomatura_id)
+
+
+@receiver(post_save, sender=InscripcionDiplomatura)
+@receiver(post_delete, sender=InscripcionDiplomatura)
+def invalidar_cache_insc_diplo(sender, instance, **kwargs):
+    cache_versiones.invalidar_catalogo()
+    cache_versiones.invalidar_diplomatura(instance.diplomatura_id)
+
+
+@receiver(post_save, sender=ProfesorMateria)
+@receiver(post_delete, sender=ProfesorMateria)
+@receiver(post_save, sender=InscripcionMateria)
+@receiver(post_delete, sender=InscripcionMateria)
+def invalidar_cache_de_materia(sender, instance, **kwargs):
+    # materias.html muestra inscriptos y marcas de docente: sí es catálogo
+    cache_versiones.invalidar_catalogo()
+    cache_versiones.invalidar_materia(instance.materia_id)
+
+
+@receiver(post_save, sender=Clase)
+@receiver(post_delete, sender=Clase)
+def invalidar_cache_clase(sender, instance, **kwargs):
+    # Las clases solo aparecen en los calendarios, no en los listados del catálogo
+    cache_versiones.invalidar_calendario()
+    cache_versiones.invalidar_materia(instance.materia_id)
+
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_delete, sender=Asistencia)
+def invalidar_cache_asistencia(sender, instance, **kwargs):
+    # Ni catálogo ni calendario general. En el check-in la clase viene cargada y la diplomatura
+    # sale del cache (diplomatura_de_materia): ninguna consulta extra
+    if Asistencia.clase.is_cached(instance):
+        materia_id = instance.clase.materia_id
+    else:
+        materia_id = Clase.objects.filter(pk=instance.clase_id).values_list('materia_id', flat=True).first()
+    if materia_id:
+        cache_versiones.invalidar_materia(materia_id)
+
+
+@receiver(post_save, sender=Asistencia)
+def publicar_asistencia(sender, instance, **kwargs):
+    # Aviso inmediato a los espectadores SSE de este proceso, una vez confirmada la escritura
+    transaction.on_commit(lambda: eventos.publicar(
+        instance.clase_id, instance.user_id, instance.presente, instance.timestamp))
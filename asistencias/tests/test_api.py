@@ -0,0 +1,144 @@
+from django.test import TestCase, Client, AsyncClient
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria, InscripcionDiplomatura
+import datetime
+
+User = get_user_model()
+
+class ApiAsyncTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.profe = User.objects.create_user(email='profe@test.com', password='password', first_name='Profe', last_name='Sor', dni='1', nivel=2)
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='password', first_name='Ana', last_name='Alvarez', dni='2', nivel=1)
+        self.alumno2 = User.objects.create_user(email='alumno2@test.com', password='password', first_name='Beto', last_name='Benitez', dni='3', nivel=1)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='Profe', dni='4', nivel=2)
+
+        self.diplo = Diplomatura.objects.create(nombre='Diplo API', codigo='DA')
+        self.materia = Materia.objects.create(diplomatura=self.diplo, nombre='Materia API', codigo='MA', profesor_titular=self.profe)
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.materia)
+        InscripcionMateria.objects.create(user=self.alumno2, materia=self.materia)
+
+        ahora = timezone.now()
+        self.clase = Clase.objects.create(materia=self.materia, fecha=ahora.date(),
+                                          hora_inicio=ahora - datetime.timedelta(hours=1),
+                                          hora_fin=ahora + datetime.timedelta(hours=1))
+
+    def test_marcar_presente_async(self):
+        self.client.force_login(self.alumno)
+        response = self.client.get(reverse('asistencias:marcar_presente', args=[self.clase.id]))
+        self.assertRedirects(response, reverse('asistencias:ver_clases', args=[self.materia.id]))
+        self.assertTrue(Asistencia.objects.filter(clase=self.clase, user=self.alumno).exists())
+
+    def test_marcar_presente_no_inscripto(self):
+        self.client.force_login(self.otro)
+        response = self.client.get(reverse('asistencias:marcar_presente', args=[self.clase.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_publico_lista_clases_abiertas(self):
+        self.client.force_login(self.alumno)
+        response = self.client.get(reverse('asistencias:publico'))
+        self.assertContains(response, 'Materia API')
+
+    def test_roster_json(self):
+        Asistencia.objects.create(clase=self.clase, user=self.alumno)
+        self.client.force_login(self.profe)
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(reverse('asistencias:roster_clase_json', args=[self.clase.id])).json()
+        # usuario, clase, membresías y roster (la sesión puede venir del cache)
+        self.assertEqual(len([q for q in ctx.captured_queries if 'django_session' not in q['sql']]), 4)
+        self.assertEqual(data['presentes'], 1)
+        self.assertEqual([a['alumno'] for a in data['alumnos']], ['Alvarez, Ana', 'Benitez, Beto'])
+        self.assertTrue(data['alumnos'][0]['presente'])
+        self.assertIsNotNone(data['alumnos'][0]['timestamp'])
+        self.assertFalse(data['alumnos'][1]['presente'])
+
+    def test_roster_json_inscripto_en_diplomatura(self):
+        # La inscripción a la diplomatura da acceso solo a referentes (nivel 6)
+        InscripcionDiplomatura.objects.create(user=self.otro, diplomatura=self.diplo)
+        url = reverse('asistencias:roster_clase_json', args=[self.clase.id])
+        self.client.force_login(self.otro)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        referente = User.objects.create_user(email='ref@test.com', password='password', dni='5', nivel=6)
+        InscripcionDiplomatura.objects.create(user=referente, diplomatura=self.diplo)
+        self.client.force_login(referente)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_roster_json_sin_permiso(self):
+        self.client.force_login(self.otro)
+        response = self.client.get(reverse('asistencias:roster_clase_json', args=[self.clase.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_calendario_json(self):
+        self.client.force_login(self.alumno)
+        data = self.client.get(reverse('asistencias:calendario_json')).json()
+        self.assertEqual([e['id'] for e in data['eventos']], [self.clase.id])
+
+    def test_detalle_asistencia_una_consulta_de_roster(self):
+        Asistencia.objects.create(clase=self.clase, user=self.alumno)
+        self.client.force_login(self.profe)
+        self.client.get(reverse('asistencias:ver_asistencia_clase', args=[self.clase.id]))  # calienta sesión
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('asistencias:ver_asistencia_clase', args=[self.clase.id]))
+        self.assertContains(response, 'Alvarez, Ana')
+        self.assertEqual(response.context['presentes'], 1)
+        tablas = [q['sql'] for q in ctx.captured_queries if 'django_session' not in q['sql']]
+        # usuario, clase+materia, membresías y roster
+        self.assertEqual(len(tablas), 4)
+
+        self.client.force_login(self.otro)
+        response = self.client.get(reverse('asistencias:ver_asistencia_clase', args=[self.clase.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_ausente_que_pasa_a_presente_aparece_en_cambios(self):
+        # Ausente que dejó cerrar_ventanas antes de que el docente reabriera la ventana
+        Asistencia.objects.create(clase=self.clase, user=self.alumno, presente=False)
+        Asistencia.objects.update(timestamp=timezone.now() - datetime.timedelta(hours=1))
+        self.client.force_login(self.profe)
+        cursor = self.client.get(reverse('asistencias:roster_clase_json', args=[self.clase.id])).json()['cursor']
+
+        self.client.force_login(self.alumno)
+        self.client.get(reverse('asistencias:marcar_presente', args=[self.clase.id]))
+        self.client.force_login(self.profe)
+        data = self.client.get(reverse('asistencias:cambios_asistencia_json', args=[self.clase.id]),
+                               {'desde': cursor}).json()
+        self.assertEqual([(c['id'], c['presente']) for c in data['cambios']], [(self.alumno.id, True)])
+
+    def test_cambios_desde_cursor(self):
+        self.client.force_login(self.profe)
+        url = reverse('asistencias:cambios_asistencia_json', args=[self.clase.id])
+        cursor = self.client.get(reverse('asistencias:roster_clase_json', args=[self.clase.id])).json()['cursor']
+
+        Asistencia.objects.create(clase=self.clase, user=self.alumno2)
+        data = self.client.get(url, {'desde': cursor}).json()
+        self.assertEqual([c['id'] for c in data['cambios']], [self.alumno2.id])
+        self.assertTrue(data['ventana_activa'])
+
+        futuro = (timezone.now() + datetime.timedelta(minutes=1)).isoformat()
+        self.assertEqual(self.client.get(url, {'desde': futuro}).json()['cambios'], [])
+        self.assertEqual(self.client.get(url, {'desde': 'ayer'}).status_code, 400)
+
+        self.client.force_login(self.otro)
+        self.assertEqual(self.client.get(url, {'desde': cursor}).status_code, 403)
+
+
+class AsgiTest(TestCase):
+    """Recorre el stack en modo ASGI (middlewares async)."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create_user(email='sup@test.com', password='password', first_name='Super', last_name='Visor', dni='9', nivel=7)
+
+    async def test_impersonacion_en_modo_async(self):
+        client = AsyncClient()
+        await client.aforce_login(self.supervisor)
+        await client.get(reverse('asistencias:switch_role', args=[2]))
+        response = await client.get(reverse('asistencias:calendario_json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.asgi_request.nivel_real, 7)
+        self.assertEqual(response.asgi_request.nivel_efectivo, 2)
+        await sync_to_async(self.supervisor.refresh_from_db)()
+        self.assertEqual(self.supervisor.nivel, 7)
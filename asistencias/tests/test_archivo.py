@@ -0,0 +1,109 @@
+import datetime
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias import archivo
+from asistencias.models import (
+    Diplomatura, Materia, Clase, Asistencia, Nota, InscripcionMateria, ResumenNota,
+    ClaseArchivada, AsistenciaArchivada, NotaArchivada, ResumenAsistencia,
+)
+
+User = get_user_model()
+
+
+def _hojas(response):
+    wb = openpyxl.load_workbook(BytesIO(response.content))
+    return {ws.title: [list(fila) for fila in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+
+
+class ArchivoTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.coordinador = User.objects.create_user(email='coord@test.com', password='x', dni='1', nivel=3)
+        self.a1 = User.objects.create_user(email='a1@test.com', password='x', dni='11', nivel=1, last_name='A')
+        self.a2 = User.objects.create_user(email='a2@test.com', password='x', dni='12', nivel=1, last_name='B')
+
+        hace_un_anio = timezone.localdate() - datetime.timedelta(days=365)
+        self.vieja = Diplomatura.objects.create(nombre='Vieja', codigo='V1')
+        self.materia = Materia.objects.create(diplomatura=self.vieja, nombre='Historia', codigo='MV1')
+        clases = [Clase.objects.create(materia=self.materia, fecha=hace_un_anio + datetime.timedelta(days=7 * i),
+                                       hora_inicio=timezone.now(), hora_fin=timezone.now()) for i in range(3)]
+        for alumno in (self.a1, self.a2):
+            InscripcionMateria.objects.create(user=alumno, materia=self.materia)
+        Asistencia.objects.create(clase=clases[0], user=self.a1, presente=True)
+        Asistencia.objects.create(clase=clases[1], user=self.a1, presente=True)
+        Asistencia.objects.create(clase=clases[2], user=self.a2, presente=False)
+        Nota.objects.create(alumno=self.a1, materia=self.materia, valor=Decimal('8'), fecha=hace_un_anio)
+
+        self.actual = Diplomatura.objects.create(nombre='Actual', codigo='A1')
+        materia_actual = Materia.objects.create(diplomatura=self.actual, nombre='Actual', codigo='MA1')
+        clase = Clase.objects.create(materia=materia_actual, fecha=timezone.localdate(),
+                                     hora_inicio=timezone.now(), hora_fin=timezone.now())
+        Asistencia.objects.create(clase=clase, user=self.a1, presente=True)
+
+    def test_terminadas(self):
+        self.assertEqual(list(archivo.terminadas()), [self.vieja])
+        self.assertEqual(list(archivo.terminadas(dias=400)), [])
+
+    def test_archivar_mueve_y_resume(self):
+        out = StringIO()
+        call_command('archivar_diplomaturas', '--dry-run', stdout=out)
+        self.assertIn('V1: 3 clases, 3 asistencias, 1 notas', out.getvalue())
+        self.assertEqual(Clase.objects.count(), 4)
+
+        call_command('archivar_diplomaturas', stdout=StringIO())
+        self.vieja.refresh_from_db()
+        self.assertIsNotNone(self.vieja.archivada_en)
+        self.assertFalse(Clase.objects.filter(materia=self.materia).exists())
+        self.assertEqual(Asistencia.objects.count(), 1)          # solo la cohorte actual
+        self.assertFalse(Nota.objects.filter(materia=self.materia).exists())
+        self.assertEqual((ClaseArchivada.objects.count(), AsistenciaArchivada.objects.count(),
+                          NotaArchivada.objects.count()), (3, 3, 1))
+
+        resumen = {r.alumno_id: (r.presentes, r.clases) for r in ResumenAsistencia.objects.filter(materia=self.materia)}
+        self.assertEqual(resumen, {self.a1.pk: (2, 3), self.a2.pk: (0, 3)})
+        # el promedio sigue disponible aunque las notas se archivaron
+        self.assertEqual(ResumenNota.objects.get(alumno=self.a1, materia=self.materia).promedio, Decimal('8'))
+
+        # archivar de nuevo no hace nada
+        self.assertIsNone(archivo.archivar(self.vieja))
+
+    def test_exportaciones_historicas_iguales_despues_de_archivar(self):
+        self.client.force_login(self.coordinador)
+        urls = [reverse('asistencias:exportar_asistencia_materia', args=[self.materia.pk]),
+                reverse('asistencias:exportar_asistencia_diplomatura', args=[self.vieja.pk])]
+        antes = [_hojas(self.client.get(url)) for url in urls]
+        csv_antes = self.client.get(reverse('asistencias:exportar_reportes')).content
+        completo_antes = _hojas(self.client.get(reverse('asistencias:exportar_xlsx')))
+
+        archivo.archivar(self.vieja)
+
+        self.assertEqual([_hojas(self.client.get(url)) for url in urls], antes)
+        self.assertEqual(self.client.get(reverse('asistencias:exportar_reportes')).content, csv_antes)
+        completo = _hojas(self.client.get(reverse('asistencias:exportar_xlsx')))
+        for hoja in ('Clases', 'Asistencias'):
+            self.assertCountEqual(completo[hoja], completo_antes[hoja])
+        self.assertEqual(len(completo['ResumenAsistencia']), 3)   # encabezado + 2 alumnos
+
+    def test_resumen_de_notas_sobrevive_a_recalcular(self):
+        archivo.archivar(self.vieja)
+        call_command('recalcular_resumen_notas', stdout=StringIO())
+        resumen = ResumenNota.objects.get(alumno=self.a1, materia=self.materia)
+        self.assertEqual((resumen.cantidad, resumen.promedio), (1, Decimal('8')))
+
+        # una nota tardía se suma a las archivadas en vez de reemplazarlas
+        Nota.objects.create(alumno=self.a1, materia=self.materia, valor=Decimal('10'), fecha=timezone.localdate())
+        resumen.refresh_from_db()
+        self.assertEqual((resumen.cantidad, resumen.promedio, resumen.ultima_nota), (2, Decimal('9'), Decimal('10')))
+
+    def test_diplomatura_inexistente(self):
+        with self.assertRaises(CommandError):
+            call_command('archivar_diplomaturas', '--diplomatura', 'NOPE', stdout=StringIO())
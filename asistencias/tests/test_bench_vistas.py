@@ -0,0 +1,57 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from asistencias.management.commands.bench_vistas import comparar
+from asistencias.models import Clase
+
+SEED = ['--diplomaturas', '1', '--materias', '2', '--alumnos', '10', '--docentes', '2',
+        '--materias-por-alumno', '2', '--clases', '2', '--notas', '1', '--procesos', '1']
+ESCENARIOS = ['home_alumno', 'marcar_presente', 'exportar_reportes', 'consulta_publica_dni']
+
+
+class BenchVistasTest(TestCase):
+    def setUp(self):
+        call_command('seed_scale', *SEED, stdout=StringIO())
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = Path(self.dir.name) / 'vistas.json'
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _bench(self, *extra):
+        solo = [a for e in ESCENARIOS for a in ('--solo', e)]
+        out = StringIO()
+        call_command('bench_vistas', *solo, '--repeticiones', '1', '--baseline', str(self.ruta), *extra, stdout=out)
+        return out.getvalue()
+
+    def test_guarda_linea_base_y_detecta_regresion_de_consultas(self):
+        self._bench('--guardar')
+        base = json.loads(self.ruta.read_text())
+        self.assertEqual(set(base['vistas']), set(ESCENARIOS))
+        for m in base['vistas'].values():
+            self.assertNotIn('error', m)
+            self.assertGreater(m['consultas'], 0)
+            self.assertGreater(m['memoria_kb'], 0)
+        self.assertFalse(Clase.objects.filter(tema='bench_vistas').exists())
+
+        # Misma corrida contra su propia línea base (tolerancia amplia: los tiempos varían)
+        self.assertIn("Sin regresiones", self._bench('--tolerancia', '100', '--tolerancia-memoria', '100'))
+
+        base['vistas']['exportar_reportes']['consultas'] -= 1
+        self.ruta.write_text(json.dumps(base))
+        with self.assertRaisesMessage(CommandError, 'exportar_reportes'):
+            self._bench('--tolerancia', '100', '--tolerancia-memoria', '100')
+
+    def test_comparar(self):
+        base = {'v': {'ms': 100.0, 'sql_ms': 10.0, 'consultas': 5, 'memoria_kb': 1000.0}}
+        self.assertEqual(comparar({'v': dict(base['v'], ms=150.0)}, base), [])
+        self.assertEqual(len(comparar({'v': dict(base['v'], ms=200.0, consultas=6)}, base)), 2)
+        self.assertEqual(len(comparar({'v': {'error': 'status 500'}}, base)), 1)
+        # Vistas sin línea base o que ya fallaban no cuentan como regresión
+        self.assertEqual(comparar({'w': {'error': 'x'}, 'v': {'error': 'x'}}, {'v': {'error': 'x'}}), [])
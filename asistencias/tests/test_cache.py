@@ -0,0 +1,87 @@
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria
+from asistencias import cache as cache_versiones
+import datetime
+
+User = get_user_model()
+
+class CacheVistasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.admin = User.objects.create_user(email='admin@test.com', password='password', first_name='Admin', last_name='User', dni='1', nivel=5)
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='password', first_name='Alumno', last_name='Uno', dni='2', nivel=1)
+        self.diplo = Diplomatura.objects.create(nombre='Diplo Cache', codigo='DC')
+        self.materia = Materia.objects.create(diplomatura=self.diplo, nombre='Materia Cache', codigo='MC')
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.materia)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_listar_materias_cacheado_y_correcto_tras_escritura(self):
+        self.client.force_login(self.admin)
+        url = reverse('asistencias:listar_materias')
+
+        _, primera = self._queries(url)
+        response, segunda = self._queries(url)
+        self.assertLess(segunda, primera)
+        self.assertContains(response, 'Materia Cache')
+
+        Materia.objects.create(diplomatura=self.diplo, nombre='Materia Nueva', codigo='MN')
+        response, _ = self._queries(url)
+        self.assertContains(response, 'Materia Nueva')
+
+    def test_listar_diplomaturas_se_invalida_al_borrar(self):
+        self.client.force_login(self.admin)
+        url = reverse('asistencias:listar_diplomaturas')
+        self.assertContains(self.client.get(url), 'Diplo Cache')
+
+        self.diplo.delete()
+        self.assertNotContains(self.client.get(url), 'Diplo Cache')
+
+    def test_eventos_home_se_actualizan_con_nueva_clase(self):
+        self.client.force_login(self.alumno)
+        url = reverse('asistencias:home')
+        self.assertEqual(self.client.get(url).context['eventos'], [])
+
+        ahora = timezone.now()
+        Clase.objects.create(materia=self.materia, fecha=datetime.date(2024, 5, 1), hora_inicio=ahora, hora_fin=ahora)
+        eventos = self.client.get(url).context['eventos']
+        self.assertEqual(len(eventos), 1)
+        self.assertEqual(eventos[0]['start'], '2024-05-01')
+
+    def test_versiones_incrementan(self):
+        v1 = cache_versiones.version('materia', self.materia.id)
+        d1 = cache_versiones.version('diplomatura', self.diplo.id)
+        Clase.objects.create(materia=self.materia, fecha=datetime.date(2024, 5, 1), hora_inicio=timezone.now(), hora_fin=timezone.now())
+        self.assertGreater(cache_versiones.version('materia', self.materia.id), v1)
+        # La clase también invalida la diplomatura de la materia
+        self.assertGreater(cache_versiones.version('diplomatura', self.diplo.id), d1)
+
+    def test_clase_no_invalida_el_catalogo(self):
+        catalogo = cache_versiones.version(cache_versiones.CATALOGO)
+        calendario = cache_versiones.version(cache_versiones.CALENDARIO)
+        Clase.objects.create(materia=self.materia, fecha=datetime.date(2024, 5, 1), hora_inicio=timezone.now(), hora_fin=timezone.now())
+        self.assertEqual(cache_versiones.version(cache_versiones.CATALOGO), catalogo)
+        self.assertGreater(cache_versiones.version(cache_versiones.CALENDARIO), calendario)
+
+    def test_asistencia_invalida_sin_consultas_extra(self):
+        clase = Clase.objects.create(materia=self.materia, fecha=datetime.date(2024, 5, 1), hora_inicio=timezone.now(), hora_fin=timezone.now())
+        v = cache_versiones.version('materia', self.materia.id)
+        d = cache_versiones.version('diplomatura', self.diplo.id)
+        catalogo = cache_versiones.version(cache_versiones.CATALOGO)
+        # Con la clase cargada y la diplomatura de la materia en cache: solo el INSERT
+        with self.assertNumQueries(1):
+            Asistencia.objects.create(clase=clase, user=self.alumno)
+        self.assertGreater(cache_versiones.version('materia', self.materia.id), v)
+        self.assertGreater(cache_versiones.version('diplomatura', self.diplo.id), d)
+        self.assertEqual(cache_versiones.version(cache_versiones.CATALOGO), catalogo)
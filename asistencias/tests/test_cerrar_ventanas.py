@@ -0,0 +1,71 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria
+
+User = get_user_model()
+
+
+class CerrarVentanasTest(TestCase):
+    def setUp(self):
+        diplo = Diplomatura.objects.create(nombre='Diplo', codigo='D1')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Materia', codigo='M1')
+        self.alumnos = [User.objects.create_user(email=f'a{i}@test.com', password='x', dni=str(10 + i), nivel=1)
+                        for i in range(3)]
+        for a in self.alumnos:
+            InscripcionMateria.objects.create(user=a, materia=self.materia)
+        ahora = timezone.now()
+        hora = datetime.timedelta(hours=1)
+        self.vencida = Clase.objects.create(materia=self.materia, fecha=timezone.localdate(),
+                                            hora_inicio=ahora - 3 * hora, hora_fin=ahora - hora)
+        self.abierta = Clase.objects.create(materia=self.materia, fecha=timezone.localdate(),
+                                            hora_inicio=ahora - hora, hora_fin=ahora + hora)
+        Asistencia.objects.create(clase=self.vencida, user=self.alumnos[0])
+
+    def _cerrar(self):
+        out = StringIO()
+        call_command('cerrar_ventanas', stdout=out)
+        return out.getvalue()
+
+    def _marcas(self, clase):
+        return dict(Asistencia.objects.filter(clase=clase).values_list('user_id', 'presente'))
+
+    def test_registra_ausentes_de_ventanas_vencidas(self):
+        self.assertIn('Clases cerradas: 1, ausentes registrados: 2', self._cerrar())
+        a0, a1, a2 = (a.pk for a in self.alumnos)
+        self.assertEqual(self._marcas(self.vencida), {a0: True, a1: False, a2: False})
+        self.assertEqual(self._marcas(self.abierta), {})
+        self.vencida.refresh_from_db()
+        self.assertIsNotNone(self.vencida.cerrada_en)
+        # ya cerrada: no se vuelve a procesar
+        self.assertIn('Clases cerradas: 0', self._cerrar())
+
+    def test_un_bulk_create_por_clase(self):
+        # inscriptos sin asistencia + insert + marca de cerrada, sin importar cuántos falten
+        with self.assertNumQueries(3):
+            self.vencida.cerrar_ventana()
+
+    def test_ventana_reabierta(self):
+        self._cerrar()
+        nuevo = User.objects.create_user(email='nuevo@test.com', password='x', dni='99', nivel=1)
+        InscripcionMateria.objects.create(user=nuevo, materia=self.materia)
+
+        # el docente corre hora_fin: el ausente puede dar presente
+        Clase.objects.filter(pk=self.vencida.pk).update(hora_fin=timezone.now() + datetime.timedelta(hours=1))
+        client = Client()
+        client.force_login(self.alumnos[1])
+        client.get(reverse('asistencias:marcar_presente', args=[self.vencida.pk]))
+        self.assertTrue(self._marcas(self.vencida)[self.alumnos[1].pk])
+
+        # al volver a vencer (después del cierre anterior) se cierra de nuevo y registra al inscripto nuevo
+        ahora = timezone.now()
+        Clase.objects.filter(pk=self.vencida.pk).update(cerrada_en=ahora - datetime.timedelta(minutes=10),
+                                                        hora_fin=ahora - datetime.timedelta(minutes=1))
+        self.assertIn('ausentes registrados: 1', self._cerrar())
+        self.assertIs(self._marcas(self.vencida)[nuevo.pk], False)
@@ -0,0 +1,143 @@
+import datetime
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias import checkin
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria, ProfesorMateria
+
+User = get_user_model()
+
+
+class CheckinTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        diplo = Diplomatura.objects.create(nombre='Diplo', codigo='D1')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Materia', codigo='M1')
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='x', dni='1', nivel=1)
+        self.docente = User.objects.create_user(email='docente@test.com', password='x', dni='2', nivel=2)
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.materia)
+        ProfesorMateria.objects.create(user=self.docente, materia=self.materia, rol='adjunto')
+        ahora = timezone.now()
+        self.clase = Clase.objects.create(materia=self.materia, fecha=timezone.localdate(),
+                                          hora_inicio=ahora - datetime.timedelta(hours=1),
+                                          hora_fin=ahora + datetime.timedelta(hours=1))
+
+    def _escanear(self, codigo):
+        return self.client.get(reverse('asistencias:usar_qr', args=[codigo]))
+
+    def test_verificar_sin_consultas(self):
+        codigo = checkin.emitir(self.clase)
+        with self.assertNumQueries(0):
+            pase = checkin.verificar(codigo)
+        self.assertEqual((pase.clase_id, pase.materia_id, pase.diplomatura_id),
+                         (self.clase.pk, self.materia.pk, self.materia.diplomatura_id))
+
+    def test_rechazos(self):
+        codigo = checkin.emitir(self.clase)
+        payload, _, firma = codigo.rpartition('.')
+        otra_clase = payload.replace(str(self.clase.pk), str(self.clase.pk + 1), 1)
+        rotacion = checkin.rotacion()
+        casos = {
+            'formato': 'basura',
+            'firma': f"{otra_clase}.{firma}",
+            'vencido': checkin.emitir(self.clase, ahora=time.time() - 3 * rotacion),
+            'fuera de ventana': checkin.emitir(self.clase, ahora=self.clase.hora_fin.timestamp() + 1),
+        }
+        for motivo, codigo in casos.items():
+            ahora = self.clase.hora_fin.timestamp() + 1 if motivo == 'fuera de ventana' else None
+            with self.subTest(motivo), self.assertNumQueries(0):
+                with self.assertRaises(checkin.CodigoInvalido) as ctx:
+                    checkin.verificar(codigo, ahora=ahora)
+                self.assertEqual(ctx.exception.motivo, motivo)
+        # dentro de la tolerancia: la rotación anterior sigue valiendo
+        checkin.verificar(checkin.emitir(self.clase, ahora=time.time() - rotacion))
+
+    @override_settings(SECRET_KEY='clave-nueva', SECRET_KEY_FALLBACKS=['clave-vieja'])
+    def test_rotacion_de_clave(self):
+        with override_settings(SECRET_KEY='clave-vieja'):
+            codigo = checkin.emitir(self.clase)
+        self.assertEqual(checkin.verificar(codigo).clase_id, self.clase.pk)
+
+    def test_codigo_invalido_rechazado_sin_consultas(self):
+        vencido = checkin.emitir(self.clase, ahora=time.time() - 3 * checkin.rotacion())
+        for codigo in ('1.2.3.4.5.6.firmafalsa', vencido):
+            with self.subTest(codigo), self.assertNumQueries(0):
+                self.assertEqual(self._escanear(codigo).status_code, 403)
+        # con sesión iniciada tampoco se lee sesión ni usuario
+        self.client.force_login(self.alumno)
+        for codigo in ('1.2.3.4.5.6.firmafalsa', vencido):
+            with self.subTest(codigo, logueado=True), self.assertNumQueries(0):
+                self.assertEqual(self._escanear(codigo).status_code, 403)
+
+    def test_escaneo_registra_presente_una_vez(self):
+        self.client.force_login(self.alumno)
+        codigo = checkin.emitir(self.clase)
+        r = self._escanear(codigo)
+        self.assertRedirects(r, reverse('asistencias:ver_clases', args=[self.materia.pk]),
+                             fetch_redirect_response=False)
+        self._escanear(codigo)
+        self.assertEqual(list(Asistencia.objects.filter(clase=self.clase).values_list('user_id', 'presente')),
+                         [(self.alumno.pk, True)])
+
+    def test_escaneo_pasa_ausente_a_presente(self):
+        Asistencia.objects.create(clase=self.clase, user=self.alumno, presente=False)
+        Asistencia.objects.update(timestamp=timezone.now() - datetime.timedelta(hours=1))
+        desde = timezone.now()
+        self.client.force_login(self.alumno)
+        self._escanear(checkin.emitir(self.clase))
+        asistencia = Asistencia.objects.get(clase=self.clase, user=self.alumno)
+        self.assertTrue(asistencia.presente)
+        # timestamp renovado: lo ven cambios/ y el sondeo de eventos
+        self.assertGreaterEqual(asistencia.timestamp, desde)
+
+    def test_escaneo_requiere_inscripcion(self):
+        ajeno = User.objects.create_user(email='ajeno@test.com', password='x', dni='3', nivel=1)
+        self.client.force_login(ajeno)
+        self.assertEqual(self._escanear(checkin.emitir(self.clase)).status_code, 403)
+        self.client.force_login(self.docente)
+        self.assertEqual(self._escanear(checkin.emitir(self.clase)).status_code, 403)
+        self.assertFalse(Asistencia.objects.exists())
+
+    def test_escaneo_anonimo_vuelve_del_login_con_el_codigo_vencido(self):
+        codigo = checkin.emitir(self.clase)
+        r = self._escanear(codigo)
+        self.assertEqual(r.status_code, 302)
+        self.assertIn('login', r['Location'])
+        vuelta = f"{reverse('asistencias:usar_qr', args=[codigo])}?{checkin.PENDIENTE}=1"
+
+        self.client.force_login(self.alumno)
+        # rotaciones de 1s: el código (de una rotación de 30s) ya está vencido
+        with override_settings(CHECKIN_TOLERANCIA=0, CHECKIN_ROTACION=1):
+            with self.assertRaisesMessage(checkin.CodigoInvalido, 'vencido'):
+                checkin.verificar(codigo)
+            self.assertEqual(self.client.get(vuelta).status_code, 302)
+            self.assertTrue(Asistencia.objects.get(clase=self.clase, user=self.alumno).presente)
+            # se acepta una sola vez
+            self.assertEqual(self.client.get(vuelta).status_code, 403)
+
+    def test_pendiente_sin_escaneo_previo_no_vale(self):
+        self.client.force_login(self.alumno)
+        codigo = checkin.emitir(self.clase, ahora=time.time() - 3 * checkin.rotacion())
+        r = self.client.get(f"{reverse('asistencias:usar_qr', args=[codigo])}?{checkin.PENDIENTE}=1")
+        self.assertEqual(r.status_code, 403)
+        self.assertFalse(Asistencia.objects.exists())
+
+    def test_pagina_del_docente(self):
+        url = reverse('asistencias:qr_clase', args=[self.clase.pk])
+        self.client.force_login(self.docente)
+        r = self.client.get(url)
+        self.assertContains(r, '<svg')
+        self.assertIn('no-cache', r['Cache-Control'])
+        self.client.force_login(self.alumno)
+        self.assertNotEqual(self.client.get(url).status_code, 200)
+
+    def test_bench(self):
+        out = StringIO()
+        call_command('bench_checkin', '--n', '10', stdout=out)
+        self.assertIn('verificar válido', out.getvalue())
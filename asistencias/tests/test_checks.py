@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from asistencias import checks
+
+PROD_LOADERS = [('django.template.loaders.cached.Loader', ['django.template.loaders.filesystem.Loader'])]
+
+
+def _ids(funcion):
+    return [e.id for e in funcion(None)]
+
+
+class ChequeosRendimientoTest(SimpleTestCase):
+    def test_perfil_de_tests(self):
+        self.assertEqual(settings.ENTORNO, 'test')
+        self.assertFalse(settings.DEBUG)
+
+    def test_debug(self):
+        with override_settings(DEBUG=True):
+            self.assertEqual(_ids(checks.chequear_debug), ['asistencias.W001'])
+            with override_settings(ENTORNO='prod'):
+                self.assertEqual(_ids(checks.chequear_debug), ['asistencias.E001'])
+        self.assertEqual(_ids(checks.chequear_debug), [])
+
+    def test_templates(self):
+        base = settings.TEMPLATES[0]
+        sin_cache = [{**base, 'APP_DIRS': False,
+                      'OPTIONS': {**base['OPTIONS'], 'loaders': ['django.template.loaders.filesystem.Loader']}}]
+        con_cache = [{**base, 'APP_DIRS': False, 'OPTIONS': {**base['OPTIONS'], 'loaders': PROD_LOADERS}}]
+        with override_settings(TEMPLATES=sin_cache):
+            self.assertEqual(_ids(checks.chequear_templates), ['asistencias.W002'])
+        with override_settings(TEMPLATES=con_cache):
+            self.assertEqual(_ids(checks.chequear_templates), [])
+
+    def test_cache_sesiones_y_uploads(self):
+        # settings_test usa LocMemCache: válido para tests, no para varios workers
+        self.assertEqual(_ids(checks.chequear_cache), ['asistencias.W003'])
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.assertEqual(_ids(checks.chequear_sesiones), ['asistencias.W004'])
+        with override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=50 * 1024 * 1024, DATA_UPLOAD_MAX_MEMORY_SIZE=None):
+            self.assertEqual(_ids(checks.chequear_uploads), ['asistencias.W006', 'asistencias.W007'])
+        self.assertEqual(_ids(checks.chequear_uploads), [])
+
+    def test_conexiones(self):
+        db = {**settings.DATABASES['default'], 'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 0, 'OPTIONS': {}}
+        with override_settings(DATABASES={'default': db}):
+            self.assertEqual(_ids(checks.chequear_conexiones), ['asistencias.W005'])
+        db['OPTIONS'] = {'pool': {'max_size': 10}}
+        with override_settings(DATABASES={'default': db}):
+            with mock.patch.object(checks, 'find_spec', return_value=None):
+                self.assertEqual(_ids(checks.chequear_conexiones), ['asistencias.E002'])
+            with mock.patch.object(checks, 'find_spec', return_value=object()):
+                self.assertEqual(_ids(checks.chequear_conexiones), [])
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from asistencias import documentos
+
+
+class DocumentosTest(SimpleTestCase):
+    def test_urlconf_no_importa_motores_pesados(self):
+        # Intérprete limpio: en este proceso los tests ya importaron openpyxl
+        codigo = (
+            "import sys, django; django.setup()\n"
+            "from django.urls import get_resolver; get_resolver().url_patterns\n"
+            "print(' '.join(m for m in ('openpyxl', 'reportlab') if m in sys.modules))\n"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'diplomaturas.settings_test'}
+        out = subprocess.run([sys.executable, '-c', codigo], env=env, cwd=settings.BASE_DIR,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), '')
+
+    def test_registro(self):
+        self.assertEqual(set(documentos.formatos()), {'xlsx', 'pdf', 'qr'})
+        self.assertTrue(hasattr(documentos.cargar('xlsx'), 'libro'))
+        resp = documentos.respuesta('pdf', b'%PDF-', 'constancia_1')
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="constancia_1.pdf"')
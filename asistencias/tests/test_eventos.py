@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias import eventos
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria
+
+User = get_user_model()
+
+
+@override_settings(SSE_ACTIVO=True)
+class EventosAsistenciaTest(TestCase):
+    def setUp(self):
+        self.profe = User.objects.create_user(email='profe@test.com', password='password', first_name='Profe', last_name='Sor', dni='1', nivel=2)
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='password', first_name='Ana', last_name='Alvarez', dni='2', nivel=1)
+        self.alumno2 = User.objects.create_user(email='alumno2@test.com', password='password', first_name='Beto', last_name='Benitez', dni='3', nivel=1)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='Profe', dni='4', nivel=2)
+        diplo = Diplomatura.objects.create(nombre='Diplo SSE', codigo='DS')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Materia SSE', codigo='MS', profesor_titular=self.profe)
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.materia)
+        InscripcionMateria.objects.create(user=self.alumno2, materia=self.materia)
+        ahora = timezone.now()
+        self.clase = Clase.objects.create(materia=self.materia, fecha=ahora.date(),
+                                          hora_inicio=ahora - datetime.timedelta(hours=1),
+                                          hora_fin=ahora + datetime.timedelta(hours=1))
+
+    async def test_espectadores_comparten_un_canal_y_reciben_publicaciones(self):
+        canal1, cola1 = await eventos.suscribir(self.clase.id)
+        canal2, cola2 = await eventos.suscribir(self.clase.id)
+        try:
+            self.assertIs(canal1, canal2)
+            a = await Asistencia.objects.acreate(clase=self.clase, user=self.alumno)
+            eventos.publicar(a.clase_id, a.user_id, a.presente, a.timestamp)
+            for cola in (cola1, cola2):
+                evento = await asyncio.wait_for(cola.get(), timeout=1)
+                self.assertEqual(evento['id'], self.alumno.id)
+            # Repetir la publicación no genera un segundo evento
+            eventos.publicar(a.clase_id, a.user_id, a.presente, a.timestamp)
+            await asyncio.sleep(0.05)
+            self.assertTrue(cola1.empty())
+        finally:
+            eventos.desuscribir(canal1, cola1)
+            eventos.desuscribir(canal2, cola2)
+        self.assertNotIn(self.clase.id, eventos._canales)
+
+    async def test_falla_al_cargar_no_deja_canal_muerto(self):
+        original = eventos._Canal._cargar
+        puede_seguir = asyncio.Event()
+
+        async def falla(canal):
+            await puede_seguir.wait()
+            raise ConnectionError("base caída")
+
+        eventos._Canal._cargar = falla
+        try:
+            primero = asyncio.ensure_future(eventos.suscribir(self.clase.id))
+            await asyncio.sleep(0)
+            segundo = asyncio.ensure_future(eventos.suscribir(self.clase.id))
+            await asyncio.sleep(0)
+            puede_seguir.set()
+            with self.assertRaises(ConnectionError):
+                await primero
+            with self.assertRaises(RuntimeError):
+                await segundo
+        finally:
+            eventos._Canal._cargar = original
+        self.assertNotIn(self.clase.id, eventos._canales)
+
+        # con la base de vuelta, el siguiente espectador arma un canal sano
+        canal, cola = await eventos.suscribir(self.clase.id)
+        try:
+            self.assertIsNotNone(canal.tarea)
+        finally:
+            eventos.desuscribir(canal, cola)
+
+    @override_settings(SSE_INTERVALO_SONDEO=0.05)
+    async def test_sondeo_detecta_escrituras_sin_senal(self):
+        canal, cola = await eventos.suscribir(self.clase.id)
+        try:
+            # bulk_create no dispara post_save: lo encuentra el sondeo
+            await Asistencia.objects.abulk_create([Asistencia(clase=self.clase, user=self.alumno2)])
+            evento = await asyncio.wait_for(cola.get(), timeout=2)
+            self.assertEqual(evento['id'], self.alumno2.id)
+        finally:
+            eventos.desuscribir(canal, cola)
+
+    async def _leer_stream(self, client, clase):
+        response = await client.get(reverse('asistencias:eventos_clase_sse', args=[clase.id]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+    async def test_sse_envia_estado_y_cierra_al_terminar_la_ventana(self):
+        await Asistencia.objects.acreate(clase=self.clase, user=self.alumno)
+        self.clase.hora_fin = timezone.now() - eventos.MARGEN
+        await self.clase.asave()
+
+        client = AsyncClient()
+        await client.aforce_login(self.profe)
+        contenido = await self._leer_stream(client, self.clase)
+        bloques = [b for b in contenido.split('\n\n') if b.startswith('id:')]
+        self.assertEqual(len(bloques), 1)
+        datos = json.loads(bloques[0].split('data: ', 1)[1])
+        self.assertEqual(datos['id'], self.alumno.id)
+        self.assertIn('event: fin', contenido)
+
+    async def test_sse_sin_permiso(self):
+        client = AsyncClient()
+        await client.aforce_login(self.otro)
+        response = await client.get(reverse('asistencias:eventos_clase_sse', args=[self.clase.id]))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_sse_apagado_responde_204(self):
+        client = AsyncClient()
+        await client.aforce_login(self.profe)
+        with override_settings(SSE_ACTIVO=False):
+            response = await client.get(reverse('asistencias:eventos_clase_sse', args=[self.clase.id]))
+        self.assertEqual(response.status_code, 204)
+
+    def test_planilla_usa_sse_solo_por_asgi(self):
+        url = reverse('asistencias:ver_asistencia_clase', args=[self.clase.id])
+        client = Client()
+        client.force_login(self.profe)
+        # WSGI: la planilla sondea cambios/ y el endpoint SSE no abre streams
+        self.assertNotContains(client.get(url), 'new EventSource')
+        self.assertEqual(client.get(reverse('asistencias:eventos_clase_sse', args=[self.clase.id])).status_code, 204)
+
+    async def test_planilla_por_asgi_abre_sse(self):
+        client = AsyncClient()
+        await client.aforce_login(self.profe)
+        response = await client.get(reverse('asistencias:ver_asistencia_clase', args=[self.clase.id]))
+        self.assertContains(response, 'new EventSource')
@@ -0,0 +1,218 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+import shutil
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, OperationalError
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from asistencias.models import Diplomatura, Materia, InscripcionDiplomatura, InscripcionMateria, ImportacionInscripciones
+from asistencias.importador import leer_filas, importar_inscripciones, procesar_pendientes
+
+User = get_user_model()
+
+
+class ImportadorInscripcionesTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.coord = User.objects.create_user(email='coord@test.com', password='password', first_name='Coord', last_name='Uno', dni='1', nivel=3)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='Coord', dni='2', nivel=3)
+        self.existente = User.objects.create_user(email='ya@test.com', password='password', first_name='Ya', last_name='Existe', dni='30111222', nivel=1)
+        self.diplo = Diplomatura.objects.create(nombre='Diplo Import', codigo='DI')
+        self.diplo.coordinadores.add(self.coord)
+        self.materia = Materia.objects.create(diplomatura=self.diplo, nombre='Materia Import', codigo='MI')
+        ajena = Diplomatura.objects.create(nombre='Ajena', codigo='AJ')
+        Materia.objects.create(diplomatura=ajena, nombre='Materia Ajena', codigo='MA')
+
+    def _csv(self, texto, nombre='alumnos.csv'):
+        return SimpleUploadedFile(nombre, texto.encode('utf-8'), content_type='text/csv')
+
+    def test_csv_crea_usuarios_e_inscripciones_y_reporta_errores(self):
+        archivo = self._csv(
+            "dni,email,nombre,apellido,materia_codigo\n"
+            "40.111.222,nuevo@test.com,Nuevo,Alumno,MI\n"
+            "30111222,ya@test.com,Ya,Existe,\n"
+            "abc,malo@test.com,X,Y,\n"
+            "40222333,no-es-email,X,Y,\n"
+            "40333444,ajena@test.com,X,Y,MA\n"
+            "40444555,ya@test.com,Otro,Dni,\n"
+        )
+        res = importar_inscripciones(self.diplo, leer_filas(archivo))
+
+        self.assertEqual(res.filas, 6)
+        self.assertEqual(res.usuarios_creados, 1)
+        self.assertEqual(res.inscripciones_diplomatura, 2)
+        self.assertEqual(res.inscripciones_materia, 1)
+        self.assertEqual([nro for nro, _ in res.errores], [4, 5, 6, 7])
+
+        nuevo = User.objects.get(dni='40111222')
+        self.assertEqual(nuevo.nivel, 1)
+        self.assertFalse(nuevo.has_usable_password())
+        self.assertTrue(InscripcionMateria.objects.filter(user=nuevo, materia=self.materia).exists())
+        self.assertTrue(InscripcionDiplomatura.objects.filter(user=self.existente, diplomatura=self.diplo).exists())
+
+    def test_email_existente_con_mayusculas(self):
+        User.objects.create_user(email='Mixto@Test.com', password='password', dni='50111222', nivel=1)
+        res = importar_inscripciones(self.diplo, leer_filas(self._csv(
+            "dni,email,nombre,apellido,materia_codigo\n"
+            "50999888,MIXTO@test.com,Otro,Dni,\n"
+        )))
+        self.assertEqual(res.usuarios_creados, 0)
+        self.assertIn('ya pertenece al DNI 50111222', res.errores[0][1])
+        self.assertEqual(User.objects.filter(email__iexact='mixto@test.com').count(), 1)
+
+    def test_reimportar_es_idempotente(self):
+        texto = "dni;email;nombre;apellido;materia_codigo\n40111222;nuevo@test.com;Nuevo;Alumno;MI\n"
+        importar_inscripciones(self.diplo, leer_filas(self._csv(texto)))
+        res = importar_inscripciones(self.diplo, leer_filas(self._csv(texto)))
+
+        self.assertEqual((res.usuarios_creados, res.inscripciones_diplomatura, res.inscripciones_materia), (0, 0, 0))
+        self.assertEqual(InscripcionDiplomatura.objects.filter(diplomatura=self.diplo).count(), 1)
+
+    def test_xlsx_streaming(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['DNI', 'Email', 'Nombre', 'Apellido', 'Materia codigo'])
+        ws.append([40111222, 'xlsx@test.com', 'Hoja', 'Calculo', 'MI'])
+        buf = BytesIO()
+        wb.save(buf)
+        archivo = SimpleUploadedFile('alumnos.xlsx', buf.getvalue())
+
+        res = importar_inscripciones(self.diplo, leer_filas(archivo))
+        self.assertEqual(res.errores, [])
+        self.assertTrue(InscripcionMateria.objects.filter(user__dni='40111222', materia=self.materia).exists())
+
+    def test_consultas_acotadas_por_lote(self):
+        filas = "".join(f"{40000000 + i},a{i}@test.com,A{i},B{i},MI\n" for i in range(300))
+        archivo = self._csv("dni,email,nombre,apellido,materia_codigo\n" + filas)
+        with CaptureQueriesContext(connection) as ctx:
+            res = importar_inscripciones(self.diplo, leer_filas(archivo), batch_size=1000)
+        self.assertEqual(res.usuarios_creados, 300)
+        self.assertEqual(res.inscripciones_materia, 300)
+        self.assertLess(len(ctx.captured_queries), 20)
+
+    def test_dry_run_no_escribe(self):
+        archivo = self._csv("dni,email,nombre,apellido,materia_codigo\n"
+                            "40111222,nuevo@test.com,Nuevo,Alumno,MI\n40111222,nuevo@test.com,Nuevo,Alumno,MI\n")
+        res = importar_inscripciones(self.diplo, leer_filas(archivo), dry_run=True)
+
+        self.assertEqual((res.usuarios_creados, res.inscripciones_diplomatura, res.inscripciones_materia), (1, 1, 1))
+        self.assertEqual(res.duplicados, 2)
+        self.assertFalse(User.objects.filter(dni='40111222').exists())
+
+
+class ImportacionTrabajoTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = Client()
+        self.coord = User.objects.create_user(email='coord@test.com', password='password', first_name='Coord', last_name='Uno', dni='1', nivel=3)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='Coord', dni='2', nivel=3)
+        self.diplo = Diplomatura.objects.create(nombre='Diplo Import', codigo='DI')
+        self.diplo.coordinadores.add(self.coord)
+        Materia.objects.create(diplomatura=self.diplo, nombre='Materia Import', codigo='MI')
+        self.url = reverse('asistencias:cargar_excel', args=[self.diplo.id])
+        self.texto = "dni,email,nombre,apellido,materia_codigo\n40111222,nuevo@test.com,Nuevo,Alumno,MI\nabc,x@test.com,X,Y,\n"
+
+    def _subir(self):
+        archivo = SimpleUploadedFile('alumnos.csv', self.texto.encode('utf-8'), content_type='text/csv')
+        return self.client.post(self.url, {'archivo': archivo})
+
+    def test_solo_coordinador_de_la_diplomatura(self):
+        self.client.force_login(self.otro)
+        self.assertEqual(self._subir().status_code, 403)
+        self.assertFalse(ImportacionInscripciones.objects.exists())
+
+    def test_flujo_completo_analisis_confirmacion_y_aplicacion(self):
+        self.client.force_login(self.coord)
+        response = self._subir()
+        imp = ImportacionInscripciones.objects.get()
+        self.assertRedirects(response, reverse('asistencias:importacion_detalle', args=[imp.id]))
+        self.assertEqual(imp.estado, ImportacionInscripciones.PENDIENTE)
+        # La subida no toca las inscripciones
+        self.assertFalse(User.objects.filter(dni='40111222').exists())
+
+        self.assertEqual(procesar_pendientes(), 1)
+        imp.refresh_from_db()
+        self.assertEqual(imp.estado, ImportacionInscripciones.ANALIZADA)
+        self.assertEqual(imp.total_filas, 2)
+        self.assertEqual(imp.diff['usuarios_creados'], 1)
+        self.assertEqual(imp.diff['conflictos'], 1)
+        self.assertEqual(imp.errores[0][0], 3)
+        self.assertFalse(User.objects.filter(dni='40111222').exists())
+
+        estado = self.client.get(reverse('asistencias:importacion_estado', args=[imp.id])).json()
+        self.assertEqual(estado['estado'], 'analizada')
+        self.assertEqual(estado['porcentaje'], 100)
+
+        self.client.post(reverse('asistencias:importacion_confirmar', args=[imp.id]))
+        call_command('procesar_importaciones', '--una-vez', stdout=StringIO())
+        imp.refresh_from_db()
+        self.assertEqual(imp.estado, ImportacionInscripciones.COMPLETADA)
+        self.assertEqual(imp.resultado['inscripciones_materia'], 1)
+        self.assertTrue(InscripcionDiplomatura.objects.filter(user__dni='40111222', diplomatura=self.diplo).exists())
+
+        response = self.client.get(reverse('asistencias:importacion_detalle', args=[imp.id]))
+        self.assertContains(response, 'Completada')
+
+    def test_resubir_el_mismo_archivo_reutiliza_el_trabajo(self):
+        self.client.force_login(self.coord)
+        self._subir()
+        self._subir()
+        self.assertEqual(ImportacionInscripciones.objects.count(), 1)
+
+    def test_no_se_confirma_antes_del_analisis(self):
+        self.client.force_login(self.coord)
+        self._subir()
+        imp = ImportacionInscripciones.objects.get()
+        self.client.post(reverse('asistencias:importacion_confirmar', args=[imp.id]))
+        imp.refresh_from_db()
+        self.assertEqual(imp.estado, ImportacionInscripciones.PENDIENTE)
+
+    def test_trabajo_huerfano_vuelve_a_la_cola(self):
+        P = ImportacionInscripciones
+        self.client.force_login(self.coord)
+        self._subir()
+        imp = P.objects.get()
+        # El worker muere a mitad del análisis: nada lo saca de "analizando"
+        with mock.patch('asistencias.importador.importar_inscripciones', side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                procesar_pendientes()
+        imp.refresh_from_db()
+        self.assertEqual(imp.estado, P.ANALIZANDO)
+        self.assertEqual(procesar_pendientes(), 0)  # dentro del lease sigue tomado
+
+        P.objects.filter(pk=imp.pk).update(actualizado=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(procesar_pendientes(), 1)
+        imp.refresh_from_db()
+        self.assertEqual(imp.estado, P.ANALIZADA)
+
+    def test_resubir_reemplaza_un_trabajo_huerfano(self):
+        P = ImportacionInscripciones
+        self.client.force_login(self.coord)
+        self._subir()
+        P.objects.update(estado=P.APLICANDO, actualizado=timezone.now() - timedelta(seconds=601))
+        self._subir()
+        self.assertEqual(P.objects.count(), 2)
+        self.assertEqual(P.objects.filter(estado=P.ERROR).count(), 1)
+        self.assertEqual(P.objects.filter(estado=P.PENDIENTE).count(), 1)
+
+    def test_worker_una_vez_falla_sin_girar_en_vacio(self):
+        with mock.patch('asistencias.management.commands.procesar_importaciones.procesar_pendientes',
+                        side_effect=OperationalError('base caída')) as procesar:
+            with self.assertRaises(CommandError):
+                call_command('procesar_importaciones', '--una-vez', stdout=StringIO())
+        self.assertEqual(procesar.call_count, 1)
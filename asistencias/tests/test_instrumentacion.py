@@ -0,0 +1,81 @@
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from asistencias import instrumentacion
+from asistencias.models import Diplomatura, Materia, InscripcionMateria
+
+User = get_user_model()
+
+
+def _timing(response):
+    return {nombre: (float(dur), resto) for nombre, dur, resto in
+            re.findall(r'(\w+);dur=([\d.]+)(;desc="[^"]*")?', response['Server-Timing'])}
+
+
+class InstrumentacionTest(TestCase):
+    def setUp(self):
+        instrumentacion.reiniciar()
+        self.client = Client()
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='x', dni='1', nivel=1)
+        self.supervisor = User.objects.create_user(email='super@test.com', password='x', dni='2', nivel=7)
+        diplo = Diplomatura.objects.create(nombre='Diplo', codigo='D1')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Materia', codigo='M1')
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.materia)
+
+    def test_server_timing_cuenta_consultas_y_templates(self):
+        self.client.force_login(self.supervisor)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('asistencias:home'))
+        timing = _timing(response)
+        self.assertEqual(set(timing), {'sql', 'tpl', 'vista'})
+        self.assertEqual(timing['sql'][1], f';desc="{len(ctx.captured_queries)} consultas"')
+        self.assertGreater(timing['tpl'][0], 0)
+        self.assertGreaterEqual(timing['vista'][0], timing['tpl'][0])
+
+    def test_vista_async_y_log(self):
+        self.client.force_login(self.supervisor)
+        with self.assertLogs('asistencias.rendimiento', 'INFO') as logs:
+            response = self.client.get(reverse('asistencias:publico'))
+        self.assertIn('consultas', response['Server-Timing'])
+        linea = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(linea['ruta'], 'asistencias:publico')
+        self.assertEqual(linea['status'], 200)
+        self.assertGreater(linea['consultas'], 0)
+        self.assertLessEqual(len(linea['lentas']), instrumentacion.MAX_LENTAS)
+
+    def test_server_timing_solo_para_supervisores_y_staff(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('asistencias:consulta_publica')))
+        self.client.force_login(self.alumno)
+        self.assertNotIn('Server-Timing', self.client.get(reverse('asistencias:home')))
+        self.alumno.is_staff = True
+        self.alumno.save()
+        self.assertIn('Server-Timing', self.client.get(reverse('asistencias:home')))
+
+    def test_agregado_solo_para_supervisor(self):
+        self.client.force_login(self.alumno)
+        for _ in range(3):
+            self.client.get(reverse('asistencias:home'))
+        self.assertEqual(self.client.get(reverse('asistencias:rendimiento')).status_code, 403)
+
+        self.client.force_login(self.supervisor)
+        data = self.client.get(reverse('asistencias:rendimiento'), {'formato': 'json'}).json()
+        home = next(f for f in data['rutas'] if f['ruta'] == 'asistencias:home')
+        self.assertEqual(home['requests'], 3)
+        self.assertContains(self.client.get(reverse('asistencias:rendimiento')), 'asistencias:home')
+
+        self.client.post(reverse('asistencias:rendimiento'))
+        rutas = [f['ruta'] for f in self.client.get(reverse('asistencias:rendimiento'), {'formato': 'json'}).json()['rutas']]
+        self.assertNotIn('asistencias:home', rutas)
+
+    def test_guarda_las_consultas_mas_lentas(self):
+        m = instrumentacion.Medicion()
+        for i, s in enumerate([0.1, 0.5, 0.2, 0.9, 0.05]):
+            m.registrar_consulta(f"SELECT {i}", s)
+        self.assertEqual(m.consultas, 5)
+        self.assertEqual([sql for _, sql in m.mas_lentas()], ['SELECT 3', 'SELECT 1', 'SELECT 2'])
@@ -0,0 +1,82 @@
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from asistencias.models import Diplomatura, Materia, InscripcionMateria, ProfesorMateria
+from asistencias.views import alumno as vistas_alumno
+
+User = get_user_model()
+
+
+class ListarMateriasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('asistencias:listar_materias')
+        self.admin = User.objects.create_user(email='admin@test.com', password='password', first_name='Admin', last_name='User', dni='1', nivel=5)
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='password', first_name='Ana', last_name='Alumna', dni='2', nivel=1)
+        self.coord = User.objects.create_user(email='coord@test.com', password='password', first_name='Coord', last_name='Uno', dni='3', nivel=3)
+        self.adjunto = User.objects.create_user(email='adj@test.com', password='password', first_name='Adj', last_name='Unto', dni='4', nivel=2)
+
+        self.d1 = Diplomatura.objects.create(nombre='A Diplo', codigo='D1')
+        self.d2 = Diplomatura.objects.create(nombre='B Diplo', codigo='D2')
+        self.d2.coordinadores.add(self.coord)
+        self.m1 = Materia.objects.create(diplomatura=self.d1, nombre='Uno', codigo='M1')
+        self.m2 = Materia.objects.create(diplomatura=self.d1, nombre='Dos', codigo='M2')
+        self.m3 = Materia.objects.create(diplomatura=self.d2, nombre='Tres', codigo='M3')
+        InscripcionMateria.objects.create(user=self.alumno, materia=self.m1)
+        ProfesorMateria.objects.create(user=self.adjunto, materia=self.m2)
+        for i in range(3):
+            u = User.objects.create_user(email=f'x{i}@test.com', password='password', first_name='X', last_name='X', dni=f'9{i}', nivel=1)
+            InscripcionMateria.objects.create(user=u, materia=self.m1)
+
+    def _materias(self, user, params=None):
+        self.client.force_login(user)
+        response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, list(response.context['materias'])
+
+    def test_visibilidad_y_marcas(self):
+        _, mats = self._materias(self.alumno)
+        self.assertEqual([m.id for m in mats], [self.m1.id])
+        self.assertTrue(mats[0].es_inscripto)
+        self.assertEqual(mats[0].cant_inscriptos, 4)
+
+        _, mats = self._materias(self.coord)
+        self.assertEqual([m.id for m in mats], [self.m3.id])
+        self.assertTrue(mats[0].es_coordinador)
+
+        _, mats = self._materias(self.adjunto)
+        self.assertEqual([m.id for m in mats], [self.m2.id])
+        self.assertTrue(mats[0].es_adjunto)
+
+    def test_una_consulta_sin_prefetch(self):
+        self.client.force_login(self.admin)
+        self.client.get(self.url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        sqls = [q['sql'] for q in ctx.captured_queries if 'asistencias_materia' in q['sql']]
+        self.assertEqual(len(sqls), 1)
+        self.assertFalse(any('asistencias_inscripcionmateria"."id" IN' in q['sql'] for q in ctx.captured_queries))
+
+    def test_admin_keyset(self):
+        orig = vistas_alumno.MATERIAS_POR_PAGINA
+        vistas_alumno.MATERIAS_POR_PAGINA = 2
+        self.addCleanup(setattr, vistas_alumno, 'MATERIAS_POR_PAGINA', orig)
+
+        response, mats = self._materias(self.admin)
+        self.assertEqual([m.nombre for m in mats], ['Dos', 'Uno'])
+        siguiente = response.context['materias'].siguiente
+        self.assertIsNotNone(siguiente)
+
+        response, mats = self._materias(self.admin, {'despues': siguiente})
+        self.assertEqual([m.nombre for m in mats], ['Tres'])
+        self.assertIsNone(response.context['materias'].siguiente)
+
+        # Un cursor manipulado vuelve a la primera página
+        _, mats = self._materias(self.admin, {'despues': 'basura'})
+        self.assertEqual([m.nombre for m in mats], ['Dos', 'Uno'])
@@ -0,0 +1,96 @@
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from asistencias.models import (
+    Diplomatura, Materia, ProfesorMateria, InscripcionMateria, InscripcionDiplomatura
+)
+from asistencias.permissions import Membresias
+
+User = get_user_model()
+
+class MembresiasTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(email='multi@test.com', password='password', first_name='Multi', last_name='Rol', dni='10', nivel=3)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='User', dni='11', nivel=2)
+
+        self.diplo = Diplomatura.objects.create(nombre='Diplo A', codigo='DA')
+        self.diplo_b = Diplomatura.objects.create(nombre='Diplo B', codigo='DB')
+        self.diplo.coordinadores.add(self.user)
+
+        self.mat_titular = Materia.objects.create(diplomatura=self.diplo, nombre='Titular', codigo='MT', profesor_titular=self.user)
+        self.mat_adjunto = Materia.objects.create(diplomatura=self.diplo_b, nombre='Adjunto', codigo='MA', profesor_titular=self.otro)
+        self.mat_alumno = Materia.objects.create(diplomatura=self.diplo_b, nombre='Alumno', codigo='MI', profesor_titular=self.otro)
+
+        ProfesorMateria.objects.create(user=self.user, materia=self.mat_adjunto)
+        InscripcionMateria.objects.create(user=self.user, materia=self.mat_alumno)
+        InscripcionDiplomatura.objects.create(user=self.user, diplomatura=self.diplo_b)
+
+    def test_carga_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            m = Membresias.cargar(self.user)
+
+        self.assertTrue(m.es_titular(self.mat_titular))
+        self.assertFalse(m.es_titular(self.mat_adjunto))
+        self.assertTrue(m.es_adjunto(self.mat_adjunto.id))
+        self.assertTrue(m.es_docente(self.mat_adjunto))
+        self.assertTrue(m.es_inscripto(self.mat_alumno))
+        self.assertFalse(m.es_inscripto(self.mat_titular))
+        self.assertTrue(m.coordina(self.diplo))
+        self.assertTrue(m.coordina_materia(self.mat_titular))
+        self.assertFalse(m.coordina_materia(self.mat_alumno))
+        self.assertTrue(m.inscripto_en_diplomatura(self.diplo_b))
+        self.assertFalse(m.inscripto_en_diplomatura(self.diplo))
+
+    def test_anonimo_sin_consultas(self):
+        from django.contrib.auth.models import AnonymousUser
+        with self.assertNumQueries(0):
+            m = Membresias.cargar(AnonymousUser())
+        self.assertFalse(m.es_inscripto(self.mat_alumno))
+
+    @override_settings(MEMBRESIAS_CACHE_TTL=60)
+    def test_cache_se_invalida_al_cambiar_inscripciones(self):
+        cache.clear()
+        Membresias.cargar(self.user)
+        with self.assertNumQueries(0):
+            m = Membresias.cargar(self.user)
+        self.assertFalse(m.es_inscripto(self.mat_titular))
+
+        InscripcionMateria.objects.create(user=self.user, materia=self.mat_titular)
+        self.assertTrue(Membresias.cargar(self.user).es_inscripto(self.mat_titular))
+
+        self.diplo.coordinadores.remove(self.user)
+        self.assertFalse(Membresias.cargar(self.user).coordina(self.diplo))
+
+    @override_settings(MEMBRESIAS_CACHE_TTL=60)
+    def test_editar_materia_solo_invalida_titulares(self):
+        cache.clear()
+        Membresias.cargar(self.user)
+        Membresias.cargar(self.otro)
+
+        self.mat_alumno.nombre = 'Renombrada'
+        self.mat_alumno.save()
+        with self.assertNumQueries(0):
+            Membresias.cargar(self.user)
+            Membresias.cargar(self.otro)
+
+        # cambio de titular: se recalculan el anterior y el nuevo
+        self.mat_alumno.profesor_titular = self.user
+        self.mat_alumno.save()
+        self.assertTrue(Membresias.cargar(self.user).es_titular(self.mat_alumno))
+        self.assertFalse(Membresias.cargar(self.otro).es_titular(self.mat_alumno))
+
+    def test_ver_clases_materia_resuelve_permisos_una_vez(self):
+        self.client.force_login(self.user)
+        url = reverse('asistencias:ver_clases', args=[self.mat_alumno.id])
+        # usuario + materia + membresías + clases (la sesión puede venir del cache)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        queries = [q for q in ctx.captured_queries if 'django_session' not in q['sql']]
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['es_alumno'])
+        self.assertFalse(response.context['es_docente'])
@@ -1,7 +1,10 @@
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from ..models import Materia, Diplomatura, Nota, InscripcionMateria
+from django.core.management import call_command
+from decimal import Decimal
+from io import StringIO
+from ..models import Materia, Diplomatura, Nota, InscripcionMateria, ResumenNota
 
 User = get_user_model()
 
@@ -56,3 +59,42 @@ class NotaTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, '10')
+
+    def test_resumen_se_actualiza_al_guardar_y_borrar(self):
+        n1 = Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=6, fecha='2024-03-01', evaluador=self.profesor)
+        Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=9, fecha='2024-04-01', evaluador=self.profesor)
+
+        r = ResumenNota.objects.get(alumno=self.alumno, materia=self.materia)
+        self.assertEqual(r.cantidad, 2)
+        self.assertEqual(r.suma, Decimal('15'))
+        self.assertEqual(r.promedio, Decimal('7.50'))
+        self.assertEqual(r.ultima_nota, Decimal('9'))
+
+        n1.valor = 10
+        n1.save()
+        r.refresh_from_db()
+        self.assertEqual(r.promedio, Decimal('9.50'))
+
+        Nota.objects.filter(alumno=self.alumno).delete()
+        self.assertFalse(ResumenNota.objects.filter(alumno=self.alumno, materia=self.materia).exists())
+
+    def test_resumen_al_mover_nota_de_alumno(self):
+        otro = User.objects.create_user(email='otro@test.com', password='password', dni='999', nivel=1)
+        nota = Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=6, evaluador=self.profesor)
+        Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=10, evaluador=self.profesor)
+
+        nota.alumno = otro
+        nota.save()
+        self.assertEqual(ResumenNota.objects.get(alumno=self.alumno, materia=self.materia).promedio, Decimal('10.00'))
+        self.assertEqual(ResumenNota.objects.get(alumno=otro, materia=self.materia).promedio, Decimal('6.00'))
+
+    def test_comando_recalcular_resumen_notas(self):
+        Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=4, evaluador=self.profesor)
+        Nota.objects.create(alumno=self.alumno, materia=self.materia, valor=8, evaluador=self.profesor)
+        ResumenNota.objects.all().delete()
+
+        call_command('recalcular_resumen_notas', stdout=StringIO())
+
+        r = ResumenNota.objects.get(alumno=self.alumno, materia=self.materia)
+        self.assertEqual(r.cantidad, 2)
+        self.assertEqual(r.promedio, Decimal('6.00'))
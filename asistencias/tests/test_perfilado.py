@@ -0,0 +1,76 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from asistencias import perfilado
+
+User = get_user_model()
+
+
+class PerfiladoTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(self.media.cleanup)
+        cache.clear()
+        perfilado.desactivar()
+        self.addCleanup(perfilado.desactivar)
+
+        self.client = Client()
+        self.alumno = User.objects.create_user(email='alumno@test.com', password='x', dni='1', nivel=1)
+        self.otro = User.objects.create_user(email='otro@test.com', password='x', dni='3', nivel=1)
+        self.supervisor = User.objects.create_user(email='super@test.com', password='x', dni='2', nivel=7)
+
+    def test_apagado_no_guarda_nada(self):
+        self.client.force_login(self.alumno)
+        self.client.get(reverse('asistencias:home'))
+        self.assertEqual(perfilado.listar(), [])
+
+    def test_perfila_solo_lo_que_coincide_hasta_el_maximo(self):
+        self.client.force_login(self.supervisor)
+        r = self.client.post(reverse('asistencias:perfiles'), {
+            'patron': '^/perfil', 'usuario': 'alumno@test.com', 'tasa': 1, 'maximo': 2, 'minutos': 5,
+        })
+        self.assertRedirects(r, reverse('asistencias:perfiles'))
+
+        self.client.force_login(self.otro)
+        self.client.get(reverse('asistencias:perfil'))         # otro usuario
+        self.client.force_login(self.alumno)
+        self.client.get(reverse('asistencias:home'))           # otra URL
+        self.assertEqual(perfilado.listar(), [])
+
+        for _ in range(3):
+            self.client.get(reverse('asistencias:perfil'))
+        perfiles = perfilado.listar()
+        self.assertEqual(len(perfiles), 2)                     # el máximo apaga el muestreo
+        self.assertIsNone(perfilado.config())
+        p = perfiles[0]
+        self.assertEqual((p['path'], p['usuario'], p['status']), (reverse('asistencias:perfil'), 'alumno@test.com', 200))
+        self.assertTrue(p['top'])
+        self.assertIsNotNone(perfilado.archivo_prof(p['nombre']))
+
+        self.client.force_login(self.supervisor)
+        self.assertContains(self.client.get(reverse('asistencias:perfiles')), p['nombre'])
+        self.assertContains(self.client.get(reverse('asistencias:perfil_detalle', args=[p['nombre']])), p['top'][0]['funcion'])
+        r = self.client.get(reverse('asistencias:perfil_detalle', args=[p['nombre']]), {'descargar': 1})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(self.client.get(reverse('asistencias:perfil_detalle', args=['..'])).status_code, 404)
+
+    def test_solo_supervisores(self):
+        self.client.force_login(self.alumno)
+        self.assertEqual(self.client.get(reverse('asistencias:perfiles')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('asistencias:perfiles'), {'patron': '.', 'tasa': 1, 'maximo': 1, 'minutos': 1}).status_code, 403)
+        self.assertIsNone(perfilado.config())
+
+    def test_formulario_valida_patron(self):
+        self.client.force_login(self.supervisor)
+        r = self.client.post(reverse('asistencias:perfiles'), {'patron': '(', 'tasa': 1, 'maximo': 1, 'minutos': 1})
+        self.assertContains(r, 'Expresión regular inválida')
+        r = self.client.post(reverse('asistencias:perfiles'), {'patron': '', 'tasa': 1, 'maximo': 1, 'minutos': 1})
+        self.assertContains(r, 'Indicá un patrón de URL')
+        self.assertIsNone(perfilado.config())
@@ -0,0 +1,113 @@
+import datetime
+
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias.models import Diplomatura, Materia, Clase, Asistencia, InscripcionMateria
+
+User = get_user_model()
+
+
+class ListadoPresentesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.profe = User.objects.create_user(email='profe@test.com', password='password', first_name='Profe', last_name='Sor', dni='1', nivel=2)
+        self.otro = User.objects.create_user(email='otro@test.com', password='password', first_name='Otro', last_name='Profe', dni='2', nivel=2)
+        diplo = Diplomatura.objects.create(nombre='Diplo Planilla', codigo='DP')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Materia Planilla', codigo='MP', profesor_titular=self.profe)
+        self.url = reverse('asistencias:listado_presentes', args=[self.materia.id])
+        self.hoy = datetime.date(2026, 6, 30)
+
+    def _alumnos(self, n, desde=0):
+        alumnos = [User.objects.create_user(email=f'a{i}@test.com', password='password', first_name=f'A{i}',
+                                            last_name=f'Alumno{i:02d}', dni=str(100 + i), nivel=1)
+                   for i in range(desde, desde + n)]
+        for a in alumnos:
+            InscripcionMateria.objects.create(user=a, materia=self.materia)
+        return alumnos
+
+    def _clase(self, fecha):
+        inicio = timezone.make_aware(datetime.datetime.combine(fecha, datetime.time(18, 0)))
+        return Clase.objects.create(materia=self.materia, fecha=fecha, hora_inicio=inicio,
+                                    hora_fin=inicio + datetime.timedelta(hours=2))
+
+    def _queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, len([q for q in ctx.captured_queries if 'django_session' not in q['sql']])
+
+    def test_matriz_con_presentes(self):
+        alumnos = self._alumnos(2)
+        c1, c2 = self._clase(self.hoy - datetime.timedelta(days=7)), self._clase(self.hoy)
+        Asistencia.objects.create(clase=c1, user=alumnos[0])
+        Asistencia.objects.create(clase=c2, user=alumnos[0])
+        Asistencia.objects.create(clase=c2, user=alumnos[1])
+
+        self.client.force_login(self.profe)
+        response, _ = self._queries()
+        matriz = response.context['matriz']
+        self.assertEqual([(a['alumno'], marcas, total) for a, marcas, total in matriz], [
+            ('Alumno00, A0', [True, True], 2),
+            ('Alumno01, A1', [False, True], 1),
+        ])
+        clase, filas = response.context['planillas'][0]
+        self.assertEqual(clase['id'], c1.id)
+        self.assertTrue(filas[0]['presente'])
+        self.assertIsNotNone(filas[0]['timestamp'])
+
+    def test_consultas_constantes_y_cache(self):
+        self.client.force_login(self.profe)
+        alumnos = self._alumnos(2)
+        for d in range(2):
+            self._clase(self.hoy - datetime.timedelta(days=7 * d))
+        self.client.get(self.url)  # calienta sesión y versiones
+        cache.clear()
+        _, pocos = self._queries()
+
+        for a in self._alumnos(20, desde=2):
+            alumnos.append(a)
+        for d in range(2, 6):
+            c = self._clase(self.hoy - datetime.timedelta(days=7 * d))
+            Asistencia.objects.bulk_create([Asistencia(clase=c, user=a) for a in alumnos])
+        cache.clear()
+        response, muchos = self._queries()
+        self.assertEqual(pocos, muchos)
+        self.assertEqual(len(response.context['matriz']), 22)
+
+        # Con la grilla en cache sólo quedan usuario, membresías, materia y el rango
+        _, cacheado = self._queries()
+        self.assertLess(cacheado, muchos)
+
+        # Borrar un presente (señal) invalida la grilla
+        Asistencia.objects.get(clase__fecha=self.hoy - datetime.timedelta(weeks=5), user__dni='101').delete()
+        response, _ = self._queries()
+        fila = next(m for a, m, t in response.context['matriz'] if a['dni'] == '101')
+        self.assertFalse(fila[0])
+
+    def test_paginacion_por_rango(self):
+        self._alumnos(1)
+        for semana in range(12):
+            self._clase(self.hoy - datetime.timedelta(weeks=semana))
+        self.client.force_login(self.profe)
+
+        response, _ = self._queries()
+        self.assertEqual(len(response.context['clases']), 8)
+        self.assertEqual(response.context['hasta'], self.hoy)
+        self.assertIsNone(response.context['siguiente'])
+        anterior = response.context['anterior']
+        self.assertIsNotNone(anterior)
+
+        response, _ = self._queries({'desde': anterior[0].isoformat(), 'hasta': anterior[1].isoformat()})
+        self.assertEqual(len(response.context['clases']), 4)
+        self.assertIsNotNone(response.context['siguiente'])
+
+    def test_sin_permiso(self):
+        self.client.force_login(self.otro)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,82 @@
+import datetime
+
+from django.test import TestCase, Client
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias.models import Diplomatura, Materia, Clase
+from asistencias.recurrencia import generar_fechas, planificar, crear_clases_recurrentes
+
+User = get_user_model()
+
+
+class RecurrenciaTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.coord = User.objects.create_user(email='coord@test.com', password='password', first_name='Coord', last_name='Uno', dni='1', nivel=3)
+        self.docente = User.objects.create_user(email='doc@test.com', password='password', first_name='Doc', last_name='Uno', dni='2', nivel=2)
+        self.diplo = Diplomatura.objects.create(nombre='Diplo Rec', codigo='DR')
+        self.diplo.coordinadores.add(self.coord)
+        self.materia = Materia.objects.create(diplomatura=self.diplo, nombre='Materia Rec', codigo='MR')
+        # Marzo 2026: el 2 es lunes
+        self.desde = datetime.date(2026, 3, 2)
+        self.hasta = datetime.date(2026, 3, 31)
+
+    def test_generar_fechas_con_exclusiones(self):
+        fechas, excluidas = generar_fechas(self.desde, self.hasta, [0, 2], excluir=[datetime.date(2026, 3, 23)])
+        self.assertEqual(len(fechas) + len(excluidas), 9)  # 5 lunes + 4 miércoles
+        self.assertEqual(excluidas, [datetime.date(2026, 3, 23)])
+        self.assertTrue(all(f.weekday() in (0, 2) for f in fechas))
+
+    def test_crea_con_un_insert_y_omite_conflictos(self):
+        tz = timezone.get_current_timezone()
+        existente = Clase.objects.create(
+            materia=self.materia, fecha=datetime.date(2026, 3, 9),
+            hora_inicio=timezone.make_aware(datetime.datetime(2026, 3, 9, 18, 30), tz),
+            hora_fin=timezone.make_aware(datetime.datetime(2026, 3, 9, 19, 30), tz),
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            plan = crear_clases_recurrentes(
+                self.materia, self.desde, self.hasta, [0], datetime.time(18, 0), datetime.time(20, 0),
+                excluir=[datetime.date(2026, 3, 16)], tema='Teórico',
+            )
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(selects), 1)
+
+        self.assertEqual([c.fecha.day for c in plan.clases], [2, 23, 30])
+        self.assertEqual(plan.conflictos[0][1].pk, existente.pk)
+        self.assertEqual(Clase.objects.filter(materia=self.materia).count(), 4)
+        c = Clase.objects.get(materia=self.materia, fecha=datetime.date(2026, 3, 2))
+        self.assertEqual(timezone.localtime(c.hora_inicio).time(), datetime.time(18, 0))
+        self.assertEqual(c.tema, 'Teórico')
+
+    def test_planificar_no_escribe_y_respeta_tope(self):
+        plan = planificar(self.materia, self.desde, self.hasta, [1], datetime.time(10, 0), datetime.time(12, 0))
+        self.assertEqual(len(plan.clases), 5)
+        self.assertFalse(Clase.objects.exists())
+        with self.assertRaises(ValueError):
+            planificar(self.materia, datetime.date(2020, 1, 1), datetime.date(2030, 1, 1),
+                       range(7), datetime.time(10, 0), datetime.time(12, 0))
+
+    def test_vista_previsualiza_y_crea(self):
+        url = reverse('asistencias:crear_clases_recurrentes', args=[self.materia.id])
+        datos = {
+            'desde': '2026-03-02', 'hasta': '2026-03-31', 'dias': ['0'],
+            'hora_inicio': '18:00', 'hora_fin': '20:00', 'excluir': '16/03/2026, 23/03/2026',
+        }
+        self.client.force_login(self.docente)
+        self.assertEqual(self.client.post(url, dict(datos, accion='crear')).status_code, 403)
+
+        self.client.force_login(self.coord)
+        response = self.client.post(url, dict(datos, accion='previsualizar'))
+        self.assertContains(response, 'Se crearían 3 clases')
+        self.assertFalse(Clase.objects.exists())
+
+        response = self.client.post(url, dict(datos, accion='crear'))
+        self.assertRedirects(response, reverse('asistencias:ver_clases', args=[self.materia.id]))
+        self.assertEqual(Clase.objects.filter(materia=self.materia).count(), 3)
@@ -0,0 +1,97 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias import replica
+from asistencias.models import Diplomatura, Materia, Clase, InscripcionMateria, InscripcionDiplomatura
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_LECTURAS=True)
+class ReplicaTest(TransactionTestCase):
+    # 'replica' es un espejo (TEST MIRROR) de 'default': la misma base por otra conexión. Con
+    # TestCase la réplica no vería lo que el test crea dentro de su transacción.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.client = Client()
+        self.coordinador = User.objects.create_user(email='coord@test.com', password='x', dni='1', nivel=3)
+        self.referente = User.objects.create_user(email='ref@test.com', password='x', dni='2', nivel=6)
+        self.diplo = Diplomatura.objects.create(nombre='Diplo', codigo='D1')
+        self.materia = Materia.objects.create(diplomatura=self.diplo, nombre='Materia', codigo='M1')
+        ahora = timezone.now()
+        Clase.objects.create(materia=self.materia, fecha=datetime.date(2024, 5, 1),
+                             hora_inicio=ahora, hora_fin=ahora)
+        alumno = User.objects.create_user(email='alumno@test.com', password='x', dni='3', nivel=1)
+        InscripcionMateria.objects.create(user=alumno, materia=self.materia)
+        InscripcionDiplomatura.objects.create(user=self.referente, diplomatura=self.diplo)
+
+    def _consultas(self, metodo, url, **kwargs):
+        """(consultas a la primaria, consultas a la réplica, response)."""
+        with CaptureQueriesContext(connections['default']) as primaria, \
+                CaptureQueriesContext(connections['replica']) as rep:
+            response = getattr(self.client, metodo)(url, **kwargs)
+        return len(primaria), len(rep), response
+
+    def test_router(self):
+        self.assertEqual(Materia.objects.all().db, 'default')
+        with replica.en_replica():
+            self.assertEqual(Materia.objects.all().db, 'replica')
+            materia = Materia.objects.get(pk=self.materia.pk)
+            self.assertEqual(materia._state.db, 'replica')
+            # escribir una instancia leída de la réplica va a la primaria
+            materia.nombre = 'Otra'
+            with CaptureQueriesContext(connections['default']) as primaria:
+                materia.save()
+            self.assertEqual(len(primaria), 1)
+        with override_settings(REPLICA_LECTURAS=False):
+            with replica.en_replica():
+                self.assertEqual(Materia.objects.all().db, 'default')
+
+    def test_exportaciones_leen_de_la_replica(self):
+        self.client.force_login(self.coordinador)
+        _, rep, r = self._consultas('get', reverse('asistencias:exportar_reportes'))
+        self.assertEqual(r.status_code, 200)
+        self.assertGreater(rep, 0)
+        self.assertIn(',3,', r.content.decode())
+
+        _, rep, r = self._consultas('get', reverse('asistencias:exportar_asistencia_diplomatura', args=[self.diplo.pk]))
+        self.assertEqual(r.status_code, 200)
+        self.assertGreater(rep, 0)
+
+    def test_calendario_referente_sync_y_async(self):
+        self.client.force_login(self.referente)
+        _, rep, r = self._consultas('get', reverse('asistencias:calendario_diplomatura_json', args=[self.diplo.pk]))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()['eventos']), 1)
+        self.assertGreater(rep, 0)
+
+    def test_las_demas_vistas_leen_de_la_primaria(self):
+        self.client.force_login(self.coordinador)
+        _, rep, r = self._consultas('get', reverse('asistencias:home'))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(rep, 0)
+
+    def test_leer_lo_propio_despues_de_escribir(self):
+        self.client.force_login(self.coordinador)
+        url = reverse('asistencias:exportar_reportes')
+        self.assertNotIn(replica.COOKIE, self.client.get(url).cookies)
+
+        # un request que escribe deja fijado el navegador a la primaria
+        r = self.client.post(reverse('asistencias:perfil'), {'first_name': 'Coord', 'last_name': 'Uno', 'dni': '1'})
+        self.assertIn(replica.COOKIE, r.cookies)
+        self.assertEqual(r.cookies[replica.COOKIE]['max-age'], replica.fijar_segundos())
+
+        _, rep, _ = self._consultas('get', url)
+        self.assertEqual(rep, 0)
+
+        # vencida la cookie vuelve a la réplica
+        self.client.cookies.pop(replica.COOKIE)
+        _, rep, _ = self._consultas('get', url)
+        self.assertGreater(rep, 0)
@@ -2,6 +2,8 @@ from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from asistencias.models import Diplomatura, Materia, InscripcionDiplomatura, Clase, Asistencia
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import date, time, datetime
 
 User = get_user_model()
@@ -41,6 +43,52 @@ class RoleTests(TestCase):
         response = self.client.get(reverse('asistencias:home'))
         self.assertEqual(response.wsgi_request.user.nivel, 1)
         
+    def test_impersonacion_separa_nivel_real_y_efectivo(self):
+        self.client.login(email='sup@test.com', password='password')
+        self.client.get(reverse('asistencias:switch_role', args=[2]))
+
+        response = self.client.get(reverse('asistencias:home'))
+        self.assertEqual(response.wsgi_request.nivel_real, 7)
+        self.assertEqual(response.wsgi_request.nivel_efectivo, 2)
+        self.assertEqual(response.wsgi_request.user.nivel, 2)
+
+    def test_switch_role_sin_releer_usuario(self):
+        self.client.login(email='sup@test.com', password='password')
+        self.client.get(reverse('asistencias:switch_role', args=[1]))
+        # El usuario se lee una sola vez (AuthenticationMiddleware); el nivel real no se vuelve a consultar
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('asistencias:switch_role', args=[3]))
+        user_queries = [q for q in ctx.captured_queries if 'FROM "asistencias_user"' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.session['impersonate_role'], 3)
+
+        # Volver a supervisor limpia la impersonación
+        self.client.get(reverse('asistencias:switch_role', args=[7]))
+        self.assertNotIn('impersonate_role', self.client.session)
+
+    def test_switch_role_rechaza_no_supervisor(self):
+        self.client.login(email='alu@test.com', password='password')
+        response = self.client.get(reverse('asistencias:switch_role', args=[3]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_guardar_usuario_impersonado_persiste_nivel_real(self):
+        self.supervisor.impersonar(1)
+        self.supervisor.first_name = 'Cambiado'
+        self.supervisor.save()
+        self.supervisor.refresh_from_db()
+        self.assertEqual(self.supervisor.nivel, 7)
+        self.assertEqual(self.supervisor.first_name, 'Cambiado')
+
+    def test_perfil_con_rol_impersonado_no_baja_nivel(self):
+        self.client.login(email='sup@test.com', password='password')
+        self.client.get(reverse('asistencias:switch_role', args=[1]))
+        self.client.post(reverse('asistencias:perfil'), {
+            'first_name': 'Super', 'last_name': 'Visor', 'dni': '111', 'email': 'sup@test.com',
+        })
+        self.supervisor.refresh_from_db()
+        self.assertEqual(self.supervisor.nivel, 7)
+
     def test_referente_dashboard_access(self):
         self.client.login(email='ref@test.com', password='password')
         response = self.client.get(reverse('asistencias:referente_dashboard'))
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from asistencias.models import (
+    User, Diplomatura, Materia, Clase, Asistencia, Nota, ResumenNota, InscripcionMateria,
+)
+
+ARGS = ['--diplomaturas', '2', '--materias', '3', '--alumnos', '40', '--docentes', '4',
+        '--materias-por-alumno', '2', '--clases', '4', '--notas', '1', '--procesos', '1', '--chunk', '50']
+
+
+class SeedScaleTest(TestCase):
+    def _seed(self, *extra):
+        call_command('seed_scale', *ARGS, *extra, stdout=StringIO())
+
+    def _huella(self):
+        return (
+            list(Asistencia.objects.order_by('user__email', 'clase__materia__codigo', 'clase__fecha')
+                 .values_list('user__email', 'clase__materia__codigo', 'clase__fecha', 'timestamp')),
+            list(Nota.objects.order_by('alumno__email', 'materia__codigo').values_list('alumno__email', 'materia__codigo', 'valor')),
+        )
+
+    def test_genera_dataset_coherente_y_deterministico(self):
+        self._seed()
+        self.assertEqual(Diplomatura.objects.count(), 2)
+        self.assertEqual(Materia.objects.count(), 6)
+        self.assertEqual(Clase.objects.count(), 24)
+        self.assertEqual(User.objects.filter(nivel=1).count(), 40)
+        self.assertEqual(InscripcionMateria.objects.count(), 80)
+        self.assertEqual(Nota.objects.count(), 80)
+        self.assertEqual(ResumenNota.objects.count(), 80)
+
+        # Las asistencias son de inscriptos y caen dentro de la ventana de la clase
+        asistencias = Asistencia.objects.select_related('clase')
+        self.assertGreater(asistencias.count(), 0)
+        for a in asistencias[:50]:
+            self.assertTrue(InscripcionMateria.objects.filter(user_id=a.user_id, materia_id=a.clase.materia_id).exists())
+            self.assertTrue(a.clase.hora_inicio <= a.timestamp <= a.clase.hora_fin)
+
+        huella = self._huella()
+        self._seed('--borrar')
+        self.assertFalse(Diplomatura.objects.exists())
+        self.assertFalse(Asistencia.objects.exists())
+        self.assertFalse(User.objects.filter(email__endswith='@seed.local').exists())
+
+        self._seed()
+        self.assertEqual(self._huella()[1], huella[1])
+        self.assertEqual([h[:3] for h in self._huella()[0]], [h[:3] for h in huella[0]])
+
+    def test_no_pisa_un_dataset_existente(self):
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
+
+    def test_no_toca_resumenes_ajenos(self):
+        # Un resumen sin notas vivas (p. ej. de una diplomatura archivada) sobrevive al seed
+        diplo = Diplomatura.objects.create(nombre='Real', codigo='REAL')
+        materia = Materia.objects.create(diplomatura=diplo, nombre='Real', codigo='REAL1')
+        alumno = User.objects.create_user(email='real@test.com', password='x', dni='1', nivel=1)
+        ResumenNota.objects.create(alumno=alumno, materia=materia, cantidad=1, suma=8, promedio=8)
+        self._seed()
+        self.assertTrue(ResumenNota.objects.filter(materia=materia).exists())
@@ -0,0 +1,20 @@
+from django.test import TestCase
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+import datetime
+
+
+class LimpiarSesionesTest(TestCase):
+    def test_borra_solo_vencidas_por_lotes(self):
+        ahora = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'vencida{i}', session_data='x', expire_date=ahora - datetime.timedelta(days=1))
+        Session.objects.create(session_key='vigente', session_data='x', expire_date=ahora + datetime.timedelta(days=1))
+
+        out = StringIO()
+        call_command('limpiar_sesiones', batch_size=2, stdout=out)
+
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['vigente'])
+        self.assertIn('borradas: 5', out.getvalue())
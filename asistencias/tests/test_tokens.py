@@ -0,0 +1,93 @@
+import csv
+import datetime
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencias import documentos, tokens
+from asistencias.models import AccesoToken, Diplomatura, Materia
+
+User = get_user_model()
+
+
+class TokensTest(TestCase):
+    def setUp(self):
+        diplo = Diplomatura.objects.create(nombre='Diplo', codigo='D1')
+        self.materia = Materia.objects.create(diplomatura=diplo, nombre='Historia', codigo='M1')
+        self.vence = timezone.now() + datetime.timedelta(days=30)
+
+    def test_emitir_en_un_insert(self):
+        with self.assertNumQueries(1):
+            emitidos = tokens.emitir(25, 2, materia=self.materia, expires_at=self.vence)
+        self.assertEqual(len({t.code for t in emitidos}), 25)
+        self.assertEqual(AccesoToken.objects.filter(materia=self.materia, nivel_destino=2, activo=True).count(), 25)
+        with self.assertRaises(ValueError):
+            tokens.emitir(tokens.MAX_TOKENS + 1, 2)
+
+    def test_operaciones_en_lote(self):
+        emitidos = tokens.emitir(10, 2)
+        usado = emitidos[0]
+        AccesoToken.objects.filter(pk=usado.pk).update(usado_en=timezone.now())
+        antes = dict(AccesoToken.objects.values_list('pk', 'code'))
+
+        qs = AccesoToken.objects.all()
+        with self.assertNumQueries(2):    # ids sin usar + un UPDATE
+            self.assertEqual(tokens.regenerar(qs), 9)
+        despues = dict(AccesoToken.objects.values_list('pk', 'code'))
+        self.assertEqual(despues[usado.pk], antes[usado.pk])
+        self.assertTrue(all(despues[pk] != antes[pk] for pk in antes if pk != usado.pk))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(tokens.desactivar(qs), 10)
+        self.assertFalse(AccesoToken.objects.filter(activo=True).exists())
+        with self.assertNumQueries(1):
+            tokens.activar(qs.filter(usado_en__isnull=True))
+        self.assertEqual(AccesoToken.objects.filter(activo=True).count(), 9)
+
+    def test_csv_y_pdf(self):
+        emitidos = tokens.emitir(20, 2, materia=self.materia, expires_at=self.vence)
+        out = StringIO()
+        tokens.escribir_csv(emitidos, out)
+        filas = list(csv.reader(StringIO(out.getvalue())))
+        self.assertEqual(filas[0], tokens.COLUMNAS)
+        self.assertEqual([f[0] for f in filas[1:]], [str(t.code) for t in emitidos])
+        self.assertEqual(filas[1][2], 'M1')
+
+        pdf = documentos.cargar('pdf').planilla_tokens(emitidos)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(pdf.count(b'/Type /Page\n'), 2)   # 16 celdas por página
+
+    def test_comando(self):
+        with tempfile.TemporaryDirectory() as d:
+            salida = os.path.join(d, 'tokens.pdf')
+            call_command('emitir_tokens', '12', '--materia', 'M1', '--dias', '7', '--formato', 'pdf',
+                         '--salida', salida, stdout=StringIO())
+            with open(salida, 'rb') as f:
+                self.assertTrue(f.read().startswith(b'%PDF'))
+        self.assertEqual(AccesoToken.objects.filter(materia=self.materia, expires_at__isnull=False).count(), 12)
+        with self.assertRaises(CommandError):
+            call_command('emitir_tokens', '3', '--materia', 'NOPE', stdout=StringIO())
+
+    def test_acciones_admin(self):
+        admin = User.objects.create_superuser(email='admin@test.com', password='x', dni='1')
+        client = Client()
+        client.force_login(admin)
+        emitidos = tokens.emitir(3, 2, materia=self.materia)
+        url = reverse('admin:asistencias_accesotoken_changelist')
+        ids = [t.pk for t in emitidos]
+
+        antes = set(AccesoToken.objects.values_list('code', flat=True))
+        client.post(url, {'action': 'regenerar_codigo', '_selected_action': ids})
+        self.assertFalse(antes & set(AccesoToken.objects.values_list('code', flat=True)))
+
+        r = client.post(url, {'action': 'exportar_pdf', '_selected_action': ids})
+        self.assertEqual(r['Content-Type'], 'application/pdf')
+        r = client.post(url, {'action': 'exportar_csv', '_selected_action': ids})
+        self.assertEqual(len(r.content.decode().splitlines()), 4)
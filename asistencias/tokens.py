@@ -0,0 +1,50 @@
+"""
+Emisión y gestión en lote de AccesoToken.
+
+Para dar de alta una cohorte de docentes se emiten N tokens de una vez (un bulk_create) y se
+reparten como CSV o como planilla PDF para imprimir y recortar (documentos.cargar('pdf')).
+Regenerar, activar y desactivar operan sobre un queryset con un solo UPDATE, sin cargar ni
+guardar token por token.
+"""
+import csv
+import uuid
+
+from .models import AccesoToken
+
+MAX_TOKENS = 1000   # por emisión
+COLUMNAS = ['codigo', 'nivel', 'materia', 'vence']
+
+
+def emitir(cantidad, nivel_destino, materia=None, expires_at=None, creado_por=None):
+    """Crea `cantidad` tokens iguales salvo el código, en un bulk_create. Devuelve la lista."""
+    if not 1 <= cantidad <= MAX_TOKENS:
+        raise ValueError(f"La cantidad debe estar entre 1 y {MAX_TOKENS}.")
+    return AccesoToken.objects.bulk_create([
+        AccesoToken(nivel_destino=nivel_destino, materia=materia, expires_at=expires_at, creado_por=creado_por)
+        for _ in range(cantidad)
+    ])
+
+
+def regenerar(qs):
+    """Código nuevo para los tokens sin usar de `qs` (un UPDATE ... CASE). Devuelve cuántos."""
+    nuevos = [AccesoToken(pk=pk, code=uuid.uuid4())
+              for pk in qs.filter(usado_en__isnull=True).values_list('pk', flat=True)]
+    # batch_size=None: un solo UPDATE salvo que el motor limite los parámetros por consulta
+    return AccesoToken.objects.bulk_update(nuevos, ['code'])
+
+
+def activar(qs):
+    return qs.update(activo=True)
+
+
+def desactivar(qs):
+    return qs.update(activo=False)
+
+
+def escribir_csv(tokens, destino):
+    """Escribe los tokens en `destino` (archivo o HttpResponse), una fila por código."""
+    w = csv.writer(destino)
+    w.writerow(COLUMNAS)
+    for t in tokens:
+        w.writerow([t.code, t.get_nivel_destino_display(), t.materia.codigo if t.materia_id else '',
+                    t.expires_at.isoformat() if t.expires_at else ''])
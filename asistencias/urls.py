@@ -15,6 +15,7 @@ urlpatterns = [
     path('inscribirse/materia/', views.insc_materia_por_codigo, name='insc_materia_codigo'),
     path('clases/<int:materia_id>/', views.ver_clases_materia, name='ver_clases'),
     path('clases/<int:clase_id>/presente/', views.marcar_presente, name='marcar_presente'),
+    path('c/<str:codigo>/', views.usar_qr, name='usar_qr'),
     path('materias/<int:materia_id>/desinscribirse/', views.desinscribirse_materia, name='desinscribirse_materia'),
     path('mis-notas/', views.mis_notas, name='mis_notas'),
 
@@ -23,6 +24,8 @@ urlpatterns = [
 
     # --- NIVEL 2: DOCENTE ---
     path('clases/<int:clase_id>/editar/', views.editar_clase, name='editar_clase'),
+    path('clases/<int:clase_id>/qr/', views.qr_clase, name='qr_clase'),
+    path('materias/<int:materia_id>/clases/recurrentes/', views.crear_clases_recurrentes, name='crear_clases_recurrentes'),
     path('materias/<int:materia_id>/presentes/', views.listado_presentes, name='listado_presentes'),
     path('materias/<int:materia_id>/notas/', views.cargar_notas, name='cargar_notas'),
     path('materias/<int:materia_id>/promedios/', views.promedios_materia, name='promedios_materia'),
@@ -34,6 +37,9 @@ urlpatterns = [
     path('materias/crear/', views.crear_materia, name='crear_materia'),
     path('diplomaturas/crear/', views.crear_diplomatura, name='crear_diplomatura'),
     path('diplomaturas/<int:diplo_id>/cargar-excel/', views.cargar_excel_inscripciones, name='cargar_excel'),
+    path('importaciones/<int:imp_id>/', views.importacion_detalle, name='importacion_detalle'),
+    path('importaciones/<int:imp_id>/estado/', views.importacion_estado, name='importacion_estado'),
+    path('importaciones/<int:imp_id>/confirmar/', views.importacion_confirmar, name='importacion_confirmar'),
     path('diplomaturas/constancia-alumno-regular/', views.generar_constancia, name='generar_constancia'),
     path('reportes/exportar/', views.exportar_reportes, name='exportar_reportes'),
 
@@ -46,10 +52,20 @@ urlpatterns = [
     
     # --- OTROS ---
     path('supervisor/switch-role/<int:role_id>/', views.switch_role, name='switch_role'),
+    path('supervisor/rendimiento/', views.rendimiento, name='rendimiento'),
+    path('supervisor/perfiles/', views.perfiles, name='perfiles'),
+    path('supervisor/perfiles/<str:nombre>/', views.perfil_detalle, name='perfil_detalle'),
     path('exportar/xlsx/', views.exportar_xlsx, name='exportar_xlsx'),
     path('materias/<int:materia_id>/exportar-asistencia/', views.exportar_asistencia_materia, name='exportar_asistencia_materia'),
     path('diplomaturas/<int:diplomatura_id>/exportar-asistencia/', views.exportar_asistencia_diplomatura, name='exportar_asistencia_diplomatura'),
 
+    # --- API JSON (async) ---
+    path('api/calendario/', views.calendario_json, name='calendario_json'),
+    path('api/diplomaturas/<int:diplomatura_id>/calendario/', views.calendario_diplomatura_json, name='calendario_diplomatura_json'),
+    path('api/clases/<int:clase_id>/roster/', views.roster_clase_json, name='roster_clase_json'),
+    path('api/clases/<int:clase_id>/cambios/', views.cambios_asistencia_json, name='cambios_asistencia_json'),
+    path('api/clases/<int:clase_id>/eventos/', views.eventos_clase_sse, name='eventos_clase_sse'),
+
     # --- ACCESO PÚBLICO ---
     path('publico/', views.publico, name='publico'),
     path('publico/consulta/', views.consulta_publica, name='consulta_publica'),
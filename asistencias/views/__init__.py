@@ -1,34 +1,41 @@
 # FILE: asistencias/views/__init__.py
 from .referente import dashboard, calendario_referente, ver_asistencia_clase, listar_materias_referente, ver_notas_materia
 # IMPORTANTE: switch_role sale de supervisor.py
-from .supervisor import switch_role 
+from .supervisor import switch_role, rendimiento, perfiles, perfil_detalle
 from .tokens import usar_token
+from .qr import qr_clase, usar_qr
 from .reportes import exportar_reportes
 from .reportes_constancia import generar_constancia
 from .publico import publico, consulta_publica
 from .exportar import exportar_xlsx, exportar_asistencia_materia, exportar_asistencia_diplomatura
 from .notas import cargar_notas, mis_notas, promedios_materia
 
-from .docente import editar_clase, listado_presentes, detalle_asistencia_clase
+from .docente import editar_clase, listado_presentes, detalle_asistencia_clase, crear_clases_recurrentes
 from .alumno import (
     home, perfil, listar_materias, listar_diplomaturas, 
     ver_clases_materia, insc_materia_por_codigo,
     insc_diplomatura_por_codigo, marcar_presente, desinscribirse_materia
 )
 
+from .api import calendario_json, calendario_diplomatura_json, roster_clase_json, cambios_asistencia_json, eventos_clase_sse
+
 from .coordinador import (
-    crear_materia, crear_diplomatura, cargar_excel_inscripciones, calendario_diplomatura
+    crear_materia, crear_diplomatura, cargar_excel_inscripciones, calendario_diplomatura,
+    importacion_detalle, importacion_estado, importacion_confirmar,
 )
 
 __all__ = [
     "home", "perfil", "listar_diplomaturas", "listar_materias",
     "insc_diplomatura_por_codigo", "insc_materia_por_codigo",
-    "ver_clases_materia", "marcar_presente", "desinscribirse_materia",
-    "editar_clase", "listado_presentes", "switch_role",
+    "ver_clases_materia", "marcar_presente", "desinscribirse_materia", "qr_clase", "usar_qr",
+    "editar_clase", "listado_presentes", "crear_clases_recurrentes", "switch_role", "rendimiento",
+    "perfiles", "perfil_detalle",
     "crear_materia", "crear_diplomatura", "cargar_excel_inscripciones", "calendario_diplomatura",
+    "importacion_detalle", "importacion_estado", "importacion_confirmar",
     "usar_token", "generar_constancia", "exportar_reportes", "publico", "consulta_publica",
     "exportar_xlsx", "exportar_asistencia_materia", "exportar_asistencia_diplomatura",
     "cargar_notas", "mis_notas", "promedios_materia",
     "dashboard", "calendario_referente", "ver_asistencia_clase","detalle_asistencia_clase", 
-    "listar_materias_referente", "ver_notas_materia"
+    "listar_materias_referente", "ver_notas_materia",
+    "calendario_json", "calendario_diplomatura_json", "roster_clase_json", "cambios_asistencia_json", "eventos_clase_sse",
 ]
@@ -1,5 +1,6 @@
 # FILE: asistencias/views/alumno.py
-from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib import messages
 from django.http import HttpResponseForbidden
 from django.utils import timezone
@@ -11,6 +12,81 @@ from asistencias.models import (
 )
 from asistencias.forms import PerfilForm
 from asistencias.permissions import requiere_nivel
+from asistencias.cache import CALENDARIO, CATALOGO, cache_key, get_or_set, version
+from asistencias.paginacion import PaginaKeyset
+
+MATERIAS_POR_PAGINA = 50
+
+def _diplomaturas_de(u):
+    """Diplomaturas visibles para el usuario según su rol."""
+    dips_alumno = Diplomatura.objects.filter(
+        models.Q(inscripciones__user=u) | 
+        models.Q(materias__inscripciones__user=u)
+    )
+    dips_docente = Diplomatura.objects.filter(
+        models.Q(materias__profesor_titular=u) |
+        models.Q(materias__profesores__user=u)
+    )
+    dips_coord = Diplomatura.objects.filter(coordinadores=u)
+
+    if u.nivel >= 3:
+        qs = (dips_alumno | dips_docente | dips_coord)
+    elif u.nivel >= 2:
+        qs = (dips_alumno | dips_docente)
+    else:
+        qs = dips_alumno
+    return qs.distinct()
+
+def _eventos_calendario(u, m, diplomaturas):
+    """Eventos del calendario general; m son las Membresias del usuario."""
+    eventos = []
+
+    # 2. Paleta de colores
+    COLORES_PALETA = ['#4CAF50', '#2196F3', '#FF9800', '#E91E63', '#9C27B0', '#00BCD4']
+    diplo_ids_list = list(diplomaturas.values_list('id', flat=True))
+    color_map = {d_id: COLORES_PALETA[i % len(COLORES_PALETA)] for i, d_id in enumerate(diplo_ids_list)}
+
+    # 3. Materias para el Calendario
+    if u.nivel >= 4 or getattr(u, 'is_superuser', False):
+        mats_ids = Materia.objects.filter(Q(diplomatura__in=diplomaturas)).values_list('id', flat=True)
+    elif u.nivel >= 3:
+        mats_ids = Materia.objects.filter(
+            Q(profesores__user=u) | Q(profesor_titular=u) | Q(diplomatura__coordinadores=u)
+        ).values_list('id', flat=True)
+    else:
+        mats_ids = Materia.objects.filter(
+            Q(inscripciones__user=u) | Q(profesores__user=u) | Q(profesor_titular=u)
+        ).values_list('id', flat=True)
+
+    # 4. Procesar Clases
+    clases = Clase.objects.filter(materia_id__in=mats_ids).select_related('materia', 'materia__diplomatura')
+    for c in clases:
+        es_coord_de_esta = m.coordina_materia(c.materia)
+        es_profe_de_esta = m.es_docente(c.materia_id)
+        es_alumno_de_esta = m.es_inscripto(c.materia_id)
+        es_supervisor = u.nivel >= 4 or u.is_superuser
+
+        can_edit = (es_coord_de_esta or es_profe_de_esta) and u.nivel != 6
+        can_access = es_supervisor or es_coord_de_esta or es_profe_de_esta or es_alumno_de_esta
+        color_evento = color_map.get(c.materia.diplomatura_id, '#888')
+
+        # --- ESTO ES LO QUE DEBES ASEGURARTE QUE ESTÉ ASÍ ---
+        eventos.append({
+            'title': f"{c.materia.nombre}",
+            'start': c.fecha.isoformat(),
+            'id': c.id,
+            'materia_id': c.materia.id,
+            'color': color_evento,
+            'can_edit': can_edit,
+            'can_access': can_access,
+            'extendedProps': {
+                'tema': c.tema or "Sin tema especificado",
+                'link_clase': c.link_clase or "",
+                'hora_inicio': c.hora_inicio.strftime('%H:%M') if c.hora_inicio else "",
+                'hora_fin': c.hora_fin.strftime('%H:%M') if c.hora_fin else "",
+            }
+        })
+    return eventos
 
 def home(request):
     diplomaturas = Diplomatura.objects.none()
@@ -22,77 +98,15 @@ def home(request):
         u = request.user
 
         # 1. Filtrado de Diplomaturas según el rol
-        dips_alumno = Diplomatura.objects.filter(
-            models.Q(inscripciones__user=u) | 
-            models.Q(materias__inscripciones__user=u)
-        )
-        dips_docente = Diplomatura.objects.filter(
-            models.Q(materias__profesor_titular=u) |
-            models.Q(materias__profesores__user=u)
-        )
-        dips_coord = Diplomatura.objects.filter(coordinadores=u)
-
-        if u.nivel >= 3:
-            qs = (dips_alumno | dips_docente | dips_coord)
-        elif u.nivel >= 2:
-            qs = (dips_alumno | dips_docente)
-        else:
-            qs = dips_alumno
-
-        diplomaturas = qs.distinct().prefetch_related('materias')
+        diplomaturas = _diplomaturas_de(u).prefetch_related('materias')
         
         solo_una_diplo = diplomaturas.count() == 1
 
-        # 2. Paleta de colores
-        COLORES_PALETA = ['#4CAF50', '#2196F3', '#FF9800', '#E91E63', '#9C27B0', '#00BCD4']
-        diplo_ids_list = list(diplomaturas.values_list('id', flat=True))
-        color_map = {d_id: COLORES_PALETA[i % len(COLORES_PALETA)] for i, d_id in enumerate(diplo_ids_list)}
-
-        # 3. Materias para el Calendario
-        if u.nivel >= 4 or getattr(u, 'is_superuser', False):
-            mats_ids = Materia.objects.filter(Q(diplomatura__in=diplomaturas)).values_list('id', flat=True)
-        elif u.nivel >= 3:
-            mats_ids = Materia.objects.filter(
-                Q(profesores__user=u) | Q(profesor_titular=u) | Q(diplomatura__coordinadores=u)
-            ).values_list('id', flat=True)
-        else:
-            mats_ids = Materia.objects.filter(
-                Q(inscripciones__user=u) | Q(profesores__user=u) | Q(profesor_titular=u)
-            ).values_list('id', flat=True)
-
-        # 4. Procesar Clases
-        materias_donde_es_profe = set(ProfesorMateria.objects.filter(user=u).values_list('materia_id', flat=True))
-        materias_donde_es_profe.update(Materia.objects.filter(profesor_titular=u).values_list('id', flat=True))
-        materias_coordinadas = set(Materia.objects.filter(diplomatura__coordinadores=u).values_list('id', flat=True))
-        materias_inscripto = set(InscripcionMateria.objects.filter(user=u).values_list('materia_id', flat=True))
-
-        clases = Clase.objects.filter(materia_id__in=mats_ids).select_related('materia', 'materia__diplomatura')
-        for c in clases:
-            es_coord_de_esta = c.materia_id in materias_coordinadas
-            es_profe_de_esta = c.materia_id in materias_donde_es_profe
-            es_alumno_de_esta = c.materia_id in materias_inscripto
-            es_supervisor = u.nivel >= 4 or u.is_superuser
-
-            can_edit = (es_coord_de_esta or es_profe_de_esta) and u.nivel != 6
-            can_access = es_supervisor or es_coord_de_esta or es_profe_de_esta or es_alumno_de_esta
-            color_evento = color_map.get(c.materia.diplomatura_id, '#888')
-
-            # --- ESTO ES LO QUE DEBES ASEGURARTE QUE ESTÉ ASÍ ---
-            eventos.append({
-                'title': f"{c.materia.nombre}",
-                'start': c.fecha.isoformat(),
-                'id': c.id,
-                'materia_id': c.materia.id,
-                'color': color_evento,
-                'can_edit': can_edit,
-                'can_access': can_access,
-                'extendedProps': {
-                    'tema': c.tema or "Sin tema especificado",
-                    'link_clase': c.link_clase or "",
-                    'hora_inicio': c.hora_inicio.strftime('%H:%M') if c.hora_inicio else "",
-                    'hora_fin': c.hora_fin.strftime('%H:%M') if c.hora_fin else "",
-                }
-            })
+        # 2-4. Eventos del calendario (cacheados por usuario y versión del catálogo)
+        eventos = get_or_set(
+            cache_key('home_eventos', u.pk, u.nivel, version(CATALOGO), version(CALENDARIO)),
+            lambda: _eventos_calendario(u, request.membresias, diplomaturas),
+        )
         if u.nivel >= 3:
             materias_creables = Materia.objects.filter(diplomatura__coordinadores=u).distinct()
 
@@ -119,26 +133,44 @@ def perfil(request):
 @requiere_nivel(1)
 def listar_diplomaturas(request):
     dips = Diplomatura.objects.all()
-    return render(request, 'asistencias/diplomaturas.html', {'diplomaturas': dips})
+    return render(request, 'asistencias/diplomaturas.html', {
+        'diplomaturas': dips,
+        'cache_version': version(CATALOGO),
+        'cache_timeout': settings.CACHE_TIMEOUT_VISTAS,
+    })
 
 @requiere_nivel(1)
 def listar_materias(request):
+    """
+    Materias visibles con conteos agregados y las marcas del usuario (Exists), sin cargar
+    las inscripciones. Para gestión (nivel >= 4) se pagina por keyset.
+    """
     u = request.user
     base = (Materia.objects.select_related('diplomatura', 'profesor_titular')
-            .prefetch_related('inscripciones', 'profesores')
-            .order_by('diplomatura__nombre', 'nombre'))
+            .annotate(
+                cant_inscriptos=models.Count('inscripciones', distinct=True),
+                es_inscripto=models.Exists(InscripcionMateria.objects.filter(materia=models.OuterRef('pk'), user=u)),
+                es_adjunto=models.Exists(ProfesorMateria.objects.filter(materia=models.OuterRef('pk'), user=u)),
+                es_coordinador=models.Exists(Diplomatura.coordinadores.through.objects.filter(
+                    diplomatura_id=models.OuterRef('diplomatura_id'), user_id=u.pk)),
+            ))
 
+    cursor = request.GET.get('despues') or ''
     if u.nivel >= 4 or getattr(u, 'is_superuser', False):
-        mats = base
+        mats = PaginaKeyset(base, ['diplomatura__nombre', 'nombre', 'id'], cursor, tamanio=MATERIAS_POR_PAGINA)
     else:
         mats = base.filter(
-            models.Q(inscripciones__user=u) |
-            models.Q(profesor_titular=u) |
-            models.Q(profesores__user=u) |
-            models.Q(diplomatura__coordinadores=u)
-        ).distinct()
-    
-    return render(request, 'asistencias/materias.html', {'materias': mats})
+            Q(es_inscripto=True) | Q(es_adjunto=True) | Q(es_coordinador=True) | Q(profesor_titular=u)
+        ).order_by('diplomatura__nombre', 'nombre')
+        cursor = ''
+
+    return render(request, 'asistencias/materias.html', {
+        'materias': mats,
+        'paginada': isinstance(mats, PaginaKeyset),
+        'cursor': cursor,
+        'cache_version': version(CATALOGO),
+        'cache_timeout': settings.CACHE_TIMEOUT_VISTAS,
+    })
 
 @requiere_nivel(1)
 def insc_diplomatura_por_codigo(request):
@@ -166,15 +198,14 @@ def insc_materia_por_codigo(request):
 
 @requiere_nivel(1)
 def ver_clases_materia(request, materia_id):
-    materia = get_object_or_404(Materia, id=materia_id)
+    materia = get_object_or_404(Materia.objects.select_related('diplomatura'), id=materia_id)
     u = request.user
+    m = request.membresias
     
     es_supervisor = u.nivel >= 4 or getattr(u, 'is_superuser', False)
-    es_docente = (materia.profesor_titular == u or 
-                  materia.profesores.filter(user=u).exists())
-    es_coord = (u.nivel >= 3 and 
-                materia.diplomatura.coordinadores.filter(id=u.id).exists())
-    es_alumno = InscripcionMateria.objects.filter(user=u, materia=materia).exists()
+    es_docente = m.es_docente(materia)
+    es_coord = u.nivel >= 3 and m.coordina_materia(materia)
+    es_alumno = m.es_inscripto(materia)
 
     # Si es docente, coordinador o supervisor, puede gestionar
     can_manage = (es_docente or es_coord or es_supervisor) and u.nivel != 6
@@ -195,18 +226,28 @@ def ver_clases_materia(request, materia_id):
     return redirect('asistencias:home')
 
 @requiere_nivel(1)
-def marcar_presente(request, clase_id):
-    clase = get_object_or_404(Clase, id=clase_id)
-    if ProfesorMateria.objects.filter(user=request.user, materia=clase.materia).exists():
+async def marcar_presente(request, clase_id):
+    # Async: en ráfagas de check-in un solo proceso atiende muchas requests esperando a la base
+    clase = await aget_object_or_404(Clase, id=clase_id)
+    user = await request.auser()
+    m = await request.amembresias()
+    if m.es_adjunto(clase.materia_id):
         return HttpResponseForbidden("Docentes no marcan asistencia.")
-    if not InscripcionMateria.objects.filter(user=request.user, materia=clase.materia).exists():
+    if not m.es_inscripto(clase.materia_id):
         return HttpResponseForbidden("No estás inscripto.")
     if not clase.ventana_activa():
         messages.error(request, "Fuera de ventana horaria.")
-        return redirect('asistencias:ver_clases', materia_id=clase.materia.id)
-    Asistencia.objects.get_or_create(clase=clase, user=request.user)
+        return redirect('asistencias:ver_clases', materia_id=clase.materia_id)
+    asistencia, creada = await Asistencia.objects.aget_or_create(clase=clase, user=user)
+    if not creada and not asistencia.presente:
+        # Ausente que dejó cerrar_ventanas y el docente después reabrió la ventana. El timestamp
+        # se renueva: cambios_asistencia_json y los eventos leen por timestamp
+        asistencia.presente = True
+        asistencia.timestamp = timezone.now()
+        asistencia.clase = clase  # ya cargada: la señal de cache no la vuelve a buscar
+        await asistencia.asave(update_fields=['presente', 'timestamp'])
     messages.success(request, "Presente registrado.")
-    return redirect('asistencias:ver_clases', materia_id=clase.materia.id)
+    return redirect('asistencias:ver_clases', materia_id=clase.materia_id)
 
 @requiere_nivel(1)
 def desinscribirse_materia(request, materia_id):
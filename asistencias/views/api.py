@@ -0,0 +1,157 @@
+# asistencias/views/api.py
+# Endpoints JSON async (calendarios y roster de clase), pensados para servirse por ASGI.
+import asyncio
+import datetime
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from asistencias import eventos
+from asistencias.models import Clase, Diplomatura
+from asistencias.permissions import requiere_nivel
+from asistencias.cache import CALENDARIO, CATALOGO, cache_key, aversion
+from asistencias.replica import lecturas_en_replica
+from .alumno import _eventos_calendario, _diplomaturas_de
+from .referente import _eventos_referente
+
+async def _acache_get_or_set(key, calcular):
+    valor = await cache.aget(key)
+    if valor is None:
+        valor = await sync_to_async(calcular)()
+        await cache.aset(key, valor, settings.CACHE_TIMEOUT_VISTAS)
+    return valor
+
+
+@requiere_nivel(1)
+async def calendario_json(request):
+    """Eventos del calendario general del usuario (mismos que home)."""
+    user = await request.auser()
+    m = await request.amembresias()
+    key = cache_key('home_eventos', user.pk, user.nivel, await aversion(CATALOGO), await aversion(CALENDARIO))
+    eventos = await _acache_get_or_set(key, lambda: _eventos_calendario(user, m, _diplomaturas_de(user)))
+    return JsonResponse({'eventos': eventos})
+
+
+@requiere_nivel(1)
+@lecturas_en_replica
+async def calendario_diplomatura_json(request, diplomatura_id):
+    """Eventos de una diplomatura con presentes/inscriptos por clase."""
+    user = await request.auser()
+    diplomatura = await aget_object_or_404(Diplomatura, id=diplomatura_id)
+    m = await request.amembresias()
+    if not (user.nivel in (5, 7) or m.coordina(diplomatura) or m.inscripto_en_diplomatura(diplomatura)):
+        return HttpResponseForbidden("No autorizado.")
+    key = cache_key('calendario_referente', diplomatura.pk,
+                    await aversion('diplomatura', diplomatura.pk))
+    eventos = await _acache_get_or_set(key, lambda: _eventos_referente(diplomatura))
+    return JsonResponse({'diplomatura': diplomatura.nombre, 'eventos': eventos})
+
+
+@requiere_nivel(2)
+async def roster_clase_json(request, clase_id):
+    """Inscriptos de la clase con presente/hora de registro (una consulta, ORM async)."""
+    user = await request.auser()
+    clase = await aget_object_or_404(Clase.objects.select_related('materia'), id=clase_id)
+    m = await request.amembresias()
+    if not m.ve_asistencia(user, clase.materia):
+        return HttpResponseForbidden("No autorizado.")
+
+    alumnos = [{
+        'id': r['id'],
+        'alumno': f"{r['last_name']}, {r['first_name']}",
+        'dni': r['dni'],
+        'presente': bool(r['presente']),
+        'timestamp': r['timestamp'].isoformat() if r['timestamp'] else None,
+    } async for r in clase.roster()]
+    return JsonResponse({
+        'clase': clase.id,
+        'ventana_activa': clase.ventana_activa(),
+        'presentes': sum(a['presente'] for a in alumnos),
+        'cursor': eventos.cursor(),
+        'alumnos': alumnos,
+    })
+
+
+@requiere_nivel(2)
+async def cambios_asistencia_json(request, clase_id):
+    """Asistencias registradas desde ?desde=<ISO 8601> (para refrescar la planilla sin recargarla)."""
+    user = await request.auser()
+    clase = await aget_object_or_404(Clase.objects.select_related('materia'), id=clase_id)
+    m = await request.amembresias()
+    if not m.ve_asistencia(user, clase.materia):
+        return HttpResponseForbidden("No autorizado.")
+
+    desde = parse_datetime(request.GET.get('desde', '').replace(' ', '+'))
+    if desde is None:
+        return JsonResponse({'error': "Parámetro 'desde' inválido (ISO 8601)."}, status=400)
+    if timezone.is_naive(desde):
+        desde = timezone.make_aware(desde)
+
+    cambios = [{
+        'id': a['user_id'],
+        'presente': a['presente'],
+        'timestamp': a['timestamp'].isoformat(),
+    } async for a in clase.asistencias.filter(timestamp__gt=desde)
+        .order_by('timestamp').values('user_id', 'presente', 'timestamp')]
+    return JsonResponse({
+        'clase': clase.id,
+        'ventana_activa': clase.ventana_activa(),
+        'cursor': eventos.cursor(),
+        'cambios': cambios,
+    })
+
+
+def _sse(evento, datos, id=None):
+    linea_id = f"id: {id}\n" if id else ''
+    return f"{linea_id}event: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+
+@requiere_nivel(2)
+async def eventos_clase_sse(request, clase_id):
+    """
+    Server-sent events con los check-ins de la clase. Todos los espectadores de un proceso
+    comparten un único productor (ver asistencias.eventos). Al reconectar, el navegador manda
+    Last-Event-ID y sólo recibe lo posterior.
+    """
+    if not eventos.disponible(request):
+        # Bajo WSGI el stream ocuparía un worker hasta el timeout; 204 hace que EventSource no reintente
+        return HttpResponse(status=204)
+    user = await request.auser()
+    clase = await aget_object_or_404(Clase.objects.select_related('materia'), id=clase_id)
+    m = await request.amembresias()
+    if not m.ve_asistencia(user, clase.materia):
+        return HttpResponseForbidden("No autorizado.")
+
+    desde = parse_datetime(request.headers.get('Last-Event-ID') or request.GET.get('desde', '').replace(' ', '+'))
+    if desde is not None and timezone.is_naive(desde):
+        desde = timezone.make_aware(desde)
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT', 15)
+    duracion_max = getattr(settings, 'SSE_DURACION_MAX', 3600)
+
+    async def stream():
+        canal, cola = await eventos.suscribir(clase.id)
+        try:
+            for e in canal.snapshot(desde):
+                yield _sse('asistencia', e, id=e['timestamp'])
+            limite = min(clase.hora_fin + eventos.MARGEN, timezone.now() + datetime.timedelta(seconds=duracion_max))
+            while timezone.now() < limite:
+                try:
+                    e = await asyncio.wait_for(cola.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _sse('asistencia', e, id=e['timestamp'])
+            yield _sse('fin', {'clase': clase.id})
+        finally:
+            eventos.desuscribir(canal, cola)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: no bufferear el stream
+    return response
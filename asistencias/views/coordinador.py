@@ -1,9 +1,10 @@
 # FILE: asistencias/views/coordinador.py
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse
 from django.contrib import messages
 
-from asistencias.models import Diplomatura
+from asistencias.models import Diplomatura, ImportacionInscripciones
+from asistencias.importador import crear_importacion
 from asistencias.permissions import requiere_nivel
 from asistencias.forms import CrearMateriaForm  # Importante para que crear_materia no falle
 
@@ -34,15 +35,76 @@ def crear_diplomatura(request):
         return redirect('asistencias:home') # Cambiado para evitar error si 'listar_diplomaturas' no existe
     return render(request, 'asistencias/crear_diplomatura.html')
 
+def _puede_importar(request, dip):
+    return request.user.nivel in (5, 7) or request.membresias.coordina(dip) or dip.creada_por_id == request.user.id
+
+
 @requiere_nivel(3)
 def cargar_excel_inscripciones(request, diplo_id):
-    """Lógica para cargar archivos de inscripciones."""
+    """Recibe un CSV/XLSX (dni,email,nombre,apellido,materia_codigo) y lo encola para importar."""
     dip = get_object_or_404(Diplomatura, id=diplo_id)
-    if request.method == 'POST' and request.FILES.get('archivo'):
-        # TODO: parsear CSV/XLSX aquí
-        messages.success(request, "Carga procesada (demo).")
-        return redirect('asistencias:home')
-    return render(request, 'asistencias/cargar_excel.html', {'diplomatura': dip})
+    if not _puede_importar(request, dip):
+        return HttpResponseForbidden("No coordinás esta diplomatura.")
+
+    archivo = request.FILES.get('archivo')
+    if request.method == 'POST' and archivo:
+        if not archivo.name.lower().endswith(('.csv', '.xlsx')):
+            messages.error(request, "Formato no soportado: subí un .csv o .xlsx.")
+        else:
+            imp, creada = crear_importacion(dip, archivo, request.user)
+            if creada:
+                messages.success(request, "Archivo recibido: se está analizando.")
+            else:
+                messages.info(request, "Este archivo ya se había subido; se muestra esa importación.")
+            return redirect('asistencias:importacion_detalle', imp_id=imp.id)
+
+    importaciones = dip.importaciones.select_related('creado_por')[:10]
+    return render(request, 'asistencias/cargar_excel.html', {'diplomatura': dip, 'importaciones': importaciones})
+
+
+def _importacion_permitida(request, imp_id):
+    imp = get_object_or_404(ImportacionInscripciones.objects.select_related('diplomatura'), id=imp_id)
+    return imp, _puede_importar(request, imp.diplomatura)
+
+
+@requiere_nivel(3)
+def importacion_detalle(request, imp_id):
+    """Estado, diff del análisis y progreso de una importación."""
+    imp, permitido = _importacion_permitida(request, imp_id)
+    if not permitido:
+        return HttpResponseForbidden("No coordinás esta diplomatura.")
+    return render(request, 'asistencias/importacion_detalle.html', {
+        'importacion': imp, 'diplomatura': imp.diplomatura, 'en_curso': imp.estado in imp.EN_CURSO,
+    })
+
+
+@requiere_nivel(3)
+def importacion_estado(request, imp_id):
+    """Progreso en JSON, para consultar periódicamente desde la página de detalle."""
+    imp, permitido = _importacion_permitida(request, imp_id)
+    if not permitido:
+        return HttpResponseForbidden("No coordinás esta diplomatura.")
+    return JsonResponse({
+        'estado': imp.estado, 'procesadas': imp.procesadas, 'total_filas': imp.total_filas,
+        'porcentaje': imp.porcentaje, 'diff': imp.diff, 'resultado': imp.resultado,
+    })
+
+
+@requiere_nivel(3)
+def importacion_confirmar(request, imp_id):
+    """Confirma una importación analizada para que el worker la aplique."""
+    imp, permitido = _importacion_permitida(request, imp_id)
+    if not permitido:
+        return HttpResponseForbidden("No coordinás esta diplomatura.")
+    if request.method != 'POST':
+        return redirect('asistencias:importacion_detalle', imp_id=imp.id)
+    P = ImportacionInscripciones
+    if P.objects.filter(pk=imp.pk, estado=P.ANALIZADA).update(estado=P.CONFIRMADA):
+        messages.success(request, "Importación confirmada: se aplicará en segundo plano.")
+    else:
+        messages.error(request, "La importación no está lista para confirmarse.")
+    return redirect('asistencias:importacion_detalle', imp_id=imp.id)
+
 
 @requiere_nivel(3)
 def generar_constancia(request):
@@ -4,8 +4,11 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.http import HttpResponseForbidden, HttpResponse
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date
 from functools import wraps
 from ..models import Clase, Materia, User, Nota, Asistencia 
+from asistencias import eventos
+from ..planillas import planilla_materia, rango_pagina
 import csv
 
 # 1. DECORADOR DE SEGURIDAD
@@ -20,50 +23,52 @@ def requiere_nivel(nivel_minimo):
     return decorator
 
 # 2. LISTADO GENERAL DE ASISTENCIA (MATRIZ)
+def _fecha_param(request, nombre):
+    try:
+        return parse_date(request.GET.get(nombre, ''))
+    except ValueError:
+        return None
+
 @requiere_nivel(2)
 def listado_presentes(request, materia_id):
-    materia = get_object_or_404(Materia, id=materia_id)
-    # Filtro por materia para evitar el mensaje "Sin clases"
-    clases = Clase.objects.filter(materia=materia).order_by('fecha')
-    
-    alumnos = User.objects.filter(
-        Q(insc_materias__materia=materia) | Q(insc_diplos__diplomatura=materia.diplomatura),
-        nivel=1
-    ).distinct().order_by('last_name')
+    """Matriz clases × alumnos de un rango de fechas (?desde=&hasta=, por defecto las últimas semanas)."""
+    materia = get_object_or_404(Materia.objects.select_related('diplomatura'), id=materia_id)
+    if not request.membresias.ve_asistencia(request.user, materia):
+        return HttpResponseForbidden("No tienes permiso para ver esta asistencia.")
+
+    desde, hasta = _fecha_param(request, 'desde'), _fecha_param(request, 'hasta')
+    if desde and hasta and hasta < desde:
+        desde, hasta = hasta, desde
+    desde, hasta, anterior, siguiente = rango_pagina(materia, desde, hasta)
+    planilla = planilla_materia(materia, desde, hasta)
 
     return render(request, 'asistencias/listado_presentes.html', {
         'materia': materia,
-        'clases': clases,
-        'alumnos': alumnos,
+        'clases': planilla.clases,
+        'matriz': list(planilla.matriz()),
+        'planillas': [(c, list(planilla.filas(c['id']))) for c in planilla.clases],
+        'desde': desde, 'hasta': hasta, 'anterior': anterior, 'siguiente': siguiente,
     })
 
-# 3. DETALLE DE ASISTENCIA POR CLASE (La que faltaba en el import)
+# 3. DETALLE DE ASISTENCIA POR CLASE
 @requiere_nivel(2)
 def detalle_asistencia_clase(request, clase_id):
-    clase = get_object_or_404(Clase, id=clase_id)
+    """Planilla de la clase: inscriptos con presente/hora en una sola consulta (Clase.roster).
+    La página se mantiene al día consultando api/clases/<id>/cambios/."""
+    clase = get_object_or_404(Clase.objects.select_related('materia'), id=clase_id)
     materia = clase.materia
-    
-    alumnos_inscritos = User.objects.filter(
-        Q(insc_materias__materia=materia) | Q(insc_diplos__diplomatura=materia.diplomatura),
-        nivel=1
-    ).distinct().order_by('last_name')
+    if not request.membresias.ve_asistencia(request.user, materia):
+        return HttpResponseForbidden("No tienes permiso para ver esta asistencia.")
 
-    # Obtenemos IDs de alumnos presentes usando el campo 'alumno_id'
-    presentes_ids = clase.asistencias.filter(presente=True).values_list('alumno_id', flat=True)
-    
-    lista_asistencia = []
-    for alumno in alumnos_inscritos:
-        registro = clase.asistencias.filter(alumno=alumno).first()
-        lista_asistencia.append({
-            'alumno': alumno,
-            'asistio': alumno.id in presentes_ids,
-            'hora_registro': registro.timestamp if registro else None
-        })
-        
+    lista_asistencia = list(clase.roster())
     return render(request, 'asistencias/detalle_asistencia.html', {
         'clase': clase,
         'materia': materia,
-        'lista_asistencia': lista_asistencia
+        'lista_asistencia': lista_asistencia,
+        'presentes': sum(1 for r in lista_asistencia if r['presente']),
+        'cursor': eventos.cursor(),
+        'ventana_activa': clase.ventana_activa(),
+        'sse_activo': eventos.disponible(request),
     })
 
 # 4. EXPORTAR ASISTENCIA A CSV
@@ -140,3 +145,35 @@ def editar_clase(request, clase_id):
         form = ClaseForm(instance=clase)
 
     return render(request, 'asistencias/editar_clase.html', {'form': form, 'clase': clase})
+
+# 7. CREAR CLASES RECURRENTES (patrón semanal)
+@requiere_nivel(3)
+def crear_clases_recurrentes(request, materia_id):
+    from ..forms import ClaseRecurrenteForm
+    from ..recurrencia import planificar, crear_clases_recurrentes as crear
+
+    materia = get_object_or_404(Materia.objects.select_related('diplomatura'), id=materia_id)
+    u = request.user
+    if u.nivel == 6 or not (u.nivel >= 4 or request.membresias.coordina_materia(materia)):
+        return HttpResponseForbidden("No podés programar clases de esta materia.")
+
+    plan = None
+    form = ClaseRecurrenteForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        d = form.cleaned_data
+        args = (materia, d['desde'], d['hasta'], d['dias'], d['hora_inicio'], d['hora_fin'])
+        kwargs = {'excluir': d['excluir'], 'tema': d['tema'], 'link_clase': d['link_clase'], 'creado_por': u}
+        try:
+            if request.POST.get('accion') == 'crear':
+                plan = crear(*args, **kwargs)
+                messages.success(request, f"Se crearon {len(plan.clases)} clases.")
+                if plan.conflictos:
+                    messages.warning(request, f"{len(plan.conflictos)} fechas se omitieron por superponerse con clases existentes.")
+                return redirect('asistencias:ver_clases', materia_id=materia.id)
+            plan = planificar(*args, **kwargs)
+        except ValueError as e:
+            form.add_error(None, str(e))
+
+    return render(request, 'asistencias/crear_clases_recurrentes.html', {
+        'materia': materia, 'form': form, 'plan': plan,
+    })
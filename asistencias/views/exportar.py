@@ -1,14 +1,14 @@
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import localtime
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from io import BytesIO
-from openpyxl import Workbook
 
+from .. import archivo, documentos
+from ..replica import lecturas_en_replica
 from ..models import (
-    Diplomatura, Materia, Clase, Asistencia,
-    ProfesorMateria, InscripcionDiplomatura, InscripcionMateria
+    Diplomatura, Materia, Clase, Asistencia, ClaseArchivada, AsistenciaArchivada,
+    ProfesorMateria, InscripcionDiplomatura, InscripcionMateria, ResumenNota, ResumenAsistencia
 )
 
 def _dt(v):
@@ -19,28 +19,7 @@ def _dt(v):
         return localtime(v).strftime("%Y-%m-%d %H:%M:%S")
     return v.strftime("%Y-%m-%d")
 
-from openpyxl.utils import get_column_letter
-
-def _autosize(ws):
-    for col in ws.columns:
-        max_len = 0
-        # Use get_column_letter instead of accessing column_letter directly on the cell,
-        # which might be a MergedCell
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                val = str(cell.value) if cell.value is not None else ""
-                max_len = max(max_len, len(val))
-            except Exception:
-                pass
-        ws.column_dimensions[col_letter].width = min(max_len + 2, 60)
-
-def _write_sheet(ws, headers, rows):
-    ws.append(headers)
-    for r in rows:
-        ws.append(r)
-    _autosize(ws)
-
+@lecturas_en_replica
 def exportar_xlsx(request):
     # Solo Coordinadores (3) o Administradores (5)
     if not request.user.is_authenticated or request.user.nivel not in (3, 5):
@@ -48,8 +27,8 @@ def exportar_xlsx(request):
 
     User = get_user_model()
 
-    wb = Workbook()
-    wb.remove(wb.active)
+    xlsx = documentos.cargar('xlsx')
+    wb = xlsx.libro(vacio=True)
 
     # === Usuarios ===
     ws = wb.create_sheet("Usuarios")
@@ -64,7 +43,7 @@ def exportar_xlsx(request):
             u.last_name, getattr(u, "second_last_name", ""),
             u.dni, u.nivel, u.is_active, _dt(u.date_joined), _dt(u.last_login)
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === Diplomaturas ===
     ws = wb.create_sheet("Diplomaturas")
@@ -77,7 +56,7 @@ def exportar_xlsx(request):
             d.creada_por.email if d.creada_por else "",
             coords
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === Materias ===
     ws = wb.create_sheet("Materias")
@@ -91,7 +70,7 @@ def exportar_xlsx(request):
             m.profesor_titular_id or "",
             m.profesor_titular.email if m.profesor_titular else ""
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === Clases ===
     ws = wb.create_sheet("Clases")
@@ -104,7 +83,13 @@ def exportar_xlsx(request):
             c.id, c.materia_id, f"{c.materia.nombre} ({c.materia.diplomatura.nombre})",
             _dt(c.fecha), _dt(c.hora_inicio), _dt(c.hora_fin), c.tema, ventana_activa
         ])
-    _write_sheet(ws, headers, rows)
+    # Clases de diplomaturas archivadas (mismos ids que tenían)
+    for c in ClaseArchivada.objects.select_related("materia", "materia__diplomatura").order_by("-fecha"):
+        rows.append([
+            c.id, c.materia_id, f"{c.materia.nombre} ({c.materia.diplomatura.nombre})",
+            _dt(c.fecha), _dt(c.hora_inicio), _dt(c.hora_fin), c.tema, False
+        ])
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === Asistencias ===
     ws = wb.create_sheet("Asistencias")
@@ -114,15 +99,19 @@ def exportar_xlsx(request):
     asist_qs = Asistencia.objects.select_related(
         "clase", "clase__materia", "clase__materia__diplomatura", "user"
     ).all().order_by("-timestamp")
-    for a in asist_qs:
-        rows.append([
-            a.id, a.clase_id,
-            f"{a.clase.materia.nombre} ({a.clase.materia.diplomatura.nombre})",
-            _dt(a.clase.fecha),
-            a.user_id, a.user.email, a.user.dni,
-            a.presente, _dt(a.timestamp)
-        ])
-    _write_sheet(ws, headers, rows)
+    archivadas = AsistenciaArchivada.objects.select_related(
+        "clase", "clase__materia", "clase__materia__diplomatura", "user"
+    ).order_by("-timestamp")
+    for qs in (asist_qs, archivadas):
+        for a in qs:
+            rows.append([
+                a.id, a.clase_id,
+                f"{a.clase.materia.nombre} ({a.clase.materia.diplomatura.nombre})",
+                _dt(a.clase.fecha),
+                a.user_id, a.user.email, a.user.dni,
+                a.presente, _dt(a.timestamp)
+            ])
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === ProfesorMateria ===
     ws = wb.create_sheet("ProfesorMateria")
@@ -133,7 +122,7 @@ def exportar_xlsx(request):
             pm.id, pm.user_id, pm.user.email,
             pm.materia_id, pm.materia.nombre, pm.materia.diplomatura.nombre, pm.rol
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === InscripcionDiplomatura ===
     ws = wb.create_sheet("InscDiplomatura")
@@ -144,7 +133,7 @@ def exportar_xlsx(request):
             ins.id, ins.user_id, ins.user.email, ins.user.dni,
             ins.diplomatura_id, ins.diplomatura.nombre, _dt(ins.fecha)
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # === InscripcionMateria ===
     ws = wb.create_sheet("InscMateria")
@@ -155,25 +144,41 @@ def exportar_xlsx(request):
             ins.id, ins.user_id, ins.user.email, ins.user.dni,
             ins.materia_id, ins.materia.nombre, ins.materia.diplomatura.nombre, _dt(ins.fecha)
         ])
-    _write_sheet(ws, headers, rows)
+    xlsx.escribir_hoja(ws, headers, rows)
+
+    # === Promedios (precalculados en ResumenNota) ===
+    ws = wb.create_sheet("Promedios")
+    headers = ["alumno_id", "email", "dni", "materia_id", "materia", "cantidad", "promedio",
+               "ultima_nota", "ultima_fecha"]
+    rows = []
+    for r in ResumenNota.objects.select_related("alumno", "materia").order_by("materia__nombre", "alumno__last_name"):
+        rows.append([
+            r.alumno_id, r.alumno.email, r.alumno.dni,
+            r.materia_id, r.materia.nombre, r.cantidad, r.promedio,
+            r.ultima_nota, _dt(r.ultima_fecha)
+        ])
+    xlsx.escribir_hoja(ws, headers, rows)
+
+    # === Resumen de asistencia de materias archivadas ===
+    ws = wb.create_sheet("ResumenAsistencia")
+    headers = ["alumno_id", "email", "dni", "materia_id", "materia", "clases", "presentes"]
+    rows = []
+    for r in ResumenAsistencia.objects.select_related("alumno", "materia").order_by("materia__nombre", "alumno__last_name"):
+        rows.append([
+            r.alumno_id, r.alumno.email, r.alumno.dni,
+            r.materia_id, r.materia.nombre, r.clases, r.presentes
+        ])
+    xlsx.escribir_hoja(ws, headers, rows)
 
     # ⚠️ No se exportan tokens para niveles < 5
     # (Si quisieras incluirlos solo para admin, podrías hacer un if request.user.nivel == 5:)
 
     # Respuesta HTTP
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    filename = f"asistencias_export_{localtime(timezone.now()).strftime('%Y%m%d_%H%M%S')}.xlsx"
-    resp = HttpResponse(
-        buffer.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return resp
+    nombre = f"asistencias_export_{localtime(timezone.now()).strftime('%Y%m%d_%H%M%S')}"
+    return documentos.respuesta('xlsx', xlsx.a_bytes(wb), nombre)
 
 
+@lecturas_en_replica
 def exportar_asistencia_materia(request, materia_id):
     """
     Exporta una planilla de asistencia para una materia específica.
@@ -193,24 +198,17 @@ def exportar_asistencia_materia(request, materia_id):
     if request.user.nivel >= 3:
         tiene_permiso = True
     elif request.user.nivel == 6: # Referente Municipal
-        # Check if registered in the diplomatura of this materia
-        if InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=materia.diplomatura).exists():
-            tiene_permiso = True
+        # Inscripto en la diplomatura de esta materia
+        tiene_permiso = request.membresias.inscripto_en_diplomatura(materia.diplomatura_id)
     elif request.user.nivel == 2:
-        # Verificar si es titular
-        if materia.profesor_titular_id == request.user.id:
-            tiene_permiso = True
-        else:
-            # Verificar si es adjunto
-            es_adjunto = ProfesorMateria.objects.filter(user=request.user, materia=materia).exists()
-            if es_adjunto:
-                tiene_permiso = True
+        # Titular o adjunto
+        tiene_permiso = request.membresias.es_docente(materia)
     
     if not tiene_permiso:
         return HttpResponseForbidden("No tiene permisos para exportar asistencia de esta materia.")
 
-    # Obtener Clases
-    clases = Clase.objects.filter(materia=materia).order_by('fecha')
+    # Obtener Clases (del archivo si la diplomatura está archivada)
+    clases = archivo.clases_de(materia)
     
     # Obtener Alumnos inscriptos
     inscripciones = InscripcionMateria.objects.filter(materia=materia).select_related('user').order_by('user__last_name', 'user__first_name')
@@ -218,11 +216,11 @@ def exportar_asistencia_materia(request, materia_id):
 
     # Obtener Asistencias
     # Diccionario: {(user_id, clase_id): presente (bool)}
-    asistencias_qs = Asistencia.objects.filter(clase__materia=materia)
-    asistencias_map = {(a.user_id, a.clase_id): a.presente for a in asistencias_qs}
+    asistencias_map = archivo.presentes_de(materia)
 
     # Generar Excel
-    wb = Workbook()
+    xlsx = documentos.cargar('xlsx')
+    wb = xlsx.libro()
     ws = wb.active
     ws.title = "Asistencia"
 
@@ -248,22 +246,14 @@ def exportar_asistencia_materia(request, materia_id):
             row.append(val)
         ws.append(row)
 
-    _autosize(ws)
+    xlsx.autosize(ws)
 
     # Respuesta HTTP
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    filename = f"asistencia_{materia.codigo}_{localtime(timezone.now()).strftime('%Y%m%d')}.xlsx"
-    resp = HttpResponse(
-        buffer.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return resp
+    nombre = f"asistencia_{materia.codigo}_{localtime(timezone.now()).strftime('%Y%m%d')}"
+    return documentos.respuesta('xlsx', xlsx.a_bytes(wb), nombre)
 
 
+@lecturas_en_replica
 def exportar_asistencia_diplomatura(request, diplomatura_id):
     """
     Exporta la asistencia de TODAS las materias de una diplomatura.
@@ -279,16 +269,15 @@ def exportar_asistencia_diplomatura(request, diplomatura_id):
     if request.user.nivel in [3, 5, 7]: # Incluye Supervisor
         tiene_permiso = True
     elif request.user.nivel == 6:
-        if InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=diplomatura).exists():
-            tiene_permiso = True
+        tiene_permiso = request.membresias.inscripto_en_diplomatura(diplomatura)
             
     if not tiene_permiso:
         return HttpResponseForbidden("No tenés permiso para exportar esta diplomatura.")
 
-    wb = Workbook()
-    wb.remove(wb.active) # Remove default sheet
+    xlsx = documentos.cargar('xlsx')
+    wb = xlsx.libro(vacio=True)
 
-    materias = Materia.objects.filter(diplomatura=diplomatura).order_by('nombre')
+    materias = Materia.objects.filter(diplomatura=diplomatura).select_related('diplomatura').order_by('nombre')
     
     if not materias.exists():
          ws = wb.create_sheet("Info")
@@ -299,12 +288,11 @@ def exportar_asistencia_diplomatura(request, diplomatura_id):
         sheet_name = materia.nombre[:30]
         ws = wb.create_sheet(sheet_name)
         
-        clases = Clase.objects.filter(materia=materia).order_by('fecha')
+        clases = archivo.clases_de(materia)
         inscripciones = InscripcionMateria.objects.filter(materia=materia).select_related('user').order_by('user__last_name', 'user__first_name')
         alumnos = [i.user for i in inscripciones]
         
-        asistencias_qs = Asistencia.objects.filter(clase__materia=materia)
-        asistencias_map = {(a.user_id, a.clase_id): a.presente for a in asistencias_qs}
+        asistencias_map = archivo.presentes_de(materia)
 
         # Header
         ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(clases) + 2)
@@ -321,16 +309,7 @@ def exportar_asistencia_diplomatura(request, diplomatura_id):
                 row.append(val)
             ws.append(row)
             
-        _autosize(ws)
-
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    filename = f"asistencia_diplomatura_{diplomatura.codigo}_{localtime(timezone.now()).strftime('%Y%m%d')}.xlsx"
-    resp = HttpResponse(
-        buffer.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return resp
+        xlsx.autosize(ws)
+
+    nombre = f"asistencia_diplomatura_{diplomatura.codigo}_{localtime(timezone.now()).strftime('%Y%m%d')}"
+    return documentos.respuesta('xlsx', xlsx.a_bytes(wb), nombre)
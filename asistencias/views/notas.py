@@ -2,8 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Avg
-from ..models import Materia, Nota, InscripcionMateria, User
+from ..models import Materia, Nota, InscripcionMateria, User, ResumenNota
 from ..forms import NotaForm
 
 @login_required
@@ -13,8 +12,8 @@ def cargar_notas(request, materia_id):
     materia = get_object_or_404(Materia, id=materia_id)
     
     # Verificar si el usuario es profesor de la materia o coordinador
-    es_profesor = materia.profesores.filter(user=request.user).exists()
-    es_titular = materia.profesor_titular == request.user
+    es_profesor = request.membresias.es_adjunto(materia)
+    es_titular = request.membresias.es_titular(materia)
     es_coordinador = request.user.nivel >= 3 # Asumiendo 3 es coordinador
     
     if not (es_profesor or es_titular or es_coordinador):
@@ -47,8 +46,9 @@ def cargar_notas(request, materia_id):
 
 @login_required
 def mis_notas(request):
-    notas = Nota.objects.filter(alumno=request.user).order_by('-fecha')
-    promedios = Nota.objects.filter(alumno=request.user).values('materia__nombre').annotate(promedio=Avg('valor'))
+    notas = Nota.objects.filter(alumno=request.user).select_related('materia', 'evaluador').order_by('-fecha')
+    # Promedios precalculados (ver ResumenNota), sin agregar sobre todas las notas
+    promedios = ResumenNota.objects.filter(alumno=request.user).select_related('materia').order_by('materia__nombre')
     
     context = {
         'notas': notas,
@@ -61,15 +61,17 @@ def promedios_materia(request, materia_id):
     materia = get_object_or_404(Materia, id=materia_id)
     
     # Verificar permisos (similar a cargar_notas)
-    es_profesor = materia.profesores.filter(user=request.user).exists()
-    es_titular = materia.profesor_titular == request.user
+    es_profesor = request.membresias.es_adjunto(materia)
+    es_titular = request.membresias.es_titular(materia)
     es_coordinador = request.user.nivel >= 3
     
     if not (es_profesor or es_titular or es_coordinador):
         messages.error(request, "No tienes permiso para ver los promedios de esta materia.")
         return redirect('asistencias:home')
 
-    promedios = Nota.objects.filter(materia=materia).values('alumno__last_name', 'alumno__first_name').annotate(promedio=Avg('valor')).order_by('alumno__last_name')
+    promedios = (ResumenNota.objects.filter(materia=materia)
+                 .select_related('alumno')
+                 .order_by('alumno__last_name', 'alumno__first_name'))
     
     context = {
         'materia': materia,
@@ -5,8 +5,9 @@ from asistencias.models import Clase, Asistencia, User
 from django.db.models import Q
 from asistencias.models import Clase
 
-def publico(request):
+async def publico(request):
     now = timezone.localtime()
+    user = await request.auser()
 
     # Clases activas ahora (ventana abierta)
     clases = (Clase.objects
@@ -14,10 +15,10 @@ def publico(request):
               .filter(hora_inicio__lte=now, hora_fin__gte=now))
 
     # Si está logueado: mostrar SOLO donde está inscripto o es profesor
-    if request.user.is_authenticated:
+    if user.is_authenticated:
         clases = (clases.filter(
-                    Q(materia__inscripciones__user=request.user) |   # alumno inscripto
-                    Q(materia__profesores__user=request.user)        # o profesor
+                    Q(materia__inscripciones__user=user) |   # alumno inscripto
+                    Q(materia__profesores__user=user)        # o profesor
                  ).distinct())
     else:
         # Si no está logueado, no mostramos nada (o podrías redirigir a login)
@@ -26,7 +27,10 @@ def publico(request):
     clases = clases.order_by('materia__diplomatura__nombre',
                              'materia__nombre', 'hora_inicio')
 
+    # Se materializa con el ORM async: el template no puede consultar la base desde el event loop
+    clases = [c async for c in clases]
     return render(request, 'asistencias/publico.html', {'clases': clases})
+
 def consulta_publica(request):
     """
     - Alumno logueado (nivel 1): ignora DNI y muestra SUS asistencias.
@@ -0,0 +1,63 @@
+# asistencias/views/qr.py
+import time
+
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseForbidden
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+
+from asistencias import checkin, documentos
+from asistencias.models import Clase
+from asistencias.permissions import requiere_nivel
+
+
+@requiere_nivel(2)
+@never_cache
+def qr_clase(request, clase_id):
+    """QR rotativo para proyectar en el aula; la página se recarga con cada rotación."""
+    clase = get_object_or_404(Clase.objects.select_related('materia__diplomatura'), id=clase_id)
+    u = request.user
+    m = request.membresias
+    es_supervisor = u.nivel >= 4 or getattr(u, 'is_superuser', False)
+    if u.nivel == 6 or not (es_supervisor or m.es_docente(clase.materia) or m.coordina_materia(clase.materia)):
+        return HttpResponseForbidden("No podés proyectar el QR de esta clase.")
+
+    qr = None
+    if clase.ventana_activa():
+        url = request.build_absolute_uri(reverse('asistencias:usar_qr', args=[checkin.emitir(clase)]))
+        qr = documentos.cargar('qr').svg(url)
+    return render(request, 'asistencias/qr_clase.html', {
+        'clase': clase, 'qr': qr, 'rotacion': checkin.rotacion(),
+    })
+
+
+async def usar_qr(request, codigo):
+    # CheckinQRMiddleware ya rechazó los códigos inválidos, antes de leer sesión y usuario
+    try:
+        pase, pendiente = checkin.verificar_escaneo(request, codigo)
+    except checkin.CodigoInvalido as e:
+        return HttpResponseForbidden(f"QR inválido ({e.motivo}).")
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        # El código vence en segundos: se guarda para aceptarlo una vez al volver del login
+        await request.session.aset(checkin.SESION, {'codigo': codigo, 'hasta': time.time() + checkin.GRACIA_LOGIN})
+        return redirect_to_login(f"{request.path}?{checkin.PENDIENTE}=1")
+    if pendiente:
+        guardado = await request.session.apop(checkin.SESION, None)
+        if not guardado or guardado['codigo'] != codigo or guardado['hasta'] < time.time():
+            return HttpResponseForbidden("QR inválido (vencido).")
+        if not pase.inicio <= time.time() <= pase.fin:
+            return HttpResponseForbidden("QR inválido (fuera de ventana).")
+
+    m = await request.amembresias()
+    if m.es_adjunto(pase.materia_id):
+        return HttpResponseForbidden("Docentes no marcan asistencia.")
+    if not m.es_inscripto(pase.materia_id):
+        return HttpResponseForbidden("No estás inscripto.")
+
+    await checkin.aregistrar(pase, user.pk)
+    messages.success(request, "Presente registrado.")
+    return redirect('asistencias:ver_clases', materia_id=pase.materia_id)
@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.db.models import Prefetch, Avg
-from asistencias.models import Diplomatura, InscripcionDiplomatura, Clase, Asistencia, Materia, InscripcionMateria, Nota
+from asistencias.models import Diplomatura, Clase, Asistencia, Materia, InscripcionMateria, ResumenNota
 from asistencias.permissions import requiere_nivel
+from asistencias.cache import cache_key, get_or_set, version
+from asistencias.replica import lecturas_en_replica
 
 @requiere_nivel(6)
 def dashboard(request):
@@ -10,13 +13,7 @@ def dashboard(request):
     ).distinct()
     return render(request, 'asistencias/referente_dashboard.html', {'diplomaturas': diplomaturas})
 
-@requiere_nivel(6)
-def calendario_referente(request, diplomatura_id):
-    diplomatura = get_object_or_404(Diplomatura, id=diplomatura_id)
-    
-    if not InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=diplomatura).exists() and request.user.nivel != 7:
-         return redirect('asistencias:referente_dashboard')
-
+def _eventos_referente(diplomatura):
     clases = Clase.objects.filter(materia__diplomatura=diplomatura).select_related('materia')
     
     eventos = []
@@ -41,6 +38,20 @@ def calendario_referente(request, diplomatura_id):
                 'inscriptos': total_inscriptos
             }
         })
+    return eventos
+
+@requiere_nivel(6)
+@lecturas_en_replica
+def calendario_referente(request, diplomatura_id):
+    diplomatura = get_object_or_404(Diplomatura, id=diplomatura_id)
+    
+    if not request.membresias.inscripto_en_diplomatura(diplomatura) and request.user.nivel != 7:
+         return redirect('asistencias:referente_dashboard')
+
+    eventos = get_or_set(
+        cache_key('calendario_referente', diplomatura.pk, version('diplomatura', diplomatura.pk)),
+        lambda: _eventos_referente(diplomatura),
+    )
 
     return render(request, 'asistencias/calendario.html', {
         'diplomatura': diplomatura,
@@ -53,7 +64,7 @@ def ver_asistencia_clase(request, clase_id):
     clase = get_object_or_404(Clase.objects.select_related('materia', 'materia__diplomatura'), id=clase_id)
     diplomatura = clase.materia.diplomatura
     
-    if not InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=diplomatura).exists() and request.user.nivel != 7:
+    if not request.membresias.inscripto_en_diplomatura(diplomatura) and request.user.nivel != 7:
          return redirect('asistencias:referente_dashboard')
 
     asistencias = Asistencia.objects.filter(clase=clase).select_related('user').order_by('user__last_name')
@@ -79,14 +90,16 @@ def ver_asistencia_clase(request, clase_id):
 def listar_materias_referente(request, diplomatura_id):
     diplomatura = get_object_or_404(Diplomatura, id=diplomatura_id)
     
-    if not InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=diplomatura).exists() and request.user.nivel != 7:
+    if not request.membresias.inscripto_en_diplomatura(diplomatura) and request.user.nivel != 7:
          return redirect('asistencias:referente_dashboard')
 
     materias = Materia.objects.filter(diplomatura=diplomatura)
     
     return render(request, 'asistencias/referente_materias.html', {
         'diplomatura': diplomatura,
-        'materias': materias
+        'materias': materias,
+        'cache_version': version('diplomatura', diplomatura.pk),
+        'cache_timeout': settings.CACHE_TIMEOUT_VISTAS,
     })
 
 @requiere_nivel(6)
@@ -94,12 +107,14 @@ def ver_notas_materia(request, materia_id):
     materia = get_object_or_404(Materia.objects.select_related('diplomatura'), id=materia_id)
     diplomatura = materia.diplomatura
     
-    if not InscripcionDiplomatura.objects.filter(user=request.user, diplomatura=diplomatura).exists() and request.user.nivel != 7:
+    if not request.membresias.inscripto_en_diplomatura(diplomatura) and request.user.nivel != 7:
          return redirect('asistencias:referente_dashboard')
 
-    notas = Nota.objects.filter(materia=materia).select_related('alumno', 'evaluador').order_by('alumno__last_name')
+    resumenes = (ResumenNota.objects.filter(materia=materia)
+                 .select_related('alumno')
+                 .order_by('alumno__last_name', 'alumno__first_name'))
     
     return render(request, 'asistencias/ver_notas_materia.html', {
         'materia': materia,
-        'notas': notas
+        'resumenes': resumenes
     })
@@ -1,42 +1,93 @@
-from django.shortcuts import redirect
+import datetime
+
+from django.shortcuts import redirect, render
 from django.contrib import messages
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse, FileResponse, Http404
+
+from .. import instrumentacion, perfilado
+from ..forms import PerfiladoForm
 
 @login_required
 def switch_role(request, role_id):
     """
     Allows a Supervisor (Level 7) to switch their effective role.
     """
-    # Check if the REAL user is a Supervisor (ignore the impersonated role for permission check)
-    # We need to check the DB user, but request.user might be modified by middleware.
-    # However, the middleware modifies the INSTANCE on the request.
-    # We can check the original level if we stored it, or just re-fetch if needed.
-    # But simpler: The middleware only lowers the level. If request.user.nivel is 7, they are definitely a supervisor.
-    # If they are impersonating (e.g. level 1), request.user.nivel is 1.
-    # So we need a way to know if they are ACTUALLY a supervisor.
-    
-    # Strategy: The middleware should probably attach an 'is_impersonating' or 'original_user' attribute?
-    # Or we can just check the DB.
-    
-    # Re-fetch user from DB to get true level
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-    real_user = User.objects.get(pk=request.user.pk)
-    
-    if real_user.nivel != 7:
+    # RoleSwitchMiddleware deja el nivel real en request.nivel_real,
+    # así que no hace falta volver a leer el usuario de la base.
+    if request.nivel_real != 7:
         return HttpResponseForbidden("Solo supervisores pueden cambiar de rol.")
         
     if role_id not in [1, 2, 3, 6, 7]: # Allowed roles to switch to
          messages.error(request, "Rol inválido.")
          return redirect(request.META.get('HTTP_REFERER', '/'))
 
-    # Set session variable
-    request.session['impersonate_role'] = role_id
+    # Volver a Supervisor es dejar de impersonar
+    if role_id == 7:
+        request.session.pop('impersonate_role', None)
+    else:
+        request.session['impersonate_role'] = role_id
     
     # Get role name for message
-    role_names = dict(User.NIVEL_CHOICES)
+    role_names = dict(get_user_model().NIVEL_CHOICES)
     role_name = role_names.get(role_id, "Desconocido")
     
     messages.success(request, f"Rol cambiado a: {role_name}")
     return redirect('/')
+
+
+@login_required
+def rendimiento(request):
+    """Agregado por URL de InstrumentacionMiddleware (de este proceso). ?formato=json para scripts."""
+    if request.nivel_real != 7:
+        return HttpResponseForbidden("Solo supervisores.")
+    if request.method == 'POST':
+        instrumentacion.reiniciar()
+        return redirect('asistencias:rendimiento')
+    filas = instrumentacion.agregado()
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({'rutas': filas, 'ventana': instrumentacion.VENTANA})
+    return render(request, 'asistencias/rendimiento.html', {
+        'filas': filas, 'ventana': instrumentacion.VENTANA, 'activa': instrumentacion.activa(),
+    })
+
+
+@login_required
+def perfiles(request):
+    """Activa/desactiva el perfilado a pedido y lista los perfiles guardados."""
+    if request.nivel_real != 7:
+        return HttpResponseForbidden("Solo supervisores.")
+    form = PerfiladoForm()
+    if request.method == 'POST':
+        if request.POST.get('accion') == 'desactivar':
+            perfilado.desactivar()
+            messages.success(request, "Perfilado desactivado.")
+            return redirect('asistencias:perfiles')
+        form = PerfiladoForm(request.POST)
+        if form.is_valid():
+            d = form.cleaned_data
+            perfilado.activar(patron=d['patron'], user_id=d['usuario'].pk if d['usuario'] else None,
+                              tasa=d['tasa'], maximo=d['maximo'], minutos=d['minutos'], por=request.user.email)
+            messages.success(request, "Perfilado activado.")
+            return redirect('asistencias:perfiles')
+    config = perfilado.config()
+    return render(request, 'asistencias/perfiles.html', {
+        'form': form, 'config': config, 'perfiles': perfilado.listar(), 'activo': perfilado.activo(),
+        'vence': datetime.datetime.fromtimestamp(config['hasta'], tz=datetime.timezone.utc) if config else None,
+    })
+
+
+@login_required
+def perfil_detalle(request, nombre):
+    if request.nivel_real != 7:
+        return HttpResponseForbidden("Solo supervisores.")
+    if request.GET.get('descargar'):
+        archivo = perfilado.archivo_prof(nombre)
+        if archivo is None:
+            raise Http404
+        return FileResponse(archivo.open('rb'), as_attachment=True, filename=archivo.name)
+    perfil = perfilado.leer(nombre)
+    if perfil is None:
+        raise Http404
+    return render(request, 'asistencias/perfil_detalle.html', {'perfil': perfil})
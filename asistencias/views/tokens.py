@@ -19,10 +19,10 @@ def usar_token(request):
             messages.error(request, "Token inválido/expirado/ya usado.")
             return redirect('asistencias:home')
 
-        # subir nivel si corresponde
-        if request.user.nivel < tok.nivel_destino:
+        # subir nivel si corresponde (se compara contra el nivel real, no el impersonado)
+        if request.nivel_real < tok.nivel_destino:
             request.user.nivel = tok.nivel_destino
-            request.user.save()
+            request.user.save(update_fields=['nivel'])
 
         # si el token apunta a una materia, asociar como adjunto
         if tok.materia_id:
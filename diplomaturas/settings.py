@@ -26,8 +26,16 @@ environ.Env.read_env(str(Path(__file__).resolve().parent.parent / ".env"))
 #usamos esta variable 'SECRET_KEY' para seguridad, permitiendonos firmar cookies y otros datos, a fin de evitar manipulaciones como la falsificacion de solicitudes entre sitios (CSRF)
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "dev-secret")
-#DEBUG = os.getenv("DJANGO_DEBUG", "False") == "True"
-DEBUG = True
+
+# --- Perfil de entorno ---
+# DJANGO_ENTORNO elige el perfil: "dev" (default), "test" (lo fija settings_test) o "prod"
+# (lo fija la imagen de Docker). Los ajustes propios de cada perfil están en "Perfiles", al final.
+ENTORNO = os.getenv("DJANGO_ENTORNO", "dev").lower()
+if ENTORNO not in ("dev", "test", "prod"):
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured(f"DJANGO_ENTORNO inválido: {ENTORNO!r} (dev, test o prod)")
+# DEBUG solo en dev: con DEBUG cada consulta SQL queda guardada en connection.queries
+DEBUG = ENTORNO == "dev" and os.getenv("DJANGO_DEBUG", "True") == "True"
 # ALLOWED_HOSTS define una lista de nombres de host/domains que esta aplicacion puede servir
 # En desarrollo, podemos usar ['*'] para permitir todos los hosts
 # En produccion, debemos especificar los nombres de host permitidos
@@ -78,7 +86,12 @@ MIDDLEWARE = [ #los middlewares son componentes que procesan las solicitudes y r
     'django.middleware.clickjacking.XFrameOptionsMiddleware',#protege contra ataques de clickjacking
     #los ataques de clickjacking son un tipo de ataque donde un usuario es engañado para hacer clic en algo diferente a lo que el usuario percibe, potencialmente revelando informacion confidencial o permitiendo el control de su computadora mientras interactua con una aplicacion web aparentemente inofensiva
     "allauth.account.middleware.AccountMiddleware",
+    'asistencias.middleware.LecturaPropiaMiddleware',#con réplica configurada: quien escribió lee de la primaria unos segundos
+    'asistencias.middleware.InstrumentacionMiddleware',#SQL/templates/vista por request: header Server-Timing, log 'asistencias.rendimiento' y agregado por URL
+    'asistencias.middleware.CheckinQRMiddleware',#QR de check-in inválido: 403 antes de leer el usuario
     'asistencias.middleware.RoleSwitchMiddleware',
+    'asistencias.middleware.MembresiasMiddleware',#request.membresias: vinculos del usuario con materias/diplomaturas, una consulta por request
+    'asistencias.middleware.PerfiladoMiddleware',#cProfile a pedido (lo activa un supervisor en /supervisor/perfiles/)
     #deploy:
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # antes de CommonMiddleware
@@ -118,6 +131,8 @@ TEMPLATES = [
 #definimos el archivo wsgi, que es el punto de entrada para los servidores web compatibles con wsgi. El servidor web usa este archivo para comunicarse con la aplicacion django.
 #un servidor compatible seria un servidor como gunicorn o uWSGI, tecnologias que permiten desplegar aplicaciones web escritas en python
 WSGI_APPLICATION = 'diplomaturas.wsgi.application'
+#punto de entrada ASGI (gunicorn -k uvicorn.workers.UvicornWorker diplomaturas.asgi:application)
+ASGI_APPLICATION = 'diplomaturas.asgi.application'
 
 # Base de datos
 DATABASES = {
@@ -128,9 +143,47 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        #conexiones persistentes: cada worker reutiliza su conexion en lugar de abrir una por request
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        #antes de reutilizar una conexion persistente verifica que siga viva (ej: si se reinicio el contenedor db)
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true",
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+        },
     }
 }
 
+# Pool de conexiones nativo de Django (requiere psycopg 3 con el extra "pool": requirements-pool.txt).
+# Sin pool el driver es psycopg2 (requirements.txt).
+# Es incompatible con CONN_MAX_AGE: el pool ya mantiene las conexiones abiertas.
+if os.getenv("DB_POOL", "False").lower() == "true":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),  # espera maxima por una conexion libre
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    }
+
+# --- Réplica de lectura (opcional) ---
+# Con DB_REPLICA_HOST se agrega el alias "replica" (mismas credenciales que la primaria salvo que
+# se indiquen) y los reportes/exportaciones leen de ahí; ver asistencias/replica.py.
+# REPLICA_FIJAR_SEGUNDOS: cuánto lee de la primaria un usuario después de escribir; tiene que
+# superar el retraso normal de la replicación.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "USER": os.getenv("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": os.getenv("DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]),
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        # en los tests la réplica es la misma base de test que la primaria
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["asistencias.replica.ReplicaRouter"]
+REPLICA_FIJAR_SEGUNDOS = int(os.getenv("DB_REPLICA_FIJAR_SEGUNDOS", "10"))
+
 #se establecen las validaciones de contraseñas
 AUTH_PASSWORD_VALIDATORS = [
     #.userattributesimilarityvalidator verifica que la contrasena no sea similar a los atributos del usuario, como su nombre o correo electronico
@@ -198,7 +251,115 @@ ACCOUNT_DEFAULT_HTTP_PROTOCOL = 'http'
 # Static & Media
 STATIC_URL = os.getenv("STATIC_URL", "/static/")
 STATIC_ROOT = BASE_DIR / "staticfiles"  # donde collectstatic deja todo
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# (STATICFILES_STORAGE ya no existe desde Django 5.1: el storage se define en STORAGES, ver "Perfiles")
 
 MEDIA_URL = os.getenv("MEDIA_URL", "/media/")
 MEDIA_ROOT = BASE_DIR / "media"
+
+# --- Cache ---
+# CACHE_BACKEND: "file" (default, compartido entre los workers del contenedor), "redis" (usa CACHE_URL) o "locmem"
+_cache_backend = os.getenv("CACHE_BACKEND", "file").lower()
+if _cache_backend == "redis":
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_URL", "redis://redis:6379/1"),
+    }}
+elif _cache_backend == "locmem":
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+else:
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "5000"))},
+    }}
+CACHES["default"]["KEY_PREFIX"] = "asistencias"
+# Tiempo (segundos) de las vistas y fragmentos cacheados; las versiones las invalidan antes si hay cambios
+CACHE_TIMEOUT_VISTAS = int(os.getenv("CACHE_TIMEOUT_VISTAS", "600"))
+
+# --- Sesiones ---
+# SESSION_BACKEND: "cached_db" (default: lee del cache y cae a la base si no está), "signed_cookies"
+# (todo en la cookie firmada, sin base; el payload es chico: login + impersonate_role) o "db".
+_session_engines = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = _session_engines[os.getenv("SESSION_BACKEND", "cached_db").lower()]
+SESSION_COOKIE_HTTPONLY = True
+
+# Segundos que se cachean las membresias de cada usuario (0 = solo durante el request).
+# Solo conviene subirlo con un cache compartido entre workers.
+MEMBRESIAS_CACHE_TTL = int(os.getenv("MEMBRESIAS_CACHE_TTL", "0"))
+
+# Eventos de asistencia en vivo (SSE, api/clases/<id>/eventos/). Solo con workers ASGI
+# (uvicorn.workers.UvicornWorker): bajo WSGI cada stream ocuparía un worker sync hasta el timeout.
+# Apagado, o sin ASGI, la planilla sigue por sondeo de api/clases/<id>/cambios/.
+SSE_ACTIVO = os.getenv("SSE_ACTIVO", "False") == "True"
+SSE_INTERVALO_SONDEO = float(os.getenv("SSE_INTERVALO_SONDEO", "2"))  # segundos entre consultas del productor
+SSE_HEARTBEAT = int(os.getenv("SSE_HEARTBEAT", "15"))
+SSE_DURACION_MAX = int(os.getenv("SSE_DURACION_MAX", "3600"))
+
+# Importaciones (procesar_importaciones): segundos sin progreso tras los que un trabajo en curso
+# se da por huérfano (el worker murió) y vuelve a la cola. Cada lote renueva el plazo.
+IMPORTACION_LEASE = int(os.getenv("IMPORTACION_LEASE", "600"))
+
+# Check-in con QR firmado (clases/<id>/qr/): segundos que vale cada código proyectado y cuántas
+# rotaciones anteriores se siguen aceptando (lo que tarda el alumno entre escanear y enviar).
+CHECKIN_ROTACION = int(os.getenv("CHECKIN_ROTACION", "30"))
+CHECKIN_TOLERANCIA = int(os.getenv("CHECKIN_TOLERANCIA", "1"))
+
+# --- Instrumentación ---
+# InstrumentacionMiddleware: header Server-Timing, una línea JSON por request en el logger
+# 'asistencias.rendimiento' y el agregado por URL de /supervisor/rendimiento/.
+INSTRUMENTACION = os.getenv("INSTRUMENTACION", "True") == "True"
+# El header Server-Timing (con la cantidad de consultas) va solo a supervisores y staff;
+# True lo manda a todos, anónimos incluidos (útil en dev, no en producción)
+SERVER_TIMING_PUBLICO = os.getenv("SERVER_TIMING_PUBLICO", "False") == "True"
+# PerfiladoMiddleware: perfiles cProfile a pedido en MEDIA_ROOT/perfiles/ (False = ni se instala)
+PERFILADO = os.getenv("PERFILADO", "True") == "True"
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"simple": {"format": "%(asctime)s %(name)s %(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "simple"}},
+    "loggers": {
+        "asistencias.rendimiento": {
+            "handlers": ["console"],
+            "level": os.getenv("LOG_RENDIMIENTO", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# --- Uploads ---
+# Los archivos más grandes que FILE_UPLOAD_MAX_MEMORY_SIZE se escriben a un temporal en disco en vez
+# de quedar en la memoria del worker (las planillas de inscripción pueden pesar varios MB).
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", str(5 * 1024 * 1024)))
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(1024 * 1024)))
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR") or None
+DATA_UPLOAD_MAX_NUMBER_FIELDS = int(os.getenv("DATA_UPLOAD_MAX_NUMBER_FIELDS", "2000"))
+
+# --- Perfiles ---
+if ENTORNO == "prod":
+    # Templates compilados una vez por worker y sin chequeo de cambios en disco
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.cached.Loader", [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ]),
+    ]
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove("django.template.context_processors.debug")
+    # Estáticos con hash en el nombre y comprimidos: whitenoise los sirve con cache de un año
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    }
+    FILE_UPLOAD_PERMISSIONS = 0o640
+    # Una línea por evento a stdout (la junta docker logs); solo advertencias salvo el log de rendimiento
+    LOGGING["formatters"]["simple"]["format"] = "%(asctime)s %(levelname)s %(name)s %(message)s"
+    LOGGING["root"] = {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "WARNING")}
+    LOGGING["loggers"]["django.request"] = {"handlers": ["console"], "level": "ERROR", "propagate": False}
+elif ENTORNO == "test":
+    # Hashear passwords con PBKDF2 es lo más lento de crear usuarios en los tests
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
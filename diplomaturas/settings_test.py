@@ -1,8 +1,29 @@
-from .settings import *
+import os
+
+os.environ["DJANGO_ENTORNO"] = "test"
+
+from .settings import *  # noqa: E402
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Hace de réplica: en los tests es la misma base que 'default' (TEST MIRROR)
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+# Apagada salvo en los tests de la réplica (override_settings(REPLICA_LECTURAS=True))
+REPLICA_LECTURAS = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Sin una línea de log por request en la salida de los tests
+LOGGING["loggers"]["asistencias.rendimiento"]["level"] = "WARNING"
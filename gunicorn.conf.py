@@ -0,0 +1,30 @@
+# Configuración de gunicorn. Se lee sola si gunicorn arranca desde este directorio
+# (o con -c gunicorn.conf.py); lo que se pase por línea de comandos tiene prioridad.
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# preload: Django, los modelos y el URLconf se importan una sola vez en el master y los workers
+# los heredan al hacer fork, compartiendo esas páginas de memoria (copy-on-write) en vez de
+# importar todo cada uno. openpyxl/reportlab no entran acá: se cargan a pedido
+# (asistencias.documentos) solo en los workers que generan exportaciones o constancias.
+# Con preload, `kill -HUP` no recarga código nuevo: para desplegar hay que reiniciar el master.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+
+def when_ready(server):
+    if preload_app:
+        # Los objetos importados en el master pasan a la generación permanente: el GC de los
+        # workers no los recorre, así no escribe sus headers y no rompe las páginas compartidas
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Una conexión abierta en el master no puede compartirse entre procesos
+        from django.db import connections
+        connections.close_all()